@@ -1,28 +1,161 @@
+import hashlib
+import os
+from threading import Lock
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+from cachetools import LRUCache
 from fastapi import HTTPException
 from better_profanity import profanity
+from better_profanity.constants import ALLOWED_CHARACTERS
+from better_profanity.utils import get_complete_path_of_file, read_wordlist
+from dotenv import load_dotenv
 
-# Initialize the profanity filter
-profanity.load_censor_words()
+load_dotenv()
 
-def moderate_text(text: str) -> bool:
+MODERATION_CACHE_SIZE = int(os.getenv("MODERATION_CACHE_SIZE", "50000"))  # Verdicts kept, keyed by content hash
+
+
+class ModerationEngine:
     """
-    Returns True if text is inappropriate, False if it's safe
-    Uses better-profanity for offline content moderation
+    The better-profanity censor list (with its obfuscation variants, e.g. "h3ll",
+    "@ss") compiled once into a deterministic automaton: each state is a set of
+    positions in a trie of the censor words, and each input character maps to the
+    letters it can stand for. Scanning starts at every word boundary and walks one
+    table lookup per character, instead of comparing every word with every
+    censor entry. As in better-profanity, only whole words (or whole phrases)
+    match, so "hello" is not flagged for "hell".
+
+    Separators are not skipped: "h.e.l.l" is three dots between four words, not
+    "hell". Spelled-out forms are caught only where the list names them
+    ("f.u.c.k", "s-h-i-t"), and then wherever they occur; better-profanity misses
+    those entries when their last letter ends the text, which is not kept here.
     """
-    if not text or not isinstance(text, str):
+
+    def __init__(self, words: Iterable[str], char_map: Dict[str, tuple], cache_size: int = MODERATION_CACHE_SIZE):
+        self._word_chars = frozenset(ALLOWED_CHARACTERS)
+        self._transitions: List[Dict[str, int]] = []
+        self._accepting: List[bool] = []
+        self._compile({word.lower() for word in words}, char_map)
+        self._cache = LRUCache(maxsize=cache_size)
+        self._lock = Lock()
+
+    def _compile(self, words: Set[str], char_map: Dict[str, tuple]) -> None:
+        # Trie of the censor words; node 0 is the root
+        children: List[Dict[str, int]] = [{}]
+        terminal: List[bool] = [False]
+        for word in words:
+            node = 0
+            for char in word:
+                if char not in children[node]:
+                    children.append({})
+                    terminal.append(False)
+                    children[node][char] = len(children) - 1
+                node = children[node][char]
+            terminal[node] = True
+
+        # Input character -> the word letters it may be spelling
+        spellings: Dict[str, Set[str]] = {}
+        for letter, substitutes in char_map.items():
+            for substitute in substitutes:
+                spellings.setdefault(substitute, {substitute}).add(letter)
+
+        # Subset construction: every reachable set of trie nodes becomes one state
+        state_ids: Dict[FrozenSet[int], int] = {}
+        pending = [frozenset([0])]
+        state_ids[pending[0]] = 0
+        self._transitions.append({})
+        self._accepting.append(False)
+        while pending:
+            nodes = pending.pop()
+            moves: Dict[str, Set[int]] = {}
+            for node in nodes:
+                for letter, child in children[node].items():
+                    moves.setdefault(letter, set()).add(child)
+                    for char, letters in spellings.items():
+                        if letter in letters and char != letter:
+                            moves.setdefault(char, set()).add(child)
+            table = self._transitions[state_ids[nodes]]
+            for char, targets in moves.items():
+                target = frozenset(targets)
+                if target not in state_ids:
+                    state_ids[target] = len(self._transitions)
+                    self._transitions.append({})
+                    self._accepting.append(any(terminal[node] for node in target))
+                    pending.append(target)
+                table[char] = state_ids[target]
+
+    def _scan(self, text: str) -> bool:
+        text = text.lower()
+        word_chars, transitions, accepting = self._word_chars, self._transitions, self._accepting
+        length = len(text)
+        previous_in_word = False
+        for start, char in enumerate(text):
+            in_word = char in word_chars
+            if not in_word or previous_in_word:
+                previous_in_word = in_word
+                continue
+            previous_in_word = True
+            state = 0
+            for position in range(start, length):
+                state = transitions[state].get(text[position])
+                if state is None:
+                    break
+                if accepting[state] and (position + 1 == length or text[position + 1] not in word_chars):
+                    return True
         return False
 
-    try:
-        # Check if text contains profanity
-        contains_profanity = profanity.contains_profanity(text)
-        
-        if contains_profanity:
-            print("Text contains inappropriate content")
-            return True
-        else:
-            print("Text is considered safe")
+    def is_inappropriate(self, text: Optional[str]) -> bool:
+        """True if the text contains a censored word. Verdicts are cached by content hash."""
+        if not text or not isinstance(text, str):
             return False
-            
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        with self._lock:
+            verdict = self._cache.get(key)
+        if verdict is None:
+            verdict = self._scan(text)
+            with self._lock:
+                self._cache[key] = verdict
+        return verdict
+
+    def moderate_batch(self, texts: Iterable[Optional[str]]) -> List[bool]:
+        """One verdict per text, in order; repeated texts are scanned once."""
+        return [self.is_inappropriate(text) for text in texts]
+
+
+_engine: Optional[ModerationEngine] = None
+_engine_lock = Lock()
+
+
+def get_moderation_engine() -> ModerationEngine:
+    """The engine for the better-profanity list, compiled on first use rather than at import."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = ModerationEngine(
+                    read_wordlist(get_complete_path_of_file("profanity_wordlist.txt")),
+                    profanity.CHARS_MAPPING,
+                )
+    return _engine
+
+
+def moderate_text(text: str) -> bool:
+    """
+    Returns True if text is inappropriate, False if it's safe
+    Uses the compiled better-profanity word list for offline content moderation
+    """
+    try:
+        return get_moderation_engine().is_inappropriate(text)
     except Exception as e:
         print(f"Error in text moderation: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error in text moderation: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error in text moderation: {str(e)}")
+
+
+def moderate_texts(texts: Iterable[Optional[str]]) -> List[bool]:
+    """Batch form of `moderate_text`, for scanning thousands of strings per call."""
+    return get_moderation_engine().moderate_batch(texts)
+
+
+def ensure_appropriate(text: Optional[str], kind: str = "post") -> None:
+    """Refuse a write whose text contains a censored word."""
+    if moderate_text(text):
+        raise HTTPException(status_code=400, detail=f"Inappropriate content detected, Please revise your {kind}.")
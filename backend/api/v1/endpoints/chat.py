@@ -13,7 +13,8 @@ from datetime import datetime, timezone
 from typing import Dict, List, Optional
 from schemas.chat import MessageOut, ConversationOut, MessageType as SchemaMessageType
 from pathlib import Path
-from utils.supabase import upload_file_to_supabase
+from services.DedupHandler import upload_to_supabase_deduplicated, purge_stored_files
+from services.message_service import delete_message, record_chat_upload
 from services.FileHandler import generate_secure_filename
 from schemas.chat import MessageOut, ConversationOut
 from fastapi.websockets import WebSocketDisconnect
@@ -41,15 +42,24 @@ async def get_conversations(db: Session = Depends(get_db), current_user=Depends(
 async def get_chat_history(friend_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     return await fetch_chat_history(db, current_user.id, friend_id)
 
+@router.delete("/messages/{message_id}")
+async def delete_chat_message(message_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    released = delete_message(db, message_id, current_user.id)
+    await purge_stored_files(released)
+    return {"message": "Message deleted successfully"}
+
 @router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(file: UploadFile = File(...), db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     try:
         # Generate a secure filename
         ext = Path(file.filename).suffix.lower()
         filename = generate_secure_filename(file.filename, ext)
         
-        # Upload to Supabase
-        file_url = await upload_file_to_supabase(file, filename, section="chat")
+        # Upload to Supabase, unless the same file was already uploaded. The uploader's next message
+        # sent with the URL owns the reference taken here; deleting it (DELETE /chat/messages/{id}) releases it
+        file_url = await upload_to_supabase_deduplicated(db, file, filename, section="chat")
+        record_chat_upload(db, current_user.id, file_url)
+        db.commit()
         return {"file_url": file_url}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -100,7 +100,7 @@ async def upload_paper(
     if not research_field.strip():
         raise HTTPException(status_code=422, detail="Research field cannot be empty")
 
-    file_path = await save_uploaded_research_paper(file, current_user.id)
+    file_path = await save_uploaded_research_paper(file, current_user.id, db)
     paper = ResearchPaper(
         title=title,
         author=author,
@@ -0,0 +1,208 @@
+import os
+import pickle
+import time
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+from cachetools import TLRUCache
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "memory" keeps entries in this process; "redis" shares them through REDIS_URL
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL")
+
+
+class InMemoryCacheBackend:
+    """
+    Process-local TTL + LRU store. Entries expire after their own `ttl` when
+    one is passed to set/add, otherwise after the backend's; the least
+    recently used go first when full.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._ttl = ttl
+        # Entries are stored as (value, ttl) so each one can carry its own expiry
+        self._entries = TLRUCache(maxsize=maxsize, ttu=self._expires_at)
+        self._counters: Dict[str, int] = {}  # Never expire or get evicted
+        self._lock = Lock()
+
+    def _expires_at(self, key: str, entry: tuple, now: float) -> float:
+        ttl = entry[1]
+        return now + (ttl if ttl else self._ttl)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (value, ttl)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Set only if the key is absent (or expired); returns whether it was set."""
+        with self._lock:
+            if key in self._entries:
+                return False
+            self._entries[key] = (value, ttl)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def bump_counter(self, key: str) -> None:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+
+class LocalRedisStandIn:
+    """The subset of the redis client API used by `RedisCacheBackend`, kept in a dict. For tests and local runs."""
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value, expires_at = self._data.get(key, (None, None))
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        with self._lock:
+            if nx and key in self._data:
+                expires_at = self._data[key][1]
+                if expires_at is None or expires_at > time.monotonic():
+                    return None
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class RedisCacheBackend:
+    """Network cache shared by all workers. Eviction is left to the server's maxmemory-policy (allkeys-lru)."""
+
+    def __init__(self, client, ttl: float):
+        self._client = client
+        self._ttl = int(ttl)
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._client.get(key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._client.set(key, pickle.dumps(value), ex=int(ttl or self._ttl) or None)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Set only if the key is absent (SET NX), atomically across workers."""
+        return bool(self._client.set(key, pickle.dumps(value), ex=int(ttl or self._ttl) or None, nx=True))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+    def get_counter(self, key: str) -> int:
+        raw = self._client.get(key)
+        return int(raw) if raw is not None else 0
+
+    def bump_counter(self, key: str) -> None:
+        # A fresh timestamp rather than INCR: if the server evicts the counter,
+        # a later bump still cannot land on a generation that was used before
+        self._client.set(key, str(time.time_ns()).encode())
+
+
+def _redis_client():
+    if not REDIS_URL:
+        return LocalRedisStandIn()
+    import redis  # Optional dependency, only needed with CACHE_BACKEND=redis
+    return redis.Redis.from_url(REDIS_URL)
+
+
+def create_backend(maxsize: int, ttl: float):
+    if CACHE_BACKEND == "redis":
+        return RedisCacheBackend(_redis_client(), ttl)
+    return InMemoryCacheBackend(maxsize, ttl)
+
+
+class ResponseCache:
+    """
+    Namespaced cache with hit/miss counters.
+    `invalidate()` bumps a generation number that is part of every key, so all
+    existing entries become unreachable at once without scanning the backend.
+    Entries stored under a `scope` also carry that scope's own generation, so
+    `invalidate(scopes)` drops just those entries.
+    """
+
+    def __init__(self, namespace: str, maxsize: int = 1024, ttl: float = 60, backend=None):
+        self.namespace = namespace
+        self.backend = backend or create_backend(maxsize, ttl)
+        self.hits = 0
+        self.misses = 0
+        self._generation_key = f"{namespace}:generation"
+
+    def _scope_generation_key(self, scope: Hashable) -> str:
+        return f"{self._generation_key}:{scope!r}"
+
+    def _key(self, key: Hashable, scope: Optional[Hashable] = None) -> str:
+        generation = self.backend.get_counter(self._generation_key)
+        if scope is not None:
+            generation = f"{generation}.{self.backend.get_counter(self._scope_generation_key(scope))}"
+        return f"{self.namespace}:{generation}:{key!r}"
+
+    def get(self, key: Hashable, scope: Optional[Hashable] = None) -> Optional[Any]:
+        value = self.backend.get(self._key(key, scope))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, scope: Optional[Hashable] = None) -> None:
+        self.backend.set(self._key(key, scope), value)
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], Any], scope: Optional[Hashable] = None) -> Any:
+        """
+        Return the cached value or compute and store it. The generation is read
+        before computing, so a write that invalidates mid-compute is not masked
+        by storing the stale result under the new generation. A `None` result
+        is returned as is and not stored.
+        """
+        full_key = self._key(key, scope)
+        value = self.backend.get(full_key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = compute()
+        if value is not None:
+            self.backend.set(full_key, value)
+        return value
+
+    def delete(self, key: Hashable, scope: Optional[Hashable] = None) -> None:
+        self.backend.delete(self._key(key, scope))
+
+    def invalidate(self, scopes: Optional[Iterable[Hashable]] = None) -> None:
+        """Drop every entry, or with `scopes` only the entries stored under one of them."""
+        if scopes is None:
+            self.backend.bump_counter(self._generation_key)
+            return
+        for scope in scopes:
+            self.backend.bump_counter(self._scope_generation_key(scope))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
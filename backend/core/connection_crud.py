@@ -1,4 +1,5 @@
 from fastapi import HTTPException
+from sqlalchemy import func, select, union_all, update
 from sqlalchemy.orm import Session
 from models.connection import Connection, ConnectionStatus
 from schemas.connection import ConnectionCreate
@@ -29,11 +30,29 @@ def accept_request(db: Session, request_id: int):
         raise HTTPException(status_code=404, detail="No pending request found.")
 
     connection.status = ConnectionStatus.ACCEPTED
+    adjust_connection_count(db, connection, 1)
     db.commit()
     db.refresh(connection)  # Ensure the changes reflect in the session
     return connection
 
 
+def adjust_connection_count(db: Session, connection: Connection, delta: int) -> None:
+    """
+    Add `delta` to User.connection_count of both sides of `connection`, e.g. +1
+    when it is accepted. A pair may also be connected the other way round; it
+    only counts once, so nothing changes while that row is accepted.
+    """
+    reverse = db.query(Connection.id).filter(
+        Connection.user_id == connection.friend_id,
+        Connection.friend_id == connection.user_id,
+        Connection.status == ConnectionStatus.ACCEPTED
+    ).first()
+    if not reverse:
+        db.query(User).filter(User.id.in_([connection.user_id, connection.friend_id])).update(
+            {User.connection_count: User.connection_count + delta}, synchronize_session=False
+        )
+
+
 def reject_request(db: Session, request_id: int):
     connection = db.query(Connection).filter_by(id=request_id, status=ConnectionStatus.PENDING).first()
     if connection:
@@ -57,6 +76,26 @@ def get_connections(db: Session, user_id: int):
     return [{"user_id": user, "friend_id": friend} for user, friend in unique_connections]
 
 
+def reconcile_connection_counts(db: Session) -> int:
+    """Recompute User.connection_count from the connections table. Returns how many users were corrected."""
+    accepted = Connection.status == ConnectionStatus.ACCEPTED
+    sides = union_all(
+        select(Connection.user_id.label("member_id"), Connection.friend_id.label("other_id")).where(accepted),
+        select(Connection.friend_id.label("member_id"), Connection.user_id.label("other_id")).where(accepted),
+    ).subquery()
+    actual_count = (
+        select(func.count(func.distinct(sides.c.other_id))).where(sides.c.member_id == User.id).scalar_subquery()
+    )
+    result = db.execute(
+        update(User)
+        .where(User.connection_count.is_distinct_from(actual_count))
+        .values(connection_count=actual_count)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
 def get_pending_requests(db: Session, user_id: int):
     """Fetch all pending connection requests where the user is the recipient."""
     return db.query(Connection).filter(
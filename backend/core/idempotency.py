@@ -0,0 +1,219 @@
+import hashlib
+import os
+import re
+import tempfile
+from typing import Callable, List, Optional, Pattern, Tuple
+import jwt
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from dotenv import load_dotenv
+from core.cache import create_backend
+from core.security import SECRET_KEY, ALGORITHM
+from database.session import SessionLocal
+from models.user import User
+
+load_dotenv()
+
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", "86400"))  # Seconds a response can be replayed for its key
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+# A key stays locked this long if its request never finishes (e.g. the worker dies mid-upload)
+IDEMPOTENCY_PENDING_TTL = int(os.getenv("IDEMPOTENCY_PENDING_TTL", "300"))
+# Request bodies up to this size are buffered in memory while fingerprinted, larger ones on disk
+IDEMPOTENCY_SPOOL_BYTES = int(os.getenv("IDEMPOTENCY_SPOOL_BYTES", str(1024 * 1024)))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+# Creates that mobile clients retry on timeout
+IDEMPOTENT_ROUTES = [
+    re.compile(r"^/posts/create_(text|media|document|event)_post/?$"),
+    re.compile(r"^/interactions/\d+/comment$"),
+    re.compile(r"^/interactions/\d+/comment/\d+/reply$"),
+    re.compile(r"^/interactions/\d+/share$"),
+    re.compile(r"^/chat/upload$"),
+]
+REPLAYED_HEADERS = {b"content-type", b"etag", b"location"}  # The rest is regenerated on replay
+PENDING = "pending"
+READ_CHUNK_BYTES = 64 * 1024
+
+
+def authenticated_user_id(authorization: Optional[bytes]) -> Optional[int]:
+    """Id of the user a bearer token belongs to, or None when it does not verify (the route answers 401)."""
+    scheme, _, token = (authorization or b"").decode("latin-1").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        username = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except jwt.PyJWTError:
+        return None
+    if not username:
+        return None
+    db = SessionLocal()
+    try:
+        return db.query(User.id).filter(User.username == username).scalar()
+    finally:
+        db.close()
+
+
+def _multipart_boundary(headers: dict) -> Optional[bytes]:
+    content_type = headers.get(b"content-type", b"")
+    if not content_type.lower().startswith(b"multipart/"):
+        return None
+    for param in content_type.split(b";")[1:]:
+        name, _, value = param.strip().partition(b"=")
+        if name.lower() == b"boundary" and value:
+            return value.strip(b'"')
+    return None
+
+
+async def _spool_body(receive: Receive, boundary: Optional[bytes]) -> Tuple[tempfile.SpooledTemporaryFile, int, str]:
+    """
+    Read the whole request body into a spooled file and fingerprint it. The
+    multipart boundary is random per attempt, so it is left out of the hash.
+    Returns the file (rewound), its size and the fingerprint.
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=IDEMPOTENCY_SPOOL_BYTES)
+    digest, carry, size = hashlib.sha256(), b"", 0
+    keep = len(boundary) - 1 if boundary else 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] != "http.request":
+            break  # Client went away; the app sees the disconnect on its own receive
+        chunk = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        spooled.write(chunk)
+        size += len(chunk)
+        data = carry + chunk
+        if boundary:
+            # Hold back a possible partial boundary until the next chunk completes it
+            data = data.replace(boundary, b"")
+            carry, data = (data[len(data) - keep:], data[:len(data) - keep]) if len(data) > keep else (data, b"")
+        digest.update(data)
+    digest.update(carry)
+    spooled.seek(0)
+    return spooled, size, digest.hexdigest()
+
+
+def _replaying_receive(spooled: tempfile.SpooledTemporaryFile, size: int, receive: Receive) -> Receive:
+    """Hand the spooled body to the app in chunks, then fall through to the real receive."""
+    started = False
+
+    async def replay() -> Message:
+        nonlocal started
+        if started and spooled.tell() >= size:
+            return await receive()
+        started = True
+        chunk = spooled.read(READ_CHUNK_BYTES)
+        return {"type": "http.request", "body": chunk, "more_body": spooled.tell() < size}
+
+    return replay
+
+
+class IdempotencyMiddleware:
+    """
+    Replays the stored response when a create is retried with the same
+    `Idempotency-Key` header, instead of writing (and uploading) again.
+    Keys are scoped to the authenticated user and the path, and remember a
+    fingerprint of the request body: reusing a key for a different body gets
+    422. Only 2xx responses are stored, as soon as their last body chunk is
+    sent (background tasks still running do not hold the key); a retry of a
+    failed request runs again. A retry arriving while the first request is
+    still running gets 409.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: Optional[List[Pattern]] = None,
+        backend=None,
+        identify: Callable[[Optional[bytes]], Optional[int]] = authenticated_user_id
+    ):
+        self.app = app
+        self.routes = IDEMPOTENT_ROUTES if routes is None else routes
+        self.backend = backend or create_backend(IDEMPOTENCY_MAX_ENTRIES, IDEMPOTENCY_TTL)
+        self.identify = identify
+
+    def _applies(self, scope: Scope, headers: dict) -> bool:
+        if scope["type"] != "http" or scope["method"] != "POST" or not headers.get(b"idempotency-key"):
+            return False
+        return any(route.match(scope["path"]) for route in self.routes)
+
+    @staticmethod
+    def store_key(user_id: int, path: str, key: bytes) -> str:
+        return f"idempotency:{user_id}:{path}:{key.decode('latin-1')}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        headers = dict(scope.get("headers", []))
+        if not self._applies(scope, headers):
+            await self.app(scope, receive, send)
+            return
+        if len(headers[b"idempotency-key"]) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            await JSONResponse({"detail": "Idempotency-Key is too long"}, status_code=400)(scope, receive, send)
+            return
+        user_id = await run_in_threadpool(self.identify, headers.get(b"authorization"))
+        if user_id is None:
+            await self.app(scope, receive, send)  # Not signed in; the route itself rejects the request
+            return
+
+        store_key = self.store_key(user_id, scope["path"], headers[b"idempotency-key"])
+        spooled, size, fingerprint = await _spool_body(receive, _multipart_boundary(headers))
+        try:
+            await self._run(scope, _replaying_receive(spooled, size, receive), send, store_key, fingerprint)
+        finally:
+            spooled.close()
+
+    async def _run(self, scope: Scope, receive: Receive, send: Send, store_key: str, fingerprint: str) -> None:
+        if not self.backend.add(store_key, {"status": PENDING, "fingerprint": fingerprint}, ttl=IDEMPOTENCY_PENDING_TTL):
+            stored = self.backend.get(store_key)
+            if stored is not None and stored["fingerprint"] != fingerprint:
+                await JSONResponse(
+                    {"detail": "Idempotency-Key was already used for a different request"}, status_code=422
+                )(scope, receive, send)
+                return
+            if stored is None or stored["status"] == PENDING:
+                await JSONResponse(
+                    {"detail": "A request with this Idempotency-Key is still in progress"}, status_code=409
+                )(scope, receive, send)
+                return
+            await self._replay(stored, send)
+            return
+
+        response = {"status": None, "headers": [], "body": []}
+        recorded = False
+
+        async def recording_send(message: Message) -> None:
+            nonlocal recorded
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = [(k, v) for k, v in message.get("headers", []) if k.lower() in REPLAYED_HEADERS]
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+            # Store once the whole 2xx response is out, before any background task runs
+            complete = message["type"] == "http.response.body" and not message.get("more_body", False)
+            if complete and 200 <= response["status"] < 300:
+                self.backend.set(store_key, {
+                    "status": response["status"],
+                    "headers": response["headers"],
+                    "body": b"".join(response["body"]),
+                    "fingerprint": fingerprint,
+                })
+                recorded = True
+
+        try:
+            await self.app(scope, receive, recording_send)
+        finally:
+            # Failed, raised or cancelled (client gone, shutdown) before a response went out: let the client retry
+            if not recorded:
+                self.backend.delete(store_key)
+
+    async def _replay(self, stored: dict, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": stored["status"],
+            "headers": stored["headers"] + [
+                (b"content-length", str(len(stored["body"])).encode()),
+                (b"idempotent-replayed", b"true"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": stored["body"]})
@@ -0,0 +1,59 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+from fastapi import HTTPException
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Seconds a request waits for its upload (queueing included) before giving up with a 504
+UPLOAD_TIMEOUT_SECONDS = float(os.getenv("UPLOAD_TIMEOUT_SECONDS", "60"))
+# Uploads in flight per destination; further uploads queue without holding a worker
+UPLOAD_CONCURRENCY = {
+    "cloudinary": int(os.getenv("UPLOAD_CONCURRENCY_CLOUDINARY", "4")),
+    "supabase": int(os.getenv("UPLOAD_CONCURRENCY_SUPABASE", "4")),
+}
+
+T = TypeVar("T")
+
+
+class UploadExecutor:
+    """
+    Runs blocking storage SDK calls off the event loop.
+    Each destination gets its own bounded thread pool, so its pool size is its
+    concurrency limit and a slow provider cannot starve the other one.
+    """
+
+    def __init__(self, concurrency: Dict[str, int], timeout: float):
+        self.timeout = timeout
+        self._pools = {
+            destination: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"upload-{destination}")
+            for destination, workers in concurrency.items()
+        }
+
+    async def run(self, destination: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Await `fn(*args, **kwargs)` on the destination's pool. On timeout the
+        request fails with 504; the worker thread still finishes the call, as
+        a running thread cannot be interrupted.
+        """
+        pool = self._pools.get(destination)
+        if pool is None:
+            raise ValueError(f"Unknown upload destination: {destination}")
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(pool, functools.partial(fn, *args, **kwargs)),
+                timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail=f"Upload to {destination} timed out")
+
+
+upload_executor = UploadExecutor(UPLOAD_CONCURRENCY, UPLOAD_TIMEOUT_SECONDS)
+
+
+async def run_upload(destination: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    return await upload_executor.run(destination, fn, *args, **kwargs)
@@ -4,6 +4,7 @@ from models.notifications import Notification
 from schemas.notification import NotificationCreate
 from datetime import datetime, timezone
 from models.user import User
+from utils.image_variants import avatar_url
 
 
 # Function to create a new notification
@@ -34,7 +35,7 @@ def get_unread_notifications(db: Session, user_id: int):
             "actor_username": n.actor.username,
             "created_at": n.created_at,
             "user_id": n.user_id,  # Add this field
-            "actor_image_url": n.actor.profile_picture
+            "actor_image_url": avatar_url(n.actor)
         }
 
         for n in notifications
@@ -53,7 +54,7 @@ def get_all_notifications(db: Session, user_id: int):
             "actor_username": n.actor.username,
             "created_at": n.created_at,
             "user_id": n.user_id,  # Add this field
-            "actor_image_url": n.actor.profile_picture
+            "actor_image_url": avatar_url(n.actor)
 
         }
         for n in notifications
@@ -79,7 +80,7 @@ def mark_notification_as_read(db: Session, notif_id: int):
             "actor_username": notification.actor.username,
             "created_at": notification.created_at,
             "user_id": notification.user_id,  # Add this field
-            "actor_image_url": notification.actor.profile_picture
+            "actor_image_url": avatar_url(notification.actor)
 
         }
     return None
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
@@ -9,15 +10,46 @@ from fastapi.staticfiles import StaticFiles
 from api.v1.endpoints import search
 from api.v1.endpoints.chatbot import huggingface
 from routes import assistant  # Import the new assistant routes
+from core.upload_limit import UploadSizeLimitMiddleware
+from core.idempotency import IdempotencyMiddleware
+from utils.storage import STORAGE_BACKEND, LOCAL_STORAGE_DIR, LOCAL_STORAGE_URL, UPLOAD_MAX_BYTES
+from services.LikeCounterBuffer import LIKE_COUNTER_BUFFER, like_counter_buffer
+from services.PostCache import invalidate_post_cache
+from services.PublishHandler import resume_unfinished_publishes
 
-app = FastAPI()
+
+def _invalidate_flushed_posts(post_ids):
+    # Cached payloads still hold the pre-flush count, which no longer has the buffered likes on top
+    for post_id in post_ids:
+        invalidate_post_cache(post_id)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if LIKE_COUNTER_BUFFER:
+        like_counter_buffer.start(on_flush=_invalidate_flushed_posts)
+    await resume_unfinished_publishes()  # Jobs left pending/running by the previous process
+    yield
+    if LIKE_COUNTER_BUFFER:
+        like_counter_buffer.stop()  # Apply the likes still buffered before the process exits
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Mount directories for other uploads that are still stored locally
 app.mount("/uploads/media", StaticFiles(directory="uploads/media"), name="media")
 app.mount("/uploads/document", StaticFiles(directory="uploads/document"), name="document")
 app.mount("/uploads/event_images", StaticFiles(directory="uploads/event_images"), name="event_images") 
 app.mount("/uploads/research_papers", StaticFiles(directory="uploads/research_papers"), name="research_papers")
+if STORAGE_BACKEND == "local":
+    app.mount(LOCAL_STORAGE_URL, StaticFiles(directory=LOCAL_STORAGE_DIR), name="storage")
+
+
+# Reject oversized uploads before the multipart parser spools them (added first so CORS headers wrap its 413)
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=UPLOAD_MAX_BYTES)
 
+# Replay the stored response when a create is retried with the same Idempotency-Key
+app.add_middleware(IdempotencyMiddleware)
 
 # Add CORS middleware
 app.add_middleware(
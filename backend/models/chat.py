@@ -24,4 +24,14 @@ class Message(Base):
     is_read = Column(Boolean, default=False)
 
     sender = relationship("User", foreign_keys=[sender_id], back_populates="messages_sent")
-    receiver = relationship("User", foreign_keys=[receiver_id], back_populates="messages_received")
\ No newline at end of file
+    receiver = relationship("User", foreign_keys=[receiver_id], back_populates="messages_received")
+
+class ChatUpload(Base):
+    """Reference a /chat/upload took on a stored file; the sender's message that carries the URL claims it."""
+    __tablename__ = "chat_uploads"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    stored_file_id = Column(Integer, ForeignKey("stored_files.id", ondelete="CASCADE"), nullable=False)
+    message_id = Column(Integer, ForeignKey("messages.id", ondelete="SET NULL"), nullable=True, unique=True)  # Null until sent
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Date, Text, CheckConstraint, UniqueConstraint
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Date, Text, CheckConstraint, UniqueConstraint, Index, Float
 from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB
 from database.session import Base
 from datetime import datetime, timezone
 import enum
@@ -19,6 +20,12 @@ class PostTypeEnum(str, enum.Enum):
     DOCUMENT = "document"
     EVENT = "event"
 
+# Lifecycle of a post; only published posts are listed in feeds
+class PostStatusEnum(str, enum.Enum):
+    PROCESSING = "processing"  # Created, attachment still uploading in the background
+    PUBLISHED = "published"
+    FAILED = "failed"  # Background upload gave up after its retries
+
 class Post(Base):
     __tablename__ = "posts"
 
@@ -27,7 +34,12 @@ class Post(Base):
     content = Column(Text, nullable=True)  # Stores text content (if any)
     post_type = Column(Enum(PostTypeEnum), default=PostTypeEnum.TEXT)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     like_count = Column(Integer, default=0)
+    comment_count = Column(Integer, default=0, nullable=False, server_default="0")  # Kept in sync by comment writes
+    share_count = Column(Integer, default=0, nullable=False, server_default="0")  # Kept in sync by share writes
+    engagement_score = Column(Float, default=0.0, nullable=False, server_default="0")  # See services/RankingHandler.py
+    status = Column(Enum(PostStatusEnum), default=PostStatusEnum.PUBLISHED, nullable=False, server_default=PostStatusEnum.PUBLISHED.name)
    
 
     # Relationships
@@ -41,6 +53,14 @@ class Post(Base):
 
     notifications = relationship("Notification", back_populates="post", cascade="all, delete-orphan")
     hashtags = relationship("Hashtag", secondary=post_hashtags, back_populates="posts")
+
+    # Keyset pagination on (created_at, id) for the main feed and the per-user profile feed,
+    # and on (engagement_score, id) for the ranked feed
+    __table_args__ = (
+        Index("ix_posts_created_at_id", created_at.desc(), id.desc()),
+        Index("ix_posts_user_id_created_at_id", user_id, created_at.desc(), id.desc()),
+        Index("ix_posts_engagement_score_id", engagement_score.desc(), id.desc()),
+    )
    
 class PostMedia(Base):
     __tablename__ = "post_media"
@@ -49,6 +69,7 @@ class PostMedia(Base):
     post_id = Column(Integer, ForeignKey(POSTS_ID_FOREIGN_KEY, ondelete="CASCADE"), nullable=False)
     media_url = Column(String, nullable=False)  # Stores file path
     media_type = Column(String, nullable=False)  # Image or Video
+    variants = Column(JSONB, nullable=True)  # {"thumb"|"feed"|"full": url} of resized WebP copies, images only
 
     post = relationship("Post", back_populates="media")
 
@@ -105,6 +126,9 @@ class Like(Base):
             "(post_id IS NOT NULL AND comment_id IS NULL) OR (post_id IS NULL AND comment_id IS NOT NULL)",
             name="check_like_target"
         ),
+        # One like per user and target; the toggle relies on these to insert-or-delete atomically
+        Index("uq_likes_user_post", user_id, post_id, unique=True, postgresql_where=post_id.isnot(None)),
+        Index("uq_likes_user_comment", user_id, comment_id, unique=True, postgresql_where=comment_id.isnot(None)),
     )
 
     user = relationship("User", back_populates="likes")
@@ -122,6 +146,12 @@ class Comment(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     like_count = Column(Integer, default=0)
 
+    __table_args__ = (
+        # Keyset pages of a post's root comments, and of one thread's replies, oldest first
+        Index("ix_comments_post_root_created_at_id", post_id, created_at, id, postgresql_where=parent_id.is_(None)),
+        Index("ix_comments_parent_created_at_id", parent_id, created_at, id),
+    )
+
     user = relationship("User", back_populates="comments")
     post = relationship("Post", back_populates="comments")
     parent = relationship("Comment", remote_side=[id], back_populates="replies")
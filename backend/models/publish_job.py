@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from database.session import Base
+
+
+class PublishJob(Base):
+    """Upload of a media or document post that finishes after the create request has returned."""
+    __tablename__ = "post_publish_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False, unique=True)
+    kind = Column(String, nullable=False)  # "media" or "document"
+    spool_path = Column(String, nullable=False)  # Local copy of the upload until it reaches storage
+    file_ext = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending | running | done | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
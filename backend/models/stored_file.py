@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, UniqueConstraint
+from database.session import Base
+
+
+class StoredFile(Base):
+    """One object in remote storage, shared by every upload with the same content."""
+    __tablename__ = "stored_files"
+    __table_args__ = (UniqueConstraint("destination", "digest", name="uq_stored_files_destination_digest"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    destination = Column(String, nullable=False)  # "cloudinary" or "supabase"
+    digest = Column(String(64), nullable=False)  # sha256 of the content
+    size = Column(BigInteger, nullable=False)
+    url = Column(String, nullable=False, unique=True, index=True)
+    remote_id = Column(String, nullable=False)  # Cloudinary public_id or storage path, needed to delete the object
+    resource_type = Column(String, nullable=True)  # Cloudinary resource type
+    ref_count = Column(Integer, nullable=False, default=1)  # Posts, messages and papers pointing at url
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
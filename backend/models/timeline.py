@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
+from database.session import Base
+
+
+class TimelineEntry(Base):
+    """One post id materialized into a user's home timeline at write time (fan-out on write)."""
+    __tablename__ = "home_timeline"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)  # Timeline owner
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime, nullable=False)  # Copied from the post so reads never touch `posts` to order
+
+    __table_args__ = (
+        Index("ix_home_timeline_user_created_post", user_id, created_at.desc(), post_id.desc()),
+    )
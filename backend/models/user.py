@@ -1,4 +1,5 @@
 from sqlalchemy import Column, DateTime, Integer, String, Boolean
+from sqlalchemy.dialects.postgresql import JSONB
 from database.session import Base
 from sqlalchemy.orm import relationship
 from datetime import timezone, datetime
@@ -19,10 +20,13 @@ class User(Base):
 
     # ✅ Merged fields from UserProfile
     profile_picture = Column(String, nullable=True)  # Image URL
+    profile_picture_variants = Column(JSONB, nullable=True)  # {"thumb"|"feed"|"full": url} of resized WebP copies
     university_name = Column(String, nullable=True)
     department = Column(String, nullable=True)
     fields_of_interest = Column(String, nullable=True)  # Comma-separated values
     profile_completed = Column(Boolean, default=False)  # To check completion
+    # Accepted connections, kept by accept_request; decides whether the user's posts are fanned out
+    connection_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     papers = relationship("ResearchPaper", back_populates="uploader")
     research_posts = relationship("ResearchCollaboration", back_populates="creator")
@@ -1,12 +1,18 @@
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from models.post import Share, Post, PostMedia, PostDocument, Event, Like
+from sqlalchemy.orm import Session, joinedload
+from models.post import Share, Post, PostMedia, PostDocument, Event, Like, PostStatusEnum
 from models.user import User
 from datetime import datetime
 from zoneinfo import ZoneInfo
 import uuid
 from crud.notification import create_notification
+from services.PostCache import post_cache
+from services.RankingHandler import adjust_post_counters
+from services.LikeStatusCache import get_like_status
+from core.cache import ResponseCache
+from utils.post_utils import build_loaded_post_payload, render_post_payload
 from dotenv import load_dotenv
+from typing import Any, Dict, Optional
 import os
 
 # Load environment variables
@@ -15,6 +21,12 @@ load_dotenv()
 # Using the URL from tests or falling back to the environment variable
 API_URL = os.getenv("VITE_API_URL")
 
+SHARE_TOKEN_CACHE_TTL = int(os.getenv("SHARE_TOKEN_CACHE_TTL", "86400"))  # Tokens are immutable; this only bounds memory
+SHARE_TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("SHARE_TOKEN_CACHE_MAX_ENTRIES", "50000"))
+
+# share_token -> post_id
+share_token_cache = ResponseCache("share_token", maxsize=SHARE_TOKEN_CACHE_MAX_ENTRIES, ttl=SHARE_TOKEN_CACHE_TTL)
+
 def create_share(db: Session, user_id: int, post_id: int) -> Share:
     """Create a new share entry"""
     share_token = str(uuid.uuid4())
@@ -27,75 +39,86 @@ def create_share(db: Session, user_id: int, post_id: int) -> Share:
         created_at=created_at
     )
     db.add(new_share)
+    adjust_post_counters(db, post_id, share_count=1)
     db.commit()
     db.refresh(new_share)
     return new_share
 
-def get_post_by_share_token(db: Session, share_token: str):
-    """Get post details from share token"""
-    shared_post = db.query(Share).filter(Share.share_token == share_token).first()
-    if not shared_post:
-        raise HTTPException(status_code=404, detail="Invalid or expired share link")
+def load_post_with_attachments(db: Session, share_token: Optional[str] = None, post_id: Optional[int] = None) -> Optional[Post]:
+    """The post behind a share token (or id) with its author and attachments, in one joined query."""
+    query = db.query(Post).options(
+        joinedload(Post.user), joinedload(Post.media), joinedload(Post.documents), joinedload(Post.event)
+    )
+    if share_token is not None:
+        query = query.join(Share, Share.post_id == Post.id).filter(Share.share_token == share_token)
+    else:
+        query = query.filter(Post.id == post_id)
+    return query.first()
+
+def get_shared_post_payload(db: Session, share_token: str, viewer_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Resolve a share link to its post's cached payload. Tokens never change,
+    so token -> post id is cached for good; the payload lives in the post
+    cache, which every edit, delete, like and comment invalidates. A cold
+    link costs one query, a warm one none. Posts that are not published yet
+    are only shown to their author.
+    """
+    post_id = share_token_cache.get(share_token)
+    post = None
+    if post_id is None:
+        post = load_post_with_attachments(db, share_token=share_token)
+        if not post:
+            raise HTTPException(status_code=404, detail="Invalid or expired share link")
+        post_id = post.id
+        share_token_cache.set(share_token, post_id)
+
+    def load():
+        nonlocal post
+        if post is None:
+            post = load_post_with_attachments(db, post_id=post_id)
+        # Only published posts go in the shared post cache
+        return build_loaded_post_payload(post) if post and post.status == PostStatusEnum.PUBLISHED else None
 
-    post = db.query(Post).filter(Post.id == shared_post.post_id).first()
-    if not post:
+    payload = post_cache.get_or_set(post_id, load)
+    if payload is None and post is not None and viewer_id is not None and post.user_id == viewer_id:
+        payload = build_loaded_post_payload(post)
+    if payload is None:  # Deleted since the token was cached, or not published
         raise HTTPException(status_code=404, detail="Post not found.")
-    
-    return post
+    return payload
 
-def get_post_additional_data(db: Session, post: Post, current_user_id: int):
-    """Get additional data for a post based on its type"""
-    user_liked = db.query(Like).filter(
-        Like.post_id == post.id, 
-        Like.user_id == current_user_id
-    ).first() is not None
+def get_shared_post_response(db: Session, share_token: str, current_user_id: int) -> Dict[str, Any]:
+    """The shared post as the share page shows it, with the viewer's like status."""
+    payload = get_shared_post_payload(db, share_token, current_user_id)
+    post = render_post_payload(payload, False)  # Adds likes still in the counter buffer
+    author = post["user"]
+    liked_posts, _ = get_like_status(db, current_user_id, post_ids=[post["id"]])
 
     base_data = {
-        "id": post.id,
-        "post_type": post.post_type,
-        "content": post.content,
-        "created_at": post.created_at,
+        "id": post["id"],
+        "post_type": post["post_type"],
+        "content": post["content"],
+        "created_at": post["created_at"],
         "user": {
-            "id": post.user.id,
-            "username": post.user.username,
-            "profile_picture": f"{API_URL}/uploads/profile_pictures/{post.user.profile_picture}"
+            "id": author["id"],
+            "username": author["username"],
+            "profile_picture": _upload_url("profile_pictures", author["profile_picture"])
         },
-        "total_likes": post.like_count,
-        "user_liked": user_liked,
+        "total_likes": post["total_likes"],
+        "user_liked": post["id"] in liked_posts,
     }
 
-    type_specific_data = {
-        "media": lambda: get_media_data(db, post),
-        "document": lambda: get_document_data(db, post),
-        "event": lambda: get_event_data(db, post)
-    }
-
-    if post.post_type in type_specific_data:
-        base_data.update(type_specific_data[post.post_type]())
-
+    base_data.update(_with_upload_urls(payload["type_data"]))
     return base_data
 
-def get_media_data(db: Session, post: Post):
-    """Get media-specific post data"""
-    media = db.query(PostMedia).filter(PostMedia.post_id == post.id).first()
-    return {"media_url": f"{API_URL}/uploads/media/{media.media_url}" if media else None}
+def _upload_url(directory: str, value: Optional[str]) -> Optional[str]:
+    """Legacy file names live under the API's upload mounts; Cloudinary/Supabase and variant URLs are already absolute."""
+    if not value or value.startswith(("http://", "https://")):
+        return value
+    return f"{API_URL}/uploads/{directory}/{value}"
 
-def get_document_data(db: Session, post: Post):
-    """Get document-specific post data"""
-    document = db.query(PostDocument).filter(PostDocument.post_id == post.id).first()
-    return {"document_url": f"{API_URL}/uploads/document/{document.document_url}" if document else None}
-
-def get_event_data(db: Session, post: Post):
-    """Get event-specific post data"""
-    event = db.query(Event).filter(Event.post_id == post.id).first()
-    if not event:
-        return {}
-    
+def _with_upload_urls(type_data: dict) -> dict:
+    upload_dirs = {"media_url": "media", "document_url": "document"}
     return {
-        "event": {
-            "title": event.title,
-            "description": event.description,
-            "event_datetime": event.event_datetime,
-            "location": event.location
-        }
+        key: _upload_url(upload_dirs[key], value) if key in upload_dirs else value
+        for key, value in type_data.items()
     }
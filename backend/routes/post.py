@@ -1,6 +1,7 @@
 from uuid import uuid4
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, Form, File, UploadFile, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Form, File, UploadFile, Query, Request, Response, BackgroundTasks
+from fastapi.responses import StreamingResponse, JSONResponse
 from sqlalchemy.orm import Session
 from typing import Optional, List, Union
 import os
@@ -9,28 +10,34 @@ from pathlib import Path
 from datetime import datetime, timezone
 from api.v1.endpoints.auth import get_current_user
 from models.user import User
-from models.post import Post, PostMedia, PostDocument, Event, Like, Comment
+from models.post import Post, PostMedia, PostDocument, Event, Like, Comment, PostStatusEnum
 from schemas.post import PostResponse, MediaPostResponse, DocumentPostResponse, EventResponse, TextPostUpdate
-from database.session import SessionLocal
+from database.session import SessionLocal, unit_of_work
 from zoneinfo import ZoneInfo
 from sqlalchemy.orm import Session, joinedload
 import shutil
 from core.connection_crud import get_connections
 from crud.notification import create_notification
-from AI.moderation import moderate_text
+from AI.moderation import moderate_text, ensure_appropriate
 from services.services import   get_post_and_event, update_post_and_event, try_convert_datetime, format_updated_event_response
-from services.PostHandler import get_newer_posts, get_user_like_status, get_comments_for_post, create_post_entry, update_post_content , extract_hashtags, get_post_by_id
+from services.PostHandler import get_newer_posts, paginate_posts, paginate_ranked_posts, parse_post_ids, get_posts_by_ids, iter_posts_ndjson, get_post_version, get_post_versions, post_version, touch_post, get_user_like_status, get_comments_for_post, create_post_entry, update_post_content , extract_hashtags, get_post_by_id, visible_post_filter
 from services.FileHandler import remove_old_file_if_exists, save_upload_file, generate_secure_filename, validate_file_extension
-from services.NotificationHandler import send_post_notifications
+from services.NotificationHandler import deliver_post_notifications
+from services.TimelineHandler import fan_out_post, home_feed_readers, read_home_timeline, trim_timelines
+from services.FeedCache import feed_cache, feed_cache_key, feed_cache_scope, invalidate_feed_cache
+from services.PostCache import prepare_cached_post_response, prepare_cached_posts_response, invalidate_post_cache
+from services.DedupHandler import upload_to_cloudinary_deduplicated, upload_to_supabase_deduplicated, release_stored_files, purge_stored_files
+from services.ImageHandler import create_image_variants
+from utils.image_variants import variant_urls
+from services.PublishHandler import spool_upload, enqueue_publish, process_publish_job, get_publish_status, reset_failed_publish, unfinished_spool_path
 from services.PostTypeHandler import get_post_additional_data
 from models.hashtag import Hashtag
 from models.university import University
 from dotenv import load_dotenv
 import os
-from utils.cloudinary import upload_to_cloudinary
-from utils.post_utils import validate_post_ownership, prepare_post_response, handle_media_upload, create_base_post
+from utils.post_utils import validate_post_ownership, prepare_post_response, prepare_posts_response, handle_media_upload, create_base_post
 from services.EventHandler import create_event_post as create_event_post_entry, format_event_response, handle_event_upload, update_event_post as update_event_post_entry
-from utils.supabase import upload_file_to_supabase
+from utils.etag import weak_etag, etag_matches, not_modified
 
 # Load environment variables
 load_dotenv()
@@ -63,121 +70,306 @@ ALLOWED_DOCS = {".pdf", ".docx", ".txt", ".pptx"}
 
 
 
+def _select_feed_posts(
+    db: Session,
+    current_user: User,
+    limit: int,
+    offset: int,
+    last_seen_post: Optional[int],
+    user_id: Optional[int],
+    cursor: Optional[str],
+    feed: str,
+    rank: str
+) -> tuple[List[Post], Optional[str]]:
+    if feed == "home":
+        if offset:
+            raise HTTPException(status_code=400, detail="The home feed is cursor-only; pass next_cursor as cursor")
+        return read_home_timeline(db, current_user.id, limit, cursor)
+
+    # ✅ Get the posts query with the optional filter for newer posts
+    query = get_newer_posts(last_seen_post, db)
+
+    if user_id:
+        query = query.filter(Post.user_id == user_id)
+
+    # ✅ Apply pagination
+    paginate = paginate_ranked_posts if rank == "engagement" else paginate_posts
+    return paginate(query, limit, cursor=cursor, offset=offset)
+
+
 # Main function refactor
 @router.get("/")
 def get_posts(
+    request: Request,
+    response: Response,
     limit: int = Query(10, alias="limit"),  # Default to 10 posts
     offset: int = Query(0, alias="offset"),  # Start at 0
     last_seen_post: Optional[int] = Query(None, alias="last_seen"),  # Last post ID seen
     user_id: Optional[int] = Query(None, alias="user_id"),  # User ID to filter posts (for profile)
+    cursor: Optional[str] = Query(None, alias="cursor"),  # Opaque cursor from a previous page's next_cursor
+    feed: str = Query("all", alias="feed"),  # "home" reads the viewer's materialized timeline
+    rank: str = Query("recent", alias="rank"),  # "engagement" orders by the stored time-decayed engagement score
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     ✅ Fetch posts with pagination.
+    ✅ If `cursor` is provided, fetch the page after it (keyset pagination, stable under equal timestamps).
     ✅ If `last_seen_post` is provided, fetch **newer** posts than the last seen post.
+    ✅ If `feed=home`, read the viewer's home timeline (own posts + connections') instead of all posts.
+       The home feed pages by `cursor` only; `offset` is rejected there.
+    ✅ If `rank=engagement`, order by engagement score instead of recency (home feed stays chronological).
     ✅ Include total likes, user liked status, and comments for each post.
+    ✅ Which posts a page holds is cached until a post that could be on it is created, published or deleted; the posts
+       themselves come from the post cache, so likes and comments show up without dropping the page.
+    ✅ Every page carries a weak ETag over its posts' versions, read before the posts are rendered;
+       `If-None-Match` with the current one gets a 304 without hydrating the page.
     """
+    if_none_match = request.headers.get("if-none-match")
+    cache_key = feed_cache_key(
+        current_user.id, limit=limit, offset=offset, last_seen=last_seen_post,
+        user_id=user_id, cursor=cursor, feed=feed, rank=rank
+    )
 
-    # ✅ Get the posts query with the optional filter for newer posts
-    query = get_newer_posts(last_seen_post, db)
+    selected = []
 
-    if user_id:
-        query = query.filter(Post.user_id == user_id)
-    
-    # ✅ Apply pagination
-    posts = query.order_by(Post.created_at.desc()).offset(offset).limit(limit).all()
+    def load_page():
+        posts, next_cursor = _select_feed_posts(
+            db, current_user, limit, offset, last_seen_post, user_id, cursor, feed, rank
+        )
+        selected.extend(posts)  # Lets a miss build its payloads from the rows already loaded
+        return {"post_ids": [post.id for post in posts], "next_cursor": next_cursor}
+
+    page = feed_cache.get_or_set(cache_key, load_page, scope=feed_cache_scope(current_user.id, feed, user_id))
+    if selected:
+        versions = [post_version(post) for post in selected]
+    else:
+        versions = get_post_versions(db, page["post_ids"], current_user.id)
+    etag = weak_etag(current_user.id, versions, page["next_cursor"])
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    post_list = prepare_cached_posts_response(db, page["post_ids"], current_user, selected or None)
 
-    post_list = [prepare_post_response(post, current_user, db) for post in posts]
+    response.headers["ETag"] = etag
+    return {"posts": post_list, "count": len(post_list), "next_cursor": page["next_cursor"]}
 
-    return {"posts": post_list, "count": len(post_list)}
 
+@router.get("/cache/stats")
+def get_feed_cache_stats(current_user: User = Depends(get_current_user)):
+    """Hit/miss counters for sizing the feed cache."""
+    return feed_cache.stats()
+
+
+@router.get("/batch")
+def get_posts_batch(
+    ids: str = Query(..., alias="ids"),  # Comma separated post ids, e.g. ?ids=4,8,15
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Fetch several posts in one call, for views that start from an id list
+    (university, department, hashtag and event listings).
+    Posts come back in the requested order; ids that do not exist or are not published yet are listed in `missing`.
+    """
+    post_ids = parse_post_ids(ids)
+    posts, missing = get_posts_by_ids(post_ids, db, current_user.id)
+    return {"posts": prepare_posts_response(posts, current_user, db), "missing": missing}
+
+
+@router.get("/{post_id}/status")
+def get_post_status(
+    post_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Publish state of one of the caller's posts: processing, published or failed (with the last error)."""
+    return get_publish_status(db, post_id, current_user.id)
+
+
+@router.post("/{post_id}/publish/retry", status_code=202)
+def retry_post_publish(
+    post_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Queue another round of upload attempts for a post whose background publish failed."""
+    job = reset_failed_publish(db, post_id, current_user.id)
+    background_tasks.add_task(process_publish_job, job.id)
+    invalidate_post_cache(post_id)
+    return {"post_id": post_id, "status": PostStatusEnum.PROCESSING.value, "status_url": f"/posts/{post_id}/status"}
 
 
 @router.get("/{post_id}")
 def get_single_post(
     post_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    post = db.query(Post).filter(Post.id == post_id).first()
+    version = get_post_version(db, post_id, current_user.id)
+
+    if not version:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    etag = weak_etag(current_user.id, version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
 
-    if not post:
+    post_response = prepare_cached_post_response(db, post_id, current_user)
+    if post_response is None:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    return prepare_post_response(post, current_user, db)
+    response.headers["ETag"] = etag
+    return post_response
+
+
+async def _publish_in_background(
+    background_tasks: BackgroundTasks,
+    db: Session,
+    current_user: User,
+    content: Optional[str],
+    upload_file: UploadFile,
+    ext: str,
+    kind: str
+) -> JSONResponse:
+    """Spool the file, save the post as PROCESSING and leave upload + notifications to a background task."""
+    spool_path = await spool_upload(upload_file, current_user.id, ext)
+    create_post = create_base_post if kind == "media" else create_post_entry
+    with unit_of_work(db):
+        post = create_post(db, current_user.id, content, kind, status=PostStatusEnum.PROCESSING)
+        job = enqueue_publish(db, post, kind, spool_path, ext)
+    background_tasks.add_task(process_publish_job, job.id)
+    return JSONResponse(
+        status_code=202,
+        content={"post_id": post.id, "status": PostStatusEnum.PROCESSING.value, "status_url": f"/posts/{post.id}/status"}
+    )
+
+
+async def _store_media(db: Session, media_file: UploadFile, ext: str) -> tuple[str, Optional[dict], str]:
+    """
+    Upload a media file and its resized variants before the post's transaction
+    opens. Each reference is committed as soon as it is taken, so neither a
+    transaction nor a stored_files row lock is held across a remote round trip.
+    Returns the URL, the variant URLs and the resource type.
+    """
+    upload_result = await handle_media_upload(media_file, "noobsquad/media_uploads", db)
+    db.commit()
+    variants = await create_image_variants(media_file.file, ext, "noobsquad/media_uploads")
+    return upload_result["secure_url"], variants, upload_result["resource_type"]
+
+
+async def _give_back_uploads(db: Session, urls: List[str]) -> None:
+    """Drop the references uploads took for a post whose transaction failed."""
+    db.rollback()
+    released = release_stored_files(db, urls)
+    db.commit()
+    await purge_stored_files(released)
 
 
 @router.post("/create_media_post/", response_model=MediaPostResponse)
 async def create_media_post(
+    background_tasks: BackgroundTasks,
     content: Optional[str] = Form(None),
     media_file: UploadFile = File(...),
+    publish: str = Form("sync"),  # "async" returns 202 at once and uploads in the background
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new media post."""
     # Validate file extension
     ext = validate_file_extension(media_file.filename, ALLOWED_MEDIA)
+    ensure_appropriate(content, "post")  # Before anything is uploaded; the verdict is cached for create_base_post
+
+    if publish == "async":
+        return await _publish_in_background(background_tasks, db, current_user, content, media_file, ext, "media")
     
     # Upload media to cloudinary
-    upload_result = await handle_media_upload(media_file, "noobsquad/media_uploads")
-    
-    # Create post
-    post = create_base_post(db, current_user.id, content, "media")
-    
-    # Create media entry
-    media_entry = PostMedia(
-        post_id=post.id,
-        media_url=upload_result["secure_url"],
-        media_type=ext
-    )
-    db.add(media_entry)
-    db.commit()
-    db.refresh(media_entry)
-    
-    # Send notifications
-    send_post_notifications(db, current_user, post)
+    media_url, variants, _ = await _store_media(db, media_file, ext)
+
+    try:
+        with unit_of_work(db):
+            # Create post
+            post = create_base_post(db, current_user.id, content, "media")
+
+            # Create media entry
+            media_entry = PostMedia(
+                post_id=post.id,
+                media_url=media_url,
+                media_type=ext,
+                variants=variants
+            )
+            db.add(media_entry)
+            recipients = fan_out_post(db, current_user, post)
+    except Exception:
+        await _give_back_uploads(db, [media_url] + variant_urls(variants))
+        raise
+
+    # Notify connections after the response is sent
+    background_tasks.add_task(deliver_post_notifications, current_user.id, post.id)
+    background_tasks.add_task(trim_timelines, recipients)
+    invalidate_feed_cache(current_user.id, home_feed_readers(db, current_user, recipients))
     return media_entry
 
 
 @router.post("/create_document_post/", response_model=DocumentPostResponse)
 async def create_document_post(
+    background_tasks: BackgroundTasks,
     content: Optional[str] = Form(None),
     document_file: UploadFile = File(...),
+    publish: str = Form("sync"),  # "async" returns 202 at once and uploads in the background
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new document post."""
     # Validate file extension
     ext = validate_file_extension(document_file.filename, ALLOWED_DOCS)
+    ensure_appropriate(content, "post")  # Before anything is uploaded; the verdict is cached for create_base_post
+
+    if publish == "async":
+        return await _publish_in_background(background_tasks, db, current_user, content, document_file, ext, "document")
     
     # Generate filename and save file
     filename = generate_secure_filename(current_user.id, ext)
 
-    # Upload to Supabase
-    document_url = await upload_file_to_supabase(document_file, filename, section="upload_documents")
-    
-    # Create post and document entries
-    post = create_post_entry(db, current_user.id, content, "document")
-    doc_entry = PostDocument(post_id=post.id, document_url=document_url, document_type=ext)
-    db.add(doc_entry)
+    # Upload to Supabase (skipped if the same file is already stored), before the post's transaction opens
+    document_url = await upload_to_supabase_deduplicated(db, document_file, filename, section="upload_documents")
     db.commit()
-    db.refresh(doc_entry)
-    
-    # Send notifications
-    send_post_notifications(db, current_user, post)
+
+    try:
+        with unit_of_work(db):
+            # Create post and document entries
+            post = create_post_entry(db, current_user.id, content, "document")
+            doc_entry = PostDocument(post_id=post.id, document_url=document_url, document_type=ext)
+            db.add(doc_entry)
+            recipients = fan_out_post(db, current_user, post)
+    except Exception:
+        await _give_back_uploads(db, [document_url])
+        raise
+
+    # Notify connections after the response is sent
+    background_tasks.add_task(deliver_post_notifications, current_user.id, post.id)
+    background_tasks.add_task(trim_timelines, recipients)
+    invalidate_feed_cache(current_user.id, home_feed_readers(db, current_user, recipients))
     return doc_entry
 
 
 @router.post("/create_text_post/", response_model=PostResponse)
 async def create_text_post(
+    background_tasks: BackgroundTasks,
     content: str = Form(...),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new text post."""
-    post = create_base_post(db, current_user.id, content, "text")
-    send_post_notifications(db, current_user, post)
+    with unit_of_work(db):
+        post = create_base_post(db, current_user.id, content, "text")
+        recipients = fan_out_post(db, current_user, post)
+    background_tasks.add_task(deliver_post_notifications, current_user.id, post.id)
+    background_tasks.add_task(trim_timelines, recipients)
+    invalidate_feed_cache(current_user.id, home_feed_readers(db, current_user, recipients))
     
     # Add required fields for response
     post.comment_count = 0  # New post has no comments
@@ -188,6 +380,7 @@ async def create_text_post(
 
 @router.post("/create_event_post/", response_model=EventResponse)
 async def create_event_post(
+    background_tasks: BackgroundTasks,
     content: Optional[str] = Form(None),
     event_title: str = Form(...),
     event_description: str = Form(...),
@@ -208,21 +401,33 @@ async def create_event_post(
         "user_timezone": user_timezone,
         "location": location
     }
+    ensure_appropriate(content, "post")  # Before the image is uploaded
     upload_result = await handle_event_upload(event_image, "noobsquad/event_media_uploads")
-    post, event = create_event_post_entry(
-        db=db,
-        user_id=current_user.id,
-        content=content,
-        event_data=event_data,
-        image_url=upload_result
-    )
+    with unit_of_work(db):
+        post, event = create_event_post_entry(
+            db=db,
+            user_id=current_user.id,
+            content=content,
+            event_data=event_data,
+            image_url=upload_result
+        )
+        recipients = fan_out_post(db, current_user, post)
     
-    send_post_notifications(db, current_user, post)
+    background_tasks.add_task(deliver_post_notifications, current_user.id, post.id)
+    background_tasks.add_task(trim_timelines, recipients)
+    invalidate_feed_cache(current_user.id, home_feed_readers(db, current_user, recipients))
     return format_event_response(post, event)
 
 @router.get("/posts/")
-def get_posts(user_id: Optional[int] = None, db: Session = Depends(get_db)):
-    query = db.query(Post)
+def get_posts(
+    user_id: Optional[int] = None,
+    stream: bool = Query(False, alias="stream"),  # NDJSON, one post per line, with bounded memory
+    db: Session = Depends(get_db)
+):
+    if stream:
+        return StreamingResponse(iter_posts_ndjson(user_id), media_type="application/x-ndjson")
+
+    query = db.query(Post).filter(visible_post_filter())
     if user_id:
         query = query.filter(Post.user_id == user_id)
     return query.all()
@@ -236,10 +441,10 @@ async def update_text_post(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    post = get_post_by_id(db, post_id, current_user.id)
-    update_post_content(post, update_data.content)
-    db.commit()
-    db.refresh(post)
+    with unit_of_work(db):
+        post = get_post_by_id(db, post_id, current_user.id)
+        update_post_content(post, update_data.content)
+    invalidate_post_cache(post_id)
     return post
 
 
@@ -253,36 +458,44 @@ async def update_media_post(
     db: Session = Depends(get_db),
 ):
     post = get_post_by_id(db, post_id, current_user.id)
-    update_post_content(post, content)
-
+    uploaded = None
     if media_file and media_file.filename:
         ext = validate_file_extension(media_file.filename, ALLOWED_MEDIA)
-        
-        upload_result = upload_to_cloudinary(
-            media_file.file,
-            folder_name="noobsquad/media_uploads"
-        )
-
-        secure_url = upload_result["secure_url"]
-        resource_type = upload_result["resource_type"]
-
-        media_entry = db.query(PostMedia).filter(PostMedia.post_id == post.id).first()
-        if media_entry:
-            # (Optional) Here you can delete old Cloudinary media if you want
-            media_entry.media_url = secure_url
-            media_entry.media_type = resource_type  # You can also keep ext if needed
-        else:
-            media_entry = PostMedia(
-                post_id=post.id,
-                media_url=secure_url,
-                media_type=ext
-            )
-            db.add(media_entry)
+        uploaded = await _store_media(db, media_file, ext)
 
-        db.commit()
+    released = []
+    try:
+        with unit_of_work(db):
+            post = get_post_by_id(db, post_id, current_user.id)
+            update_post_content(post, content)
+
+            if uploaded:
+                secure_url, variants, resource_type = uploaded
+
+                media_entry = db.query(PostMedia).filter(PostMedia.post_id == post.id).first()
+                if media_entry:
+                    released = release_stored_files(db, [media_entry.media_url] + variant_urls(media_entry.variants))
+                    media_entry.media_url = secure_url
+                    media_entry.media_type = resource_type  # You can also keep ext if needed
+                    media_entry.variants = variants
+                else:
+                    media_entry = PostMedia(
+                        post_id=post.id,
+                        media_url=secure_url,
+                        media_type=ext,
+                        variants=variants
+                    )
+                    db.add(media_entry)
+
+                touch_post(post)
+    except Exception:
+        if uploaded:
+            await _give_back_uploads(db, [uploaded[0]] + variant_urls(uploaded[1]))
+        raise
+    await purge_stored_files(released)
 
-    db.refresh(post)
     media_url = db.query(PostMedia).filter(PostMedia.post_id == post.id).first().media_url
+    invalidate_post_cache(post_id)
 
     return {
         "message": "Media post updated successfully",
@@ -305,28 +518,40 @@ async def update_document_post(
     db: Session = Depends(get_db),
 ):
     post = get_post_by_id(db, post_id, current_user.id)
-    update_post_content(post, content)
-
+    document_url = None
     if document_file and document_file.filename:
         ext = validate_file_extension(document_file.filename, ALLOWED_DOCS)
         filename = generate_secure_filename(current_user.id, ext)
-        
-        # Upload to Supabase
-        document_url = await upload_file_to_supabase(document_file, filename, section="upload_documents")
-
-        doc_entry = db.query(PostDocument).filter(PostDocument.post_id == post.id).first()
-        if doc_entry:
-            # No need to remove old file as Supabase handles versioning
-            doc_entry.document_url = document_url
-            doc_entry.document_type = ext
-        else:
-            doc_entry = PostDocument(post_id=post.id, document_url=document_url, document_type=ext)
-            db.add(doc_entry)
 
+        # Upload to Supabase (skipped if the same file is already stored), before the post's transaction opens
+        document_url = await upload_to_supabase_deduplicated(db, document_file, filename, section="upload_documents")
         db.commit()
 
-    db.refresh(post)
+    released = []
+    try:
+        with unit_of_work(db):
+            post = get_post_by_id(db, post_id, current_user.id)
+            update_post_content(post, content)
+
+            if document_url:
+                doc_entry = db.query(PostDocument).filter(PostDocument.post_id == post.id).first()
+                if doc_entry:
+                    released = release_stored_files(db, [doc_entry.document_url])
+                    doc_entry.document_url = document_url
+                    doc_entry.document_type = ext
+                else:
+                    doc_entry = PostDocument(post_id=post.id, document_url=document_url, document_type=ext)
+                    db.add(doc_entry)
+
+                touch_post(post)
+    except Exception:
+        if document_url:
+            await _give_back_uploads(db, [document_url])
+        raise
+    await purge_stored_files(released)
+
     document_url = db.query(PostDocument).filter(PostDocument.post_id == post.id).first().document_url
+    invalidate_post_cache(post_id)
 
     return {
         "message": "Document post updated successfully",
@@ -375,7 +600,9 @@ async def update_event_post(
         "location": location
     }
     
-    post, event = update_event_post_entry(db, post, event, update_data)
+    with unit_of_work(db):
+        post, event = update_event_post_entry(db, post, event, update_data)
+    invalidate_post_cache(post_id)
     return format_event_response(post, event)
 
 
@@ -386,8 +613,20 @@ async def delete_post(
     db: Session = Depends(get_db)
 ):
     post = get_post_by_id(db, post_id, current_user.id)
-    db.delete(post)
-    db.commit()
+    spool_path = unfinished_spool_path(db, post_id)  # Its job row goes with the post
+    readers = home_feed_readers(db, current_user)
+    with unit_of_work(db):
+        released = release_stored_files(
+            db,
+            [url for media in post.media for url in [media.media_url] + variant_urls(media.variants)]
+            + [document.document_url for document in post.documents]
+        )
+        db.delete(post)
+    await purge_stored_files(released)
+    if spool_path:
+        remove_old_file_if_exists(spool_path)
+    invalidate_feed_cache(current_user.id, readers)
+    invalidate_post_cache(post_id)
     return {"message": "Post deleted successfully"}
 
 @router.get("/events/", response_model=Union[List[EventResponse], EventResponse])
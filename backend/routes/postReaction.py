@@ -5,18 +5,19 @@ from models.post import Like, Comment, Share, Post, Event, EventAttendee
 from models.user import User
 from schemas.post import PostResponse
 from database.session import SessionLocal
-from schemas.postReaction import LikeCreate, LikeResponse, CommentCreate, ShareResponse, CommentNestedResponse, ShareCreate
+from schemas.postReaction import LikeCreate, LikeResponse, LikeStatusRequest, LikeStatusResponse, CommentCreate, ShareResponse, CommentNestedResponse, ShareCreate
 from schemas.eventAttendees import EventAttendeeCreate, EventAttendeeResponse
 from api.v1.endpoints.auth import get_current_user
 from datetime import datetime
 import uuid  # Secure share token
-from typing import List
+from typing import List, Optional
+import os
 from models.user import User
 from models.post import Post, PostMedia, PostDocument, Event, Like, Comment
 from zoneinfo import ZoneInfo
 from crud.notification import create_notification
 from schemas.notification import NotificationCreate
-from services.reaction import get_like_count, add_like, remove_like, notify_if_not_self, build_comment_response
+from services.reaction import toggle_like, notify_if_not_self, load_comment_tree, load_replies, update_comment_count
 from models.post import Like, Comment, Share, Post, Event, EventAttendee
 from schemas.post import PostResponse
 from database.session import SessionLocal
@@ -27,17 +28,24 @@ from .PostReaction.CommentHelperFunc import get_comment_by_id, get_post_by_id
 from schemas.postReaction import ShareResponse, ShareCreate
 from .PostReaction.ShareHandler import (
     create_share,
-    get_post_by_share_token,
-    get_post_additional_data
+    get_shared_post_response
 )
 from models.post import Like, Comment, Share, Post, Event, EventAttendee
 from schemas.postReaction import LikeCreate, LikeResponse, CommentCreate, ShareResponse, CommentNestedResponse, ShareCreate
 from schemas.eventAttendees import EventAttendeeCreate, EventAttendeeResponse
 from models.post import Post, PostMedia, PostDocument, Event, Like, Comment
+from AI.moderation import ensure_appropriate
+from services.PostCache import invalidate_post_cache
+from services.LikeCounterBuffer import LIKE_COUNTER_BUFFER, like_counter_buffer
+from services.LikeStatusCache import get_like_status, record_like_status, validate_like_status_request
 from .PostReaction.AttendeeHelperFunction import get_event_by_id, update_or_create_rsvp, count_rsvp_status, get_user_rsvp
 
 router = APIRouter()
 
+COMMENT_PAGE_SIZE = int(os.getenv("COMMENT_PAGE_SIZE", "20"))  # Root comments (or replies) per page by default
+COMMENT_PAGE_MAX_SIZE = int(os.getenv("COMMENT_PAGE_MAX_SIZE", "100"))
+COMMENT_REPLIES_PREVIEW = int(os.getenv("COMMENT_REPLIES_PREVIEW", "3"))  # Replies loaded with each root
+
 def get_db():
     db = SessionLocal()
     try:
@@ -54,52 +62,51 @@ def like_action(
     if not like_data.post_id and not like_data.comment_id:
         raise HTTPException(status_code=400, detail="Either post_id or comment_id must be provided.")
 
-    existing_like = db.query(Like).filter(
-        Like.user_id == current_user.id,
-        Like.post_id == like_data.post_id,
-        Like.comment_id == like_data.comment_id
-    ).first()
-
-    total_likes = get_like_count(db, like_data)
-
-    if existing_like:
-        response = {
-            "id": existing_like.id,
-            "user_id": existing_like.user_id,
-            "post_id": existing_like.post_id,
-            "comment_id": existing_like.comment_id,
-            "created_at": existing_like.created_at,
-            "total_likes": max(0, total_likes - 1),
-            "user_liked": False,
-            "message": "Like removed"
-        }
-        remove_like(existing_like, db, like_data)
-        return response
-
-    new_like = add_like(like_data, db, current_user)
-
-    if like_data.post_id:
-        post = db.query(Post).filter(Post.id == like_data.post_id).first()
-        if post:
-            notify_if_not_self(db, current_user.id, post.user_id, "like", post.id)
-
-    total_likes = get_like_count(db, like_data)
+    buffered = LIKE_COUNTER_BUFFER and bool(like_data.post_id)
+    like = toggle_like(db, current_user.id, like_data, buffered=buffered)
+    if like is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Post not found." if like_data.post_id else "Comment not found.")
+    db.commit()
+    if buffered:
+        # The row still has the last flushed count; show it with this and every other pending like
+        like["like_count"] = max((like["like_count"] or 0) + like_counter_buffer.add(like_data.post_id, like["delta"]), 0)
+    invalidate_post_cache(like_data.post_id)
+    record_like_status(current_user.id, like_data.post_id, like_data.comment_id, like["user_liked"])
+
+    if like["created"] and like_data.post_id:
+        notify_if_not_self(db, current_user.id, like["owner_id"], "like", like_data.post_id)
+
+    return {
+        "id": like["id"],
+        "user_id": current_user.id,
+        "post_id": like_data.post_id,
+        "comment_id": like_data.comment_id,
+        "created_at": like["created_at"],
+        "total_likes": like["like_count"],
+        "user_liked": like["user_liked"],
+        "message": "Like added successfully" if like["user_liked"] else "Like removed"
+    }
 
+@router.post("/likes/status", response_model=LikeStatusResponse)
+def like_status(
+    status_request: LikeStatusRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Whether the caller likes each of the given posts and comments, answered with at most one query."""
+    validate_like_status_request(status_request.post_ids, status_request.comment_ids)
+    liked_posts, liked_comments = get_like_status(db, current_user.id, status_request.post_ids, status_request.comment_ids)
     return {
-        "id": new_like.id,
-        "user_id": new_like.user_id,
-        "post_id": new_like.post_id,
-        "comment_id": new_like.comment_id,
-        "created_at": new_like.created_at,
-        "total_likes": total_likes,
-        "user_liked": True,
-        "message": "Like added successfully"
+        "posts": {post_id: post_id in liked_posts for post_id in status_request.post_ids},
+        "comments": {comment_id: comment_id in liked_comments for comment_id in status_request.comment_ids},
     }
 
 @router.post("/{post_id}/comment", response_model=CommentNestedResponse)
 def comment_post(comment_data: CommentCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     if comment_data.parent_id:
         raise HTTPException(status_code=400, detail="Root comment cannot have a parent_id.")
+    ensure_appropriate(comment_data.content, "comment")
     
     new_comment = Comment(
         user_id=current_user.id,
@@ -108,8 +115,10 @@ def comment_post(comment_data: CommentCreate, db: Session = Depends(get_db), cur
         created_at=datetime.now(ZoneInfo("UTC"))
     )
     db.add(new_comment)
+    update_comment_count(db, comment_data.post_id, 1)
     db.commit()
     db.refresh(new_comment)
+    invalidate_post_cache(new_comment.post_id)
     
     notify_if_not_self(db, current_user.id, new_comment.post.user_id, "comment", new_comment.post_id)
     
@@ -122,6 +131,7 @@ def reply_comment(comment_data: CommentCreate, db: Session = Depends(get_db), cu
     
     if parent.parent_id:
         raise HTTPException(status_code=400, detail="Cannot reply to a reply. Max depth reached.")
+    ensure_appropriate(comment_data.content, "comment")
     
     reply = Comment(
         user_id=current_user.id,
@@ -131,18 +141,55 @@ def reply_comment(comment_data: CommentCreate, db: Session = Depends(get_db), cu
         created_at=datetime.now(ZoneInfo("UTC"))
     )
     db.add(reply)
+    update_comment_count(db, parent.post_id, 1)
     db.commit()
     db.refresh(reply)
+    invalidate_post_cache(reply.post_id)
 
     notify_if_not_self(db, current_user.id, parent.user_id, "reply", reply.post_id)
 
     return reply
 
 
+@router.delete("/comments/{comment_id}")
+def delete_comment(comment_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    comment = get_comment_by_id(db, comment_id)
+    if comment.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="You can only delete your own comments.")
+
+    removed = 1 + db.query(Comment).filter(Comment.parent_id == comment.id).count()  # Replies cascade with it
+    if comment.post_id:
+        update_comment_count(db, comment.post_id, -removed)
+    db.delete(comment)
+    db.commit()
+    invalidate_post_cache(comment.post_id)
+
+    return {"message": "Comment deleted successfully"}
+
+
 @router.get("/{post_id}/comments")
-def get_comments(post_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    parent_comments = db.query(Comment).filter(Comment.post_id == post_id, Comment.parent_id == None).all()
-    return {"comments": [build_comment_response(comment, db, current_user) for comment in parent_comments]}
+def get_comments(
+    post_id: int,
+    limit: int = Query(COMMENT_PAGE_SIZE, ge=1, le=COMMENT_PAGE_MAX_SIZE),  # Root comments per page
+    cursor: Optional[str] = Query(None),  # Opaque cursor from a previous page's next_cursor
+    replies: int = Query(COMMENT_REPLIES_PREVIEW, ge=0, le=COMMENT_PAGE_MAX_SIZE),  # Replies shown under each root
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Root comments oldest first, each with its first replies; follow `next_cursor` for more roots."""
+    return load_comment_tree(db, post_id, current_user, limit, cursor, replies)
+
+
+@router.get("/comments/{comment_id}/replies")
+def get_replies(
+    comment_id: int,
+    limit: int = Query(COMMENT_PAGE_SIZE, ge=1, le=COMMENT_PAGE_MAX_SIZE),
+    cursor: Optional[str] = Query(None),  # A root's replies_next_cursor, then each page's next_cursor
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Load more replies of one thread."""
+    return load_replies(db, comment_id, current_user, limit, cursor)
 
 
 # ✅ Share a Post with a Unique Link (Stored)
@@ -155,6 +202,7 @@ def share_post(share_data: ShareCreate, db: Session = Depends(get_db), current_u
     
     # Create share entry
     new_share = create_share(db, current_user.id, share_data.post_id)
+    invalidate_post_cache(new_share.post_id)
     share_link = f"http://localhost:5173/share/{new_share.share_token}"
 
     # Notify post owner if different from current user
@@ -172,11 +220,8 @@ def share_post(share_data: ShareCreate, db: Session = Depends(get_db), current_u
 
 @router.get("/share/{share_token}")
 def get_shared_post(share_token: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    # Get post from share token
-    post = get_post_by_share_token(db, share_token)
-    
-    # Get post data with type-specific information
-    return get_post_additional_data(db, post, current_user.id)
+    # Token and payload come from cache; a cold link is one joined query
+    return get_shared_post_response(db, share_token, current_user.id)
 
 
 @router.post("/event/{event_id}/rsvp", response_model=EventAttendeeResponse)
@@ -13,7 +13,10 @@ from pathlib import Path
 import secrets
 from core.dependencies import get_db
 from dotenv import load_dotenv
-from utils.cloudinary import upload_to_cloudinary
+from services.DedupHandler import upload_to_cloudinary_deduplicated, release_stored_files, purge_stored_files
+from services.ImageHandler import create_image_variants
+from utils.image_variants import variant_urls
+from services.HashtagHandler import university_matcher
 
 # Load environment variables
 load_dotenv()
@@ -41,6 +44,7 @@ def get_or_create_university(db: Session, uni_name: str, dept_name: str):
         db.add(new_uni)
         db.commit()
         db.refresh(new_uni)
+        university_matcher.invalidate()  # Its name is a linkable hashtag from now on
         return new_uni
 
     # University exists — add department if not already present
@@ -92,7 +96,7 @@ def complete_profile_step1(
 
 
 @router.post("/upload_picture")
-def upload_profile_picture(
+async def upload_profile_picture(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -111,21 +115,27 @@ def upload_profile_picture(
             detail="Invalid file type. Allowed: jpg, jpeg, png, gif, webp."
         )
 
-    # ✅ Upload directly to Cloudinary
-    upload_result = upload_to_cloudinary(
-        file.file,  # sending the file object
-        folder_name="noobsquad/profile_pictures"
-    )
+    # The picture being replaced; its stored files are released once the new one is saved
+    old_urls = [db_user.profile_picture] if db_user.profile_picture else []
+    old_urls += variant_urls(db_user.profile_picture_variants)
+
+    # ✅ Upload to Cloudinary (skipped if the same image is already stored)
+    upload_result = await upload_to_cloudinary_deduplicated(db, file.file, "noobsquad/profile_pictures")
 
     secure_url = upload_result["secure_url"]  # Cloudinary secure URL
     # resource_type = upload_result["resource_type"]  # optional if you want to store type
+    variants = await create_image_variants(file.file, file_extension, "noobsquad/profile_pictures")
 
     # ✅ Update database
     db_user.profile_picture = secure_url  # Save Cloudinary URL directly
+    db_user.profile_picture_variants = variants  # Avatars are served from these resized copies
+    released = release_stored_files(db, old_urls)
     db.commit()
     db.refresh(db_user)
+    await purge_stored_files(released)
 
     return {
         "profile_url": secure_url,
+        "profile_variants": variants,
         "profile_completed": db_user.profile_completed
     }
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 
 class LikeCreate(BaseModel):
     post_id: Optional[int] = None
@@ -22,6 +22,14 @@ class LikeResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class LikeStatusRequest(BaseModel):
+    post_ids: List[int] = []
+    comment_ids: List[int] = []
+
+class LikeStatusResponse(BaseModel):
+    posts: Dict[int, bool]  # Requested post id -> liked by the caller
+    comments: Dict[int, bool]
+
 class CommentCreate(BaseModel):
     post_id: int
     content: str
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import List, Optional
 from fastapi import Form
+from utils.image_variants import avatar_url
 
 # ✅ Base User Schema
 class UserBase(BaseModel):
@@ -54,7 +55,7 @@ class UserResponse(BaseModel):
             username=user.username,
             email=user.email,
             is_active=user.is_active,
-            profile_picture=user.profile_picture,
+            profile_picture=avatar_url(user, "feed"),
             university_name=user.university_name,
             department=user.department,
             fields_of_interest=user.fields_of_interest.split(",") if user.fields_of_interest else [],
@@ -0,0 +1,40 @@
+"""
+Materialize the home timeline of users whose posts and connections predate
+fan-out on write, so `feed=home` does not read as empty for them. Recomputes
+User.connection_count first, since it decides which authors are fanned out.
+Safe to re-run: existing entries are kept.
+
+    python -m scripts.backfill_timelines --batch 200
+"""
+import argparse
+
+from database.session import SessionLocal
+# Every mapped model must be imported before the first query so relationships resolve
+from models import chat, collaboration_request, connection, hashtag, notifications, post, publish_job, research_collaboration, research_paper, stored_file, timeline, university, user  # noqa: F401
+from models.user import User
+from core.connection_crud import reconcile_connection_counts
+from services.TimelineHandler import backfill_home_timeline
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch", type=int, default=200, help="timelines written per commit")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        corrected = reconcile_connection_counts(db)
+        print(f"connection_count corrected on {corrected} user(s)")
+
+        user_ids = [user_id for (user_id,) in db.query(User.id).order_by(User.id).all()]
+        for start in range(0, len(user_ids), args.batch):
+            for user_id in user_ids[start:start + args.batch]:
+                backfill_home_timeline(db, user_id)
+            db.commit()
+        print(f"home timeline backfilled for {len(user_ids)} user(s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Measure likes per second on a single hot post, with like_count updated in
+the toggle statement (every like waits for the post's row lock) and with the
+write-behind counter buffer (likes only write their own row; the count is
+applied in one UPDATE per flush). Seeds a post and --users likers in
+DATABASE_URL (use a scratch database) and removes everything afterwards.
+
+    python -m scripts.bench_hot_post_likes --users 2000 --threads 16
+
+Keep --threads within the engine's pool (5 + 10 overflow by default) or the
+threads also queue for connections.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import delete, insert
+from database.session import SessionLocal
+# Every mapped model must be imported before the first query so relationships resolve
+from models import chat, collaboration_request, connection, hashtag, notifications, post, publish_job, research_collaboration, research_paper, stored_file, timeline, university, user  # noqa: F401
+from models.post import Like, Post
+from models.user import User
+from schemas.postReaction import LikeCreate
+from services.LikeCounterBuffer import LikeCounterBuffer
+from services.reaction import toggle_like
+
+BENCH_USERNAME = "bench_hot_post_likes"
+
+
+def _seed(db, total: int):
+    user_ids = db.execute(
+        insert(User).returning(User.id),
+        [
+            {"username": f"{BENCH_USERNAME}_{i}", "email": f"{BENCH_USERNAME}_{i}@example.invalid", "hashed_password": "-"}
+            for i in range(total)
+        ],
+    ).scalars().all()
+    post = Post(user_id=user_ids[0], content="bench", post_type="TEXT", like_count=0)
+    db.add(post)
+    db.commit()
+    return post.id, user_ids
+
+
+def _cleanup(db, post_id: int, user_ids: list) -> None:
+    db.execute(delete(Like).where(Like.post_id == post_id))
+    db.execute(delete(Post).where(Post.id == post_id))
+    db.execute(delete(User).where(User.id.in_(user_ids)))
+    db.commit()
+
+
+def _run(post_id: int, user_ids: list, threads: int, buffer=None) -> float:
+    """Likes per second with every user liking the post once, from `threads` workers."""
+    def like(user_id: int) -> None:
+        db = SessionLocal()
+        try:
+            result = toggle_like(db, user_id, LikeCreate(post_id=post_id, comment_id=None), buffered=buffer is not None)
+            db.commit()
+            if buffer is not None:
+                buffer.add(post_id, result["delta"])
+        finally:
+            db.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(like, user_ids))
+    if buffer is not None:
+        buffer.stop()  # The last flush is part of the cost
+    return len(user_ids) / (time.perf_counter() - started)
+
+
+def _reset(db, post_id: int) -> None:
+    db.execute(delete(Like).where(Like.post_id == post_id))
+    db.query(Post).filter(Post.id == post_id).update({Post.like_count: 0})
+    db.commit()
+
+
+def _check(db, post_id: int, expected: int) -> None:
+    db.expire_all()
+    like_count = db.query(Post.like_count).filter(Post.id == post_id).scalar()
+    if like_count != expected:
+        raise SystemExit(f"like_count is {like_count}, expected {expected}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000, help="likes per run, one per user")
+    parser.add_argument("--threads", type=int, default=12)
+    parser.add_argument("--interval", type=float, default=0.5, help="buffer flush interval in seconds")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    post_id, user_ids = _seed(db, args.users)
+    try:
+        direct = _run(post_id, user_ids, args.threads)
+        _check(db, post_id, args.users)
+        _reset(db, post_id)
+
+        buffer = LikeCounterBuffer(interval=args.interval)
+        buffer.start()
+        buffered = _run(post_id, user_ids, args.threads, buffer)
+        _check(db, post_id, args.users)
+
+        print(f"{args.users} likes on one post from {args.threads} threads")
+        print(f"{'':>10} {'likes/s':>10}")
+        print(f"{'direct':>10} {direct:>10,.0f}")
+        print(f"{'buffered':>10} {buffered:>10,.0f}")
+        print(f"speed-up {buffered / direct:.1f}x")
+    finally:
+        _cleanup(db, post_id, user_ids)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compare the image bytes a client downloads for one feed page when it is
+served the originals versus the resized WebP variants. Uses synthetic
+photo-like JPEGs at phone-camera sizes, so no database or network is needed.
+
+    python -m scripts.bench_image_variants --page-size 10
+
+Each page has `page-size` media posts (feed variant) and as many author
+avatars (thumb variant).
+"""
+import argparse
+import io
+import statistics
+import time
+
+from PIL import Image, ImageFilter
+from services.ImageHandler import render_variants
+
+
+def _photo(width: int, height: int, seed: int) -> bytes:
+    """Blurred noise over a gradient compresses roughly like a photo, unlike a flat colour."""
+    noise = Image.effect_noise((width // 4, height // 4), 64 + seed % 32).resize((width, height))
+    gradient = Image.linear_gradient("L").resize((width, height))
+    image = Image.merge("RGB", (noise, gradient, noise.filter(ImageFilter.GaussianBlur(3))))
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=90)
+    return out.getvalue()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=10)
+    args = parser.parse_args()
+
+    media = [_photo(4032, 3024, seed) for seed in range(args.page_size)]
+    avatars = [_photo(1080, 1080, seed) for seed in range(args.page_size)]
+
+    render_ms, feed_bytes, thumb_bytes = [], 0, 0
+    for original in media:
+        started = time.perf_counter()
+        variants = render_variants(original)
+        render_ms.append((time.perf_counter() - started) * 1000)
+        feed_bytes += len(variants["feed"])
+    for original in avatars:
+        thumb_bytes += len(render_variants(original)["thumb"])
+
+    original_total = sum(map(len, media)) + sum(map(len, avatars))
+    variant_total = feed_bytes + thumb_bytes
+    print(f"{args.page_size} media posts (4032x3024) + {args.page_size} avatars (1080x1080) per page")
+    print(f"{'':>10} {'media KiB':>10} {'avatar KiB':>11} {'page KiB':>9}")
+    print(f"{'originals':>10} {sum(map(len, media)) / 1024:>10.0f} {sum(map(len, avatars)) / 1024:>11.0f} {original_total / 1024:>9.0f}")
+    print(f"{'variants':>10} {feed_bytes / 1024:>10.0f} {thumb_bytes / 1024:>11.0f} {variant_total / 1024:>9.0f}")
+    print(f"page bytes reduced {original_total / variant_total:.1f}x; median render {statistics.median(render_ms):.0f} ms per upload")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare moderation throughput of better-profanity's `contains_profanity`
+(the previous implementation) with the compiled engine in AI.moderation, on
+synthetic post-sized texts where a share contain (obfuscated) censored words.
+
+    python -m scripts.bench_moderation --texts 200
+
+better-profanity manages about ten 40-word texts per second, so keep --texts
+small; the engine can be timed alone on larger batches with --engine-only.
+The engine is measured cold (every text scanned) and warm (verdicts served
+from the content-hash cache, as for repeated chat messages and retries).
+"""
+import argparse
+import random
+import time
+
+from better_profanity import profanity
+from better_profanity.utils import get_complete_path_of_file, read_wordlist
+from AI.moderation import ModerationEngine
+
+CLEAN_WORDS = (
+    "the quick brown fox jumps over lazy dogs hello shell class analysis research paper "
+    "university campus lecture seminar deadline project group meeting library exam"
+).split()
+
+
+def _texts(total: int, words_per_text: int, dirty_share: float, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    censored = list(read_wordlist(get_complete_path_of_file("profanity_wordlist.txt")))
+    mapping = profanity.CHARS_MAPPING
+    texts = []
+    for _ in range(total):
+        words = [rng.choice(CLEAN_WORDS) for _ in range(words_per_text)]
+        if rng.random() < dirty_share:
+            word = "".join(rng.choice(mapping[c]) if c in mapping and rng.random() < 0.3 else c for c in rng.choice(censored))
+            words[rng.randrange(words_per_text)] = word
+        texts.append(" ".join(words))
+    return texts
+
+
+def _rate(label: str, scan, texts: list) -> float:
+    started = time.perf_counter()
+    flagged = sum(scan(texts))
+    elapsed = time.perf_counter() - started
+    print(f"{label:>22} {len(texts) / elapsed:>12,.0f} {elapsed * 1000:>10.0f} {flagged:>8}")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=200)
+    parser.add_argument("--words", type=int, default=40, help="words per text")
+    parser.add_argument("--dirty-share", type=float, default=0.1)
+    parser.add_argument("--engine-only", action="store_true", help="skip the (slow) better-profanity baseline")
+    args = parser.parse_args()
+
+    texts = _texts(args.texts, args.words, args.dirty_share)
+    started = time.perf_counter()
+    engine = ModerationEngine(read_wordlist(get_complete_path_of_file("profanity_wordlist.txt")), profanity.CHARS_MAPPING)
+    print(f"{args.texts} texts of {args.words} words; engine compiled in {(time.perf_counter() - started) * 1000:.0f} ms")
+    print(f"{'':>22} {'texts/s':>12} {'total ms':>10} {'flagged':>8}")
+
+    baseline = None
+    if not args.engine_only:
+        baseline = _rate("better-profanity", lambda batch: [profanity.contains_profanity(t) for t in batch], texts)
+    cold = _rate("engine (cold cache)", engine.moderate_batch, texts)
+    warm = _rate("engine (warm cache)", engine.moderate_batch, texts)
+    if baseline:
+        print(f"speed-up {baseline / cold:.0f}x cold, {baseline / warm:.0f}x warm")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Compare the time to notify every connection of a new post one row at a time
+(add + commit + refresh per connection, the old path) and with the single
+INSERT ... SELECT used by send_post_notifications. Seeds an author with
+accepted connections in DATABASE_URL (use a scratch database) and removes
+everything afterwards.
+
+    python -m scripts.bench_notification_fanout --connections 10 100 1000
+
+With the bulk path the request no longer waits for either: create routes hand
+the fan-out to a background task.
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import delete, insert
+from database.session import SessionLocal
+# Every mapped model must be imported before the first query so relationships resolve
+from models import chat, collaboration_request, connection, hashtag, notifications, post, publish_job, research_collaboration, research_paper, stored_file, timeline, university, user  # noqa: F401
+from models.connection import Connection, ConnectionStatus
+from models.notifications import Notification
+from models.post import Post
+from models.user import User
+from core.connection_crud import get_connections
+from services.NotificationHandler import create_notification, send_post_notifications
+
+BENCH_USERNAME = "bench_notification_fanout"
+
+
+def _seed(db, total: int):
+    author = User(username=BENCH_USERNAME, email=f"{BENCH_USERNAME}@example.invalid", hashed_password="-")
+    db.add(author)
+    db.flush()
+    friend_ids = db.execute(
+        insert(User).returning(User.id),
+        [
+            {"username": f"{BENCH_USERNAME}_{i}", "email": f"{BENCH_USERNAME}_{i}@example.invalid", "hashed_password": "-"}
+            for i in range(total)
+        ],
+    ).scalars().all()
+    db.execute(
+        insert(Connection),
+        [{"user_id": author.id, "friend_id": friend_id, "status": ConnectionStatus.ACCEPTED} for friend_id in friend_ids],
+    )
+    post = Post(user_id=author.id, content="bench", post_type="TEXT")
+    db.add(post)
+    db.commit()
+    return author, post, friend_ids
+
+
+def _cleanup(db, author_id: int, friend_ids: list) -> None:
+    user_ids = [author_id, *friend_ids]
+    db.execute(delete(Notification).where(Notification.actor_id == author_id))
+    db.execute(delete(Connection).where(Connection.user_id == author_id))
+    db.execute(delete(Post).where(Post.user_id == author_id))
+    db.execute(delete(User).where(User.id.in_(user_ids)))
+    db.commit()
+
+
+def _per_row(db, author, post) -> None:
+    for conn in get_connections(db, author.id):
+        create_notification(db, conn["friend_id"] if conn["user_id"] == author.id else conn["user_id"], author.id, "new_post", post.id)
+
+
+def _bulk(db, author, post) -> None:
+    send_post_notifications(db, author, post)
+    db.commit()
+
+
+def _time(db, author, post, fan_out, rounds: int) -> list:
+    """Milliseconds per fan-out, clearing the notifications between rounds."""
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fan_out(db, author, post)
+        timings.append((time.perf_counter() - started) * 1000)
+        db.execute(delete(Notification).where(Notification.actor_id == author.id))
+        db.commit()
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'connections':>11} {'per-row ms':>11} {'bulk ms':>8} {'speed-up':>9}")
+    for total in args.connections:
+        db = SessionLocal()
+        author, post, friend_ids = _seed(db, total)
+        try:
+            per_row = statistics.median(_time(db, author, post, _per_row, args.rounds))
+            bulk = statistics.median(_time(db, author, post, _bulk, args.rounds))
+            print(f"{total:>11} {per_row:>11.1f} {bulk:>8.1f} {per_row / bulk:>8.1f}x")
+        finally:
+            _cleanup(db, author.id, friend_ids)
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Compare page latency of the chronological feed and the ranked feed
+(GET /posts/?rank=engagement). Seeds posts with random counters for a
+dedicated benchmark user in DATABASE_URL (use a scratch database) and
+removes them afterwards.
+
+    python -m scripts.bench_ranked_feed --posts 50000 --pages 20
+
+Both modes walk the same number of pages with keyset cursors, so the numbers
+compare an index range scan on (created_at, id) against one on
+(engagement_score, id).
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert, update
+from database.session import SessionLocal
+# Every mapped model must be imported before the first query so relationships resolve
+from models import chat, collaboration_request, connection, hashtag, notifications, post, publish_job, research_collaboration, research_paper, stored_file, timeline, university, user  # noqa: F401
+from models.post import Post
+from models.user import User
+from services.PostHandler import paginate_posts, paginate_ranked_posts
+from services.RankingHandler import engagement_score_expression
+
+BENCH_USERNAME = "bench_ranked_feed"
+
+
+def _seed(db, total: int) -> int:
+    bench_user = User(username=BENCH_USERNAME, email=f"{BENCH_USERNAME}@example.invalid", hashed_password="-")
+    db.add(bench_user)
+    db.commit()
+
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "user_id": bench_user.id,
+            "content": "bench",
+            "post_type": "TEXT",
+            "created_at": now - timedelta(minutes=random.randint(0, 60 * 24 * 30)),
+            "like_count": random.randint(0, 200),
+            "comment_count": random.randint(0, 40),
+            "share_count": random.randint(0, 10),
+        }
+        for _ in range(total)
+    ]
+    for start in range(0, len(rows), 5000):
+        db.execute(insert(Post), rows[start:start + 5000])
+    db.execute(
+        update(Post)
+        .where(Post.user_id == bench_user.id)
+        .values(engagement_score=engagement_score_expression(
+            Post.like_count, Post.comment_count, Post.share_count, Post.created_at
+        ))
+    )
+    db.commit()
+    return bench_user.id
+
+
+def _cleanup(db, user_id: int) -> None:
+    db.execute(delete(Post).where(Post.user_id == user_id))
+    db.execute(delete(User).where(User.id == user_id))
+    db.commit()
+
+
+def _walk(db, paginate, pages: int, limit: int) -> list:
+    """Milliseconds per page while following next_cursor from the first page."""
+    timings, cursor = [], None
+    for _ in range(pages):
+        started = time.perf_counter()
+        posts, cursor = paginate(db.query(Post), limit, cursor=cursor)
+        timings.append((time.perf_counter() - started) * 1000)
+        db.expunge_all()
+        if not cursor:
+            break
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=50000)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    user_id = _seed(db, args.posts)
+    try:
+        results = {"chronological": [], "ranked": []}
+        for _ in range(args.rounds):
+            results["chronological"] += _walk(db, paginate_posts, args.pages, args.limit)
+            results["ranked"] += _walk(db, paginate_ranked_posts, args.pages, args.limit)
+
+        print(f"{args.posts} posts, {args.pages} pages of {args.limit}, {args.rounds} rounds")
+        print(f"{'mode':>14} {'median ms':>10} {'p95 ms':>8}")
+        for mode, timings in results.items():
+            p95 = statistics.quantiles(timings, n=20)[-1]
+            print(f"{mode:>14} {statistics.median(timings):>10.2f} {p95:>8.2f}")
+    finally:
+        _cleanup(db, user_id)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
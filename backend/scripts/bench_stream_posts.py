@@ -0,0 +1,123 @@
+"""
+Compare peak memory of GET /posts/posts/ with and without ?stream=true as the
+post count grows. Seeds posts for a dedicated benchmark user in DATABASE_URL
+(use a scratch database) and removes them afterwards.
+
+    python -m scripts.bench_stream_posts --sizes 1000 10000 50000
+
+Each measurement runs in a fresh subprocess so one mode's freed memory cannot
+hide the other's peak. The streaming column should stay flat; the buffered
+one grows with the number of posts.
+"""
+import argparse
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import psutil
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, insert
+from database.session import SessionLocal
+# Every mapped model must be imported before the first query so relationships resolve
+from models import chat, collaboration_request, connection, hashtag, notifications, post, publish_job, research_collaboration, research_paper, stored_file, timeline, university, user  # noqa: F401
+from models.post import Post
+from models.user import User
+from services.PostHandler import iter_posts_ndjson
+
+BENCH_USERNAME = "bench_stream_posts"
+CONTENT = "x" * 280
+
+
+def _bench_user_id(db) -> int:
+    bench_user = db.query(User).filter(User.username == BENCH_USERNAME).first()
+    if not bench_user:
+        bench_user = User(username=BENCH_USERNAME, email=f"{BENCH_USERNAME}@example.invalid", hashed_password="-")
+        db.add(bench_user)
+        db.commit()
+    return bench_user.id
+
+
+def _seed(db, user_id: int, total: int) -> None:
+    existing = db.query(Post).filter(Post.user_id == user_id).count()
+    now = datetime.now(timezone.utc)
+    rows = [{"user_id": user_id, "content": CONTENT, "post_type": "TEXT", "created_at": now} for _ in range(total - existing)]
+    for start in range(0, len(rows), 5000):
+        db.execute(insert(Post), rows[start:start + 5000])
+    db.commit()
+
+
+def _cleanup(db, user_id: int) -> None:
+    db.execute(delete(Post).where(Post.user_id == user_id))
+    db.execute(delete(User).where(User.id == user_id))
+    db.commit()
+
+
+def _measure(mode: str, user_id: int) -> None:
+    """Consume one listing the way the endpoint would and print (peak RSS growth in MiB, rows, seconds)."""
+    process = psutil.Process()
+    baseline = process.memory_info().rss
+    peak = baseline
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, process.memory_info().rss)
+            time.sleep(0.005)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    started = time.perf_counter()
+    if mode == "stream":
+        rows = sum(1 for _ in iter_posts_ndjson(user_id))
+    else:
+        db = SessionLocal()
+        try:
+            body = jsonable_encoder(db.query(Post).filter(Post.user_id == user_id).all())
+            rows = len(body)
+        finally:
+            db.close()
+    elapsed = time.perf_counter() - started
+    done.set()
+    sampler.join()
+    peak = max(peak, process.memory_info().rss)
+    print(f"{(peak - baseline) / 2 ** 20:.1f} {rows} {elapsed:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--measure", choices=["stream", "buffered"], help=argparse.SUPPRESS)
+    parser.add_argument("--user-id", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        _measure(args.measure, args.user_id)
+        return
+
+    db = SessionLocal()
+    user_id = _bench_user_id(db)
+    try:
+        print(f"{'posts':>8} {'buffered MiB':>13} {'stream MiB':>11} {'buffered s':>11} {'stream s':>9}")
+        for size in sorted(args.sizes):
+            _seed(db, user_id, size)
+            results = {}
+            for mode in ("buffered", "stream"):
+                output = subprocess.run(
+                    [sys.executable, "-m", "scripts.bench_stream_posts", "--measure", mode, "--user-id", str(user_id)],
+                    check=True, capture_output=True, text=True
+                ).stdout.split()
+                results[mode] = (float(output[0]), float(output[2]))
+            print(
+                f"{size:>8} {results['buffered'][0]:>13.1f} {results['stream'][0]:>11.1f}"
+                f" {results['buffered'][1]:>11.2f} {results['stream'][1]:>9.2f}"
+            )
+    finally:
+        _cleanup(db, user_id)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Show what a blocking upload does to every other request on the same worker.
+A small app exposes /ping and an upload endpoint that either calls a
+simulated blocking SDK upload directly on the event loop (the old behaviour)
+or through the upload executor. While a burst of uploads runs, /ping is
+polled and its latency reported.
+
+    python -m scripts.bench_upload_event_loop --uploads 8 --upload-seconds 0.5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+from core.upload_executor import UploadExecutor
+
+
+def build_app(upload_seconds: float, executor: UploadExecutor) -> FastAPI:
+    app = FastAPI()
+
+    def blocking_sdk_upload() -> str:
+        time.sleep(upload_seconds)  # Stands in for cloudinary.uploader.upload / supabase storage upload
+        return "https://cdn.example/file"
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.post("/upload/inline")
+    async def upload_inline():
+        return {"url": blocking_sdk_upload()}
+
+    @app.post("/upload/executor")
+    async def upload_executor():
+        return {"url": await executor.run("cloudinary", blocking_sdk_upload)}
+
+    return app
+
+
+async def measure(app: FastAPI, mode: str, uploads: int, interval: float = 0.01) -> list:
+    """
+    Milliseconds from each /ping's scheduled send time to its response while
+    `uploads` uploads are in flight, so time spent waiting for a blocked loop counts.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        upload_burst = asyncio.ensure_future(asyncio.gather(*(client.post(f"/upload/{mode}") for _ in range(uploads))))
+        timings, started = [], time.perf_counter()
+        while not upload_burst.done():
+            scheduled = started + len(timings) * interval
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            await client.get("/ping")
+            timings.append((time.perf_counter() - scheduled) * 1000)
+        await upload_burst
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=8)
+    parser.add_argument("--upload-seconds", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    executor = UploadExecutor({"cloudinary": args.concurrency}, timeout=60)
+    app = build_app(args.upload_seconds, executor)
+
+    print(f"{args.uploads} uploads of {args.upload_seconds}s, executor concurrency {args.concurrency}")
+    print(f"{'mode':>9} {'pings':>6} {'median ms':>10} {'p95 ms':>8} {'max ms':>8}")
+    for mode in ("inline", "executor"):
+        timings = asyncio.run(measure(app, mode, args.uploads))
+        p95 = statistics.quantiles(timings, n=20, method="inclusive")[-1] if len(timings) > 1 else timings[0]
+        print(f"{mode:>9} {len(timings):>6} {statistics.median(timings):>10.2f} {p95:>8.2f} {max(timings):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Recompute denormalized counters from their source tables.
+Run once after adding the column (backfill) and whenever drift is suspected:
+
+    python -m scripts.reconcile_counters
+"""
+from database.session import SessionLocal
+# Every mapped model must be imported before the first query so relationships resolve
+from models import chat, collaboration_request, connection, hashtag, notifications, post, publish_job, research_collaboration, research_paper, stored_file, timeline, university, user  # noqa: F401
+from services.reaction import reconcile_comment_counts, reconcile_comment_like_counts
+from services.RankingHandler import reconcile_engagement_scores
+from core.connection_crud import reconcile_connection_counts
+
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        corrected = reconcile_comment_counts(db)
+        print(f"comment_count corrected on {corrected} post(s)")
+        corrected = reconcile_comment_like_counts(db)
+        print(f"like_count corrected on {corrected} comment(s)")
+        rescored = reconcile_engagement_scores(db)
+        print(f"like/comment/share counts and engagement_score recomputed on {rescored} post(s)")
+        corrected = reconcile_connection_counts(db)
+        print(f"connection_count corrected on {corrected} user(s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,9 @@ from typing import List, Dict
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from models.user import User
+from utils.image_variants import avatar_url
 from models.connection import Connection, ConnectionStatus
+from core.connection_crud import adjust_connection_count
 
 class ConnectionService:
     @staticmethod
@@ -35,7 +37,7 @@ class ConnectionService:
                 "friend_id": conn.friend_id if conn.user_id == user_id else conn.user_id,
                 "username": ConnectionService.get_user_by_id(db, conn.friend_id if conn.user_id == user_id else conn.user_id).username,
                 "email": ConnectionService.get_user_by_id(db, conn.friend_id if conn.user_id == user_id else conn.user_id).email,
-                "profile_picture": ConnectionService.get_user_by_id(db, conn.friend_id if conn.user_id == user_id else conn.user_id).profile_picture
+                "profile_picture": avatar_url(ConnectionService.get_user_by_id(db, conn.friend_id if conn.user_id == user_id else conn.user_id))
             }
             for conn in connections
         ]
@@ -54,7 +56,7 @@ class ConnectionService:
                 "sender_id": request.user_id,
                 "username": ConnectionService.get_user_by_id(db, request.user_id).username,
                 "email": ConnectionService.get_user_by_id(db, request.user_id).email,
-                "profile_picture": ConnectionService.get_user_by_id(db, request.user_id).profile_picture
+                "profile_picture": avatar_url(ConnectionService.get_user_by_id(db, request.user_id))
             }
             for request in pending
         ]
@@ -79,7 +81,7 @@ class ConnectionService:
                 "user_id": user.id,
                 "username": user.username,
                 "email": user.email,
-                "profile_picture": user.profile_picture,
+                "profile_picture": avatar_url(user),
                 "university_name": user.university_name,
                 "department": user.department
             }
@@ -121,8 +123,9 @@ class ConnectionHandler:
         if connection.status != ConnectionStatus.PENDING:
             raise HTTPException(status_code=400, detail="Request is not pending")
 
-        # Update the connection status to accepted
+        # Update the connection status to accepted; the stored counts decide timeline fan-out
         connection.status = ConnectionStatus.ACCEPTED
+        adjust_connection_count(db, connection, 1)
         db.commit()
         return {"message": "Connection accepted!"}
 
@@ -166,5 +169,5 @@ class ConnectionHandler:
             "user_id": user.id,
             "username": user.username,
             "email": user.email,
-            "profile_picture": user.profile_picture
+            "profile_picture": avatar_url(user)
         }
@@ -0,0 +1,122 @@
+#all helper functions related to content-addressed deduplication of uploaded files, will be here
+import hashlib
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, Iterable, List, Tuple
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from models.stored_file import StoredFile
+from core.upload_executor import run_upload
+from utils.cloudinary import upload_to_cloudinary, delete_from_cloudinary
+from utils.supabase import upload_file_to_supabase, storage_path
+from utils.storage import UPLOAD_CHUNK_BYTES, get_storage, iter_chunks
+
+# Each post, message or paper that points at a stored URL holds one reference to it.
+# References are taken and dropped in the caller's transaction; the remote object
+# is only deleted once the last reference is gone and that transaction committed.
+
+
+def hash_stream(stream: BinaryIO) -> Tuple[str, int]:
+    """sha256 and size of `stream`, read in chunks. Leaves it rewound for the upload."""
+    stream.seek(0)
+    digest, size = hashlib.sha256(), 0
+    for chunk in iter_chunks(stream, UPLOAD_CHUNK_BYTES):
+        digest.update(chunk)
+        size += len(chunk)
+    stream.seek(0)
+    return digest.hexdigest(), size
+
+
+async def upload_deduplicated(
+    db: Session,
+    stream: BinaryIO,
+    destination: str,
+    upload: Callable[[], Awaitable[Dict[str, Any]]]
+) -> StoredFile:
+    """
+    Stored copy of `stream`'s content at `destination`, calling `upload` only if
+    there is none yet. `upload` returns {"url", "remote_id", "resource_type"?}.
+    Takes one reference; the caller's commit makes it durable.
+    """
+    digest, size = await run_in_threadpool(hash_stream, stream)
+    stored = (
+        db.query(StoredFile)
+        .filter(StoredFile.destination == destination, StoredFile.digest == digest)
+        .with_for_update()
+        .first()
+    )
+    if stored:
+        stored.ref_count += 1  # Row is locked, so the read-modify-write cannot race a release
+        db.flush()
+        return stored
+
+    uploaded = await upload()
+    # Another request may have stored the same content meanwhile; then share its row (our copy stays orphaned)
+    stored_id = db.execute(
+        insert(StoredFile)
+        .values(
+            destination=destination,
+            digest=digest,
+            size=size,
+            url=uploaded["url"],
+            remote_id=uploaded["remote_id"],
+            resource_type=uploaded.get("resource_type"),
+            ref_count=1,
+        )
+        .on_conflict_do_update(
+            constraint="uq_stored_files_destination_digest",
+            set_={"ref_count": StoredFile.ref_count + 1}
+        )
+        .returning(StoredFile.id)
+    ).scalar_one()
+    return db.query(StoredFile).populate_existing().filter(StoredFile.id == stored_id).one()
+
+
+async def upload_to_cloudinary_deduplicated(db: Session, file: BinaryIO, folder_name: str) -> Dict[str, str]:
+    """upload_to_cloudinary on the upload executor, skipped when the same content is already stored."""
+    async def upload():
+        result = await run_upload("cloudinary", upload_to_cloudinary, file, folder_name=folder_name)
+        return {"url": result["secure_url"], "remote_id": result["public_id"], "resource_type": result["resource_type"]}
+
+    stored = await upload_deduplicated(db, file, "cloudinary", upload)
+    return {"secure_url": stored.url, "resource_type": stored.resource_type}
+
+
+async def upload_to_supabase_deduplicated(db: Session, file_obj, filename: str, section: str) -> str:
+    """upload_file_to_supabase, skipped when the same content is already stored (in any section)."""
+    async def upload():
+        url = await upload_file_to_supabase(file_obj, filename, section=section)
+        return {"url": url, "remote_id": storage_path(section, filename)}
+
+    stored = await upload_deduplicated(db, getattr(file_obj, "file", file_obj), "supabase", upload)
+    return stored.url
+
+
+def release_stored_files(db: Session, urls: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Drop one reference to each URL. Returns the objects nobody references any
+    more; delete them with purge_stored_files after the caller commits.
+    URLs uploaded before deduplication existed are not tracked and never deleted.
+    """
+    released = []
+    for url in urls:
+        stored = db.query(StoredFile).filter(StoredFile.url == url).with_for_update().first()
+        if not stored:
+            continue
+        stored.ref_count -= 1
+        if stored.ref_count <= 0:
+            released.append({"destination": stored.destination, "remote_id": stored.remote_id, "resource_type": stored.resource_type})
+            db.delete(stored)
+    db.flush()
+    return released
+
+
+async def purge_stored_files(released: List[Dict[str, Any]]) -> None:
+    """Delete unreferenced objects from remote storage. Failures only leave an orphaned object behind."""
+    for stored in released:
+        try:
+            if stored["destination"] == "cloudinary":
+                await run_upload("cloudinary", delete_from_cloudinary, stored["remote_id"], stored["resource_type"] or "image")
+            else:
+                await run_upload("supabase", get_storage().delete, stored["remote_id"])
+        except Exception as e:
+            print(f"Error deleting stored file {stored['remote_id']}: {e}")
@@ -5,8 +5,10 @@ from sqlalchemy.orm import Session
 from zoneinfo import ZoneInfo
 from models.post import Post, Event
 from utils.post_utils import create_base_post
+from services.PostHandler import touch_post
 from services.FileHandler import save_upload_file, generate_secure_filename
 from utils.cloudinary import upload_to_cloudinary
+from core.upload_executor import run_upload
 
 def _parse_datetime_string(date_str: str, time_str: str) -> datetime:
     try:
@@ -36,7 +38,9 @@ async def handle_event_upload(
     media_file: Optional[UploadFile],
     folder_name: str
 ) -> Dict[str, str]:
-    upload_result = upload_to_cloudinary(
+    upload_result = await run_upload(
+        "cloudinary",
+        upload_to_cloudinary,
         media_file.file,
         folder_name=folder_name
     )
@@ -49,7 +53,7 @@ def create_event_post(
     event_data: Dict[str, Any],
     image_url: Optional[str] = None
 ) -> Tuple[Post, Event]:
-    """Create a new event post with associated event details."""
+    """Create a new event post with associated event details. The caller commits."""
     post = create_base_post(db, user_id, content, "event")
     
     event_datetime = parse_event_datetime(
@@ -69,8 +73,7 @@ def create_event_post(
     )
     
     db.add(event)
-    db.commit()
-    db.refresh(event)
+    db.flush()
     
     return post, event
 
@@ -95,9 +98,10 @@ def update_event_post(
     event: Event,
     update_data: Dict[str, Any]
 ) -> Tuple[Post, Event]:
-    """Update an existing event post and its details."""
+    """Update an existing event post and its details. The caller commits."""
     _update_post_content(post, update_data.get("content"))
     _update_event_fields(event, update_data)
+    touch_post(post)
     
     if all(key in update_data for key in ["event_date", "event_time"]):
         event_datetime = parse_event_datetime(
@@ -107,10 +111,6 @@ def update_event_post(
         )
         event.event_datetime = event_datetime
     
-    db.commit()
-    db.refresh(post)
-    db.refresh(event)
-    
     return post, event
 
 def format_event_response(post: Post, event: Event) -> Dict[str, Any]:
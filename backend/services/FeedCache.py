@@ -0,0 +1,44 @@
+#all helper functions related to caching feed pages, will be here
+import os
+from typing import Any, Hashable, Iterable, Optional
+from dotenv import load_dotenv
+from core.cache import ResponseCache
+
+load_dotenv()
+
+FEED_CACHE_TTL = int(os.getenv("FEED_CACHE_TTL", "30"))  # Seconds a feed page may be served from cache
+FEED_CACHE_MAX_ENTRIES = int(os.getenv("FEED_CACHE_MAX_ENTRIES", "2048"))
+
+# Entries are page compositions, {"post_ids", "next_cursor"}; the posts themselves are
+# rendered from the post cache, which likes, comments, shares and edits invalidate per post
+feed_cache = ResponseCache("feed", maxsize=FEED_CACHE_MAX_ENTRIES, ttl=FEED_CACHE_TTL)
+
+
+def feed_cache_key(viewer_id: int, **params: Any) -> Hashable:
+    """Pages are per viewer (home timelines differ) and per cursor / filter."""
+    return (viewer_id, tuple(sorted(params.items())))
+
+
+def feed_cache_scope(viewer_id: int, feed: str, user_id: Optional[int]) -> Hashable:
+    """
+    The posts a page is drawn from: the viewer's home timeline, one author's
+    posts (profiles), or every post. A new or deleted post only drops pages of
+    the scopes it belongs to.
+    """
+    if feed == "home":
+        return ("home", viewer_id)
+    if user_id:
+        return ("user", user_id)
+    return "all"
+
+
+def invalidate_feed_cache(author_id: int, reader_ids: Iterable[int]) -> None:
+    """
+    Called when posts are created, published or deleted: drops the all-posts
+    pages, the author's profile pages and the home pages of `reader_ids`, the
+    users whose home timeline shows the author's posts. Other viewers' home
+    pages stay cached. Counter and content changes only need
+    `invalidate_post_cache`. Engagement-ranked pages may keep their order for
+    up to FEED_CACHE_TTL after a like.
+    """
+    feed_cache.invalidate(["all", ("user", author_id)] + [("home", reader_id) for reader_id in set(reader_ids)])
@@ -0,0 +1,82 @@
+#all helper functions related to hashtags, will be here
+import os
+import time
+from threading import Lock
+from typing import FrozenSet, Iterable, List, Optional
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from core.cache import create_backend
+from models.hashtag import Hashtag, post_hashtags
+from models.university import University
+
+load_dotenv()
+
+# Reload interval, bounding how stale a worker's names can get if an invalidation is missed
+UNIVERSITY_NAMES_TTL = int(os.getenv("UNIVERSITY_NAMES_TTL", "300"))
+
+
+class UniversityNameMatcher:
+    """
+    Lower-cased university names, loaded once per process and shared by every
+    request. `invalidate()` bumps a generation counter in the cache backend, so
+    with CACHE_BACKEND=redis all workers reload on their next match.
+    """
+
+    GENERATION_KEY = "universities:generation"
+
+    def __init__(self, ttl: float, backend=None):
+        self.ttl = ttl
+        self._backend = backend or create_backend(1, ttl)
+        self._names: Optional[FrozenSet[str]] = None
+        self._generation: Optional[int] = None
+        self._loaded_at = 0.0
+        self._lock = Lock()
+
+    def _is_stale(self, generation: int) -> bool:
+        return (
+            self._names is None
+            or generation != self._generation
+            or time.monotonic() - self._loaded_at > self.ttl
+        )
+
+    def names(self, db: Session) -> FrozenSet[str]:
+        generation = self._backend.get_counter(self.GENERATION_KEY)
+        if self._is_stale(generation):
+            with self._lock:
+                if self._is_stale(generation):
+                    self._names = frozenset(name.lower() for (name,) in db.query(University.name).all())
+                    self._generation = generation
+                    self._loaded_at = time.monotonic()
+        return self._names
+
+    def match(self, db: Session, tags: Iterable[str]) -> List[str]:
+        """The tags naming a university, lower-cased, without duplicates."""
+        tags = [tag.lower() for tag in tags]
+        if not tags:
+            return []  # Posts without hashtags never touch the names
+        names = self.names(db)
+        return sorted({tag for tag in tags if tag in names})
+
+    def invalidate(self) -> None:
+        self._backend.bump_counter(self.GENERATION_KEY)
+
+
+university_matcher = UniversityNameMatcher(UNIVERSITY_NAMES_TTL)
+
+
+def attach_hashtags(db: Session, post_id: int, names: List[str]) -> None:
+    """
+    Create or bump the usage count of every hashtag in one upsert, then link
+    them to the post in one insert. `names` must be unique; sorted, so
+    concurrent posts lock the hashtag rows in the same order.
+    """
+    if not names:
+        return
+    hashtag_ids = db.execute(
+        insert(Hashtag)
+        .values([{"name": name, "usage_count": 1} for name in names])
+        .on_conflict_do_update(index_elements=[Hashtag.name], set_={"usage_count": Hashtag.usage_count + 1})
+        .returning(Hashtag.id)
+    ).scalars().all()
+    db.execute(insert(post_hashtags), [{"post_id": post_id, "hashtag_id": hashtag_id} for hashtag_id in hashtag_ids])
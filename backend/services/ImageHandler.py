@@ -0,0 +1,103 @@
+#all helper functions related to resized image variants, will be here
+import asyncio
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, Optional
+from PIL import Image, ImageOps
+from starlette.concurrency import run_in_threadpool
+from dotenv import load_dotenv
+from database.session import SessionLocal
+from services.DedupHandler import upload_to_cloudinary_deduplicated, release_stored_files, purge_stored_files
+
+load_dotenv()
+
+# Width of each variant served instead of the original; narrower originals are not upscaled
+IMAGE_VARIANT_WIDTHS = {"thumb": 160, "feed": 640, "full": 1280}
+IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", "80"))  # WebP quality
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))  # Processes resizing images
+RESIZABLE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}  # GIFs are served as uploaded to keep their animation
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Spawned, not forked: a fork would copy the upload thread pools and DB connections mid-use
+        _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def render_variants(data: bytes) -> Dict[str, bytes]:
+    """WebP encoding of the image at each variant width. CPU-bound; runs in the worker processes."""
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)  # Phones store rotation in EXIF, which WebP output drops
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    variants = {}
+    for name, width in IMAGE_VARIANT_WIDTHS.items():
+        resized = image
+        if image.width > width:
+            resized = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        out = io.BytesIO()
+        resized.save(out, "WEBP", quality=IMAGE_VARIANT_QUALITY, method=4)
+        variants[name] = out.getvalue()
+    return variants
+
+
+async def _upload_variant(content: bytes, folder_name: str) -> str:
+    """Store one variant in its own session, committed at once so it shares no transaction with the caller."""
+    db = SessionLocal()
+    try:
+        result = await upload_to_cloudinary_deduplicated(db, io.BytesIO(content), folder_name)
+        db.commit()
+        return result["secure_url"]
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def _release_variants(urls) -> None:
+    db = SessionLocal()
+    try:
+        released = release_stored_files(db, urls)
+        db.commit()
+    finally:
+        db.close()
+    await purge_stored_files(released)
+
+
+async def create_image_variants(stream: BinaryIO, ext: str, folder_name: str) -> Optional[Dict[str, str]]:
+    """
+    Render the variants of an uploaded image and store them next to the original.
+    Returns {variant: url}, or None for videos, GIFs and files Pillow cannot read,
+    which are then served as uploaded.
+    The variants are uploaded concurrently, each reference committed on its own,
+    so call this outside any transaction. If one upload fails, the others are
+    released again and the error is raised.
+    """
+    if ext.lower() not in RESIZABLE_EXTENSIONS:
+        return None
+    stream.seek(0)
+    data = await run_in_threadpool(stream.read)
+    stream.seek(0)
+    try:
+        rendered = await asyncio.get_running_loop().run_in_executor(_get_pool(), render_variants, data)
+    except Exception as e:
+        print(f"Error rendering image variants: {e}")
+        return None
+
+    names = list(rendered)
+    results = await asyncio.gather(
+        *(_upload_variant(rendered[name], folder_name) for name in names), return_exceptions=True
+    )
+    failures = [result for result in results if isinstance(result, BaseException)]
+    if failures:
+        await _release_variants([result for result in results if not isinstance(result, BaseException)])
+        raise failures[0]
+    return dict(zip(names, results))
@@ -0,0 +1,149 @@
+#all helper functions related to buffering post like counters in process, will be here
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import Integer, column, update, values
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from database.session import SessionLocal
+from models.post import Post
+from services.RankingHandler import post_counter_values
+
+load_dotenv()
+
+# Off by default: like_count is then updated in the toggle statement itself
+LIKE_COUNTER_BUFFER = os.getenv("LIKE_COUNTER_BUFFER", "false").lower() == "true"
+LIKE_COUNTER_FLUSH_INTERVAL = float(os.getenv("LIKE_COUNTER_FLUSH_INTERVAL", "1"))  # Seconds between batched UPDATEs
+LIKE_COUNTER_SHARDS = int(os.getenv("LIKE_COUNTER_SHARDS", "16"))
+
+
+class _Shard:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending: Dict[int, int] = {}
+        self.in_flight: Dict[int, int] = {}  # Drained by a flush that has not committed yet
+
+
+class LikeCounterBuffer:
+    """
+    Write-behind buffer for Post.like_count. A viral post makes every like
+    wait on the same `posts` row lock; with the buffer, a toggle only writes
+    its likes row and adds ±1 here, and a background thread applies the
+    summed deltas of all posts in one UPDATE per interval.
+
+    Deltas are sharded by post id so toggles on different posts do not share
+    a lock. `pending` includes deltas being flushed until their UPDATE
+    commits, so readers adding it to the stored count never see a like
+    disappear. The buffer is per process: another worker's pending likes
+    show up after its next flush.
+    """
+
+    def __init__(self, shards: int = LIKE_COUNTER_SHARDS, interval: float = LIKE_COUNTER_FLUSH_INTERVAL, session_factory=SessionLocal):
+        self._shards = [_Shard() for _ in range(shards)]
+        self._interval = interval
+        self._session_factory = session_factory
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._on_flush: Optional[Callable[[List[int]], None]] = None
+
+    def _shard(self, post_id: int) -> _Shard:
+        return self._shards[post_id % len(self._shards)]
+
+    def add(self, post_id: int, delta: int) -> int:
+        """Record a committed like (+1) or unlike (-1). Returns the post's pending delta."""
+        shard = self._shard(post_id)
+        with shard.lock:
+            if delta:
+                shard.pending[post_id] = shard.pending.get(post_id, 0) + delta
+            return shard.pending.get(post_id, 0) + shard.in_flight.get(post_id, 0)
+
+    def pending(self, post_id: int) -> int:
+        """Likes not yet applied to the post's row, to add to its stored like_count."""
+        shard = self._shard(post_id)
+        with shard.lock:
+            return shard.pending.get(post_id, 0) + shard.in_flight.get(post_id, 0)
+
+    def _drain(self) -> Dict[int, int]:
+        deltas = {}
+        for shard in self._shards:
+            with shard.lock:
+                shard.in_flight = {post_id: delta for post_id, delta in shard.pending.items() if delta}
+                shard.pending = {}
+                deltas.update(shard.in_flight)
+        return deltas
+
+    def _settle(self, failed: bool) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                if failed:  # Put the deltas back for the next flush
+                    for post_id, delta in shard.in_flight.items():
+                        shard.pending[post_id] = shard.pending.get(post_id, 0) + delta
+                shard.in_flight = {}
+
+    def flush(self, db: Optional[Session] = None) -> int:
+        """
+        Apply every pending delta in one UPDATE ... FROM (VALUES ...), re-scoring
+        the posts as adjust_post_counters does. Returns the number of posts.
+        """
+        with self._flush_lock:
+            deltas = self._drain()
+            if not deltas:
+                return 0
+            own_session = db is None
+            db = db or self._session_factory()
+            try:
+                apply_like_deltas(db, deltas)
+                db.commit()
+                # The rows now hold these deltas; clear them before anything else can run
+                self._settle(failed=False)
+            except Exception as e:
+                db.rollback()
+                self._settle(failed=True)
+                print(f"Error flushing like counters: {e}")
+                return 0
+            finally:
+                if own_session:
+                    db.close()
+        if self._on_flush:
+            self._on_flush(list(deltas))
+        return len(deltas)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.flush()
+
+    def start(self, on_flush: Optional[Callable[[List[int]], None]] = None) -> None:
+        """Start the periodic flusher. `on_flush` gets the ids of the posts whose counts changed."""
+        self._on_flush = on_flush
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="like-counter-flusher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher and apply whatever is still pending (on shutdown)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+def apply_like_deltas(db: Session, deltas: Dict[int, int]) -> None:
+    """Add each post's like delta to its like_count in a single UPDATE, in the caller's transaction."""
+    rows = values(column("post_id", Integer), column("delta", Integer), name="like_deltas").data(list(deltas.items()))
+    db.execute(
+        update(Post)
+        .where(Post.id == rows.c.post_id)
+        .values(post_counter_values(like_count=rows.c.delta))
+        .execution_options(synchronize_session=False)
+    )
+
+
+like_counter_buffer = LikeCounterBuffer()
+
+
+def pending_like_delta(post_id: int) -> int:
+    """Likes on the post still in the buffer (always 0 when buffering is off)."""
+    return like_counter_buffer.pending(post_id) if LIKE_COUNTER_BUFFER else 0
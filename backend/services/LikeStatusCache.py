@@ -0,0 +1,95 @@
+#all helper functions related to answering "did I like these?" in bulk, will be here
+import os
+from typing import Dict, Iterable, Optional, Set, Tuple
+from fastapi import HTTPException
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from core.cache import ResponseCache
+from models.post import Like
+
+load_dotenv()
+
+LIKE_STATUS_CACHE_TTL = int(os.getenv("LIKE_STATUS_CACHE_TTL", "60"))  # Also bounds how long another worker's like can lag
+LIKE_STATUS_CACHE_MAX_USERS = int(os.getenv("LIKE_STATUS_CACHE_MAX_USERS", "10000"))
+LIKE_STATUS_CACHE_TARGETS = int(os.getenv("LIKE_STATUS_CACHE_TARGETS", "2000"))  # Answers kept per user; the oldest are dropped first
+LIKE_STATUS_MAX_TARGETS = int(os.getenv("LIKE_STATUS_MAX_TARGETS", "200"))  # Post + comment ids accepted by one lookup
+
+# Per user: {("post" | "comment", id): liked} for the targets they recently looked at or (un)liked
+like_status_cache = ResponseCache("like_status", maxsize=LIKE_STATUS_CACHE_MAX_USERS, ttl=LIKE_STATUS_CACHE_TTL)
+
+Target = Tuple[str, int]
+
+
+def _store(user_id: int, answers: Dict[Target, bool], overwrite: bool) -> None:
+    """
+    Merge answers into the user's entry. Lookups pass overwrite=False, so an
+    answer read from the database cannot replace one a like write recorded
+    while the query was running.
+    """
+    entry = like_status_cache.get(user_id) or {}
+    if not overwrite:
+        answers = {target: liked for target, liked in answers.items() if target not in entry}
+    # Re-inserted at the end, so the entry stays ordered oldest answer first
+    merged = {target: liked for target, liked in entry.items() if target not in answers}
+    merged.update(answers)
+    if len(merged) > LIKE_STATUS_CACHE_TARGETS:
+        merged = dict(list(merged.items())[-LIKE_STATUS_CACHE_TARGETS:])
+    like_status_cache.set(user_id, merged)
+
+
+def _query_liked(db: Session, user_id: int, post_ids: Iterable[int], comment_ids: Iterable[int]) -> Set[Target]:
+    """The user's likes among the targets, in one query over the (user_id, target) unique indexes."""
+    post_ids, comment_ids = list(post_ids), list(comment_ids)
+    conditions = []
+    if post_ids:
+        conditions.append(Like.post_id.in_(post_ids))
+    if comment_ids:
+        conditions.append(Like.comment_id.in_(comment_ids))
+    if not conditions:
+        return set()
+    rows = db.query(Like.post_id, Like.comment_id).filter(Like.user_id == user_id, or_(*conditions)).all()
+    return {("post", row.post_id) if row.post_id is not None else ("comment", row.comment_id) for row in rows}
+
+
+def get_like_status(
+    db: Session,
+    user_id: int,
+    post_ids: Iterable[int] = (),
+    comment_ids: Iterable[int] = (),
+) -> Tuple[Set[int], Set[int]]:
+    """
+    Which of the posts and comments the user likes, as (post ids, comment ids).
+    Answers come from the user's cache entry; the rest from one query, and
+    are then cached, liked or not.
+    """
+    targets = [("post", post_id) for post_id in dict.fromkeys(post_ids)]
+    targets += [("comment", comment_id) for comment_id in dict.fromkeys(comment_ids)]
+    known = like_status_cache.get(user_id) or {}
+    missing = [target for target in targets if target not in known]
+
+    answers = {target: known[target] for target in targets if target in known}
+    if missing:
+        liked = _query_liked(
+            db, user_id,
+            (target_id for kind, target_id in missing if kind == "post"),
+            (target_id for kind, target_id in missing if kind == "comment"),
+        )
+        fresh = {target: target in liked for target in missing}
+        _store(user_id, fresh, overwrite=False)
+        answers.update(fresh)
+
+    liked_posts = {target_id for (kind, target_id), liked in answers.items() if liked and kind == "post"}
+    liked_comments = {target_id for (kind, target_id), liked in answers.items() if liked and kind == "comment"}
+    return liked_posts, liked_comments
+
+
+def record_like_status(user_id: int, post_id: Optional[int], comment_id: Optional[int], liked: bool) -> None:
+    """Called by the like toggle once committed, so the user's next lookup sees it without a query."""
+    target = ("post", post_id) if post_id else ("comment", comment_id)
+    _store(user_id, {target: liked}, overwrite=True)
+
+
+def validate_like_status_request(post_ids: list, comment_ids: list) -> None:
+    if len(set(post_ids)) + len(set(comment_ids)) > LIKE_STATUS_MAX_TARGETS:
+        raise HTTPException(status_code=400, detail=f"At most {LIKE_STATUS_MAX_TARGETS} post and comment ids per request")
@@ -1,10 +1,13 @@
 #all helper functions related to post, will be here
+from datetime import datetime, timezone
 from typing import List, Optional
+from sqlalchemy import case, insert, literal, or_, select
 from sqlalchemy.orm import Session
+from database.session import SessionLocal
+from models.connection import Connection, ConnectionStatus
 from models.user import User
 from models.post import Post
 from models.notifications import Notification
-from core.connection_crud import get_connections
 
 STATUS_404_ERROR = "Post not found"
 
@@ -28,24 +31,57 @@ def create_notification(
     db.refresh(notification)
     return notification
 
+def _insert_post_notifications(db: Session, author_id: int, post_id: int, notification_type: str) -> List[int]:
+    """
+    One INSERT ... SELECT writing a notification for every accepted connection
+    of the author, so the fan-out is a single round trip whatever the number of
+    connections. Returns the recipient ids.
+    """
+    recipient = case((Connection.user_id == author_id, Connection.friend_id), else_=Connection.user_id)
+    recipients = (
+        select(recipient.label("user_id"))
+        .where(
+            or_(Connection.user_id == author_id, Connection.friend_id == author_id),
+            Connection.status == ConnectionStatus.ACCEPTED
+        )
+        .distinct()  # A pair may be stored in both directions
+        .subquery()
+    )
+    rows = select(
+        recipients.c.user_id,
+        literal(author_id),
+        literal(notification_type),
+        literal(post_id),
+        literal(False),
+        literal(datetime.now(timezone.utc)),
+    )
+    recipient_ids = db.execute(
+        insert(Notification)
+        .from_select(["user_id", "actor_id", "type", "post_id", "is_read", "created_at"], rows)
+        .returning(Notification.user_id)
+    ).scalars().all()
+    return recipient_ids
+
 def send_post_notifications(
     db: Session,
     author: User,
     post: Post,
     notification_type: str = "new_post"
-) -> List[Notification]:
-    """Send notifications to all connections when a user creates a new post."""
-    connections = get_connections(db, author.id)
-    return [
-        create_notification(
-            db=db,
-            user_id=connection["friend_id"] if connection["user_id"] == author.id else connection["user_id"],
-            actor_id=author.id,
-            type=notification_type,
-            post_id=post.id
-        )
-        for connection in connections
-    ]
+) -> List[int]:
+    """Send notifications to all connections when a user creates a new post. Returns the recipient ids; the caller commits."""
+    return _insert_post_notifications(db, author.id, post.id, notification_type)
+
+def deliver_post_notifications(author_id: int, post_id: int, notification_type: str = "new_post") -> None:
+    """Background task: send the new-post notifications after the response, on its own session."""
+    db = SessionLocal()
+    try:
+        _insert_post_notifications(db, author_id, post_id, notification_type)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error sending post notifications: {e}")
+    finally:
+        db.close()
 
 def mark_notification_as_read(
     db: Session,
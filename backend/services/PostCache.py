@@ -0,0 +1,86 @@
+#all helper functions related to caching single hydrated posts, will be here
+import os
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from core.cache import ResponseCache
+from models.post import Post, PostStatusEnum
+from models.user import User
+from services.LikeStatusCache import get_like_status
+from utils.post_utils import build_post_payloads, render_post_payload
+
+load_dotenv()
+
+POST_CACHE_TTL = int(os.getenv("POST_CACHE_TTL", "60"))  # Also bounds how long an edited author card can lag
+POST_CACHE_MAX_ENTRIES = int(os.getenv("POST_CACHE_MAX_ENTRIES", "4096"))
+
+# Viewer-independent payloads from `build_post_payloads`, keyed by post id
+post_cache = ResponseCache("post", maxsize=POST_CACHE_MAX_ENTRIES, ttl=POST_CACHE_TTL)
+
+
+def get_post_payload(db: Session, post_id: int, viewer_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Read-through lookup of a post's cached payload, queried only on a miss.
+    Only published posts are cached; the author (`viewer_id`) still gets
+    their own processing or failed post, built per request. Returns None
+    when the post does not exist or is not visible to the viewer.
+    """
+    def load():
+        row = db.query(Post).filter(Post.id == post_id, Post.status == PostStatusEnum.PUBLISHED).first()
+        return build_post_payloads([row], db)[post_id] if row else None
+
+    payload = post_cache.get_or_set(post_id, load)
+    if payload is None and viewer_id is not None:
+        row = db.query(Post).filter(Post.id == post_id, Post.user_id == viewer_id).first()
+        payload = build_post_payloads([row], db)[post_id] if row else None
+    return payload
+
+
+def get_post_payloads(db: Session, post_ids: List[int], posts: Optional[List[Post]] = None) -> Dict[int, Dict[str, Any]]:
+    """
+    Cached payloads of several published posts, keyed by id. Misses are built
+    together in one `build_post_payloads` batch, from `posts` when the caller
+    already loaded them. Ids that no longer exist are left out.
+    """
+    payloads = {}
+    for post_id in post_ids:
+        payload = post_cache.get(post_id)
+        if payload is not None:
+            payloads[post_id] = payload
+    missing = {post_id for post_id in post_ids if post_id not in payloads}
+    if missing:
+        if posts is not None:
+            rows = [post for post in posts if post.id in missing and post.status == PostStatusEnum.PUBLISHED]
+        else:
+            rows = db.query(Post).filter(Post.id.in_(missing), Post.status == PostStatusEnum.PUBLISHED).all()
+        built = build_post_payloads(rows, db)
+        for post_id, payload in built.items():
+            post_cache.set(post_id, payload)
+        payloads.update(built)
+    return payloads
+
+
+def prepare_cached_posts_response(
+    db: Session,
+    post_ids: List[int],
+    current_user: User,
+    posts: Optional[List[Post]] = None
+) -> List[Dict[str, Any]]:
+    """Same shape as `prepare_posts_response`, in `post_ids` order, from the post and like-status caches."""
+    payloads = get_post_payloads(db, post_ids, posts)
+    liked_posts, _ = get_like_status(db, current_user.id, post_ids=post_ids)
+    return [render_post_payload(payloads[post_id], post_id in liked_posts) for post_id in post_ids if post_id in payloads]
+
+
+def prepare_cached_post_response(db: Session, post_id: int, current_user: User) -> Optional[Dict[str, Any]]:
+    """Same shape as `prepare_post_response`, served from the post cache and the viewer's like-status cache."""
+    payload = get_post_payload(db, post_id, current_user.id)
+    if payload is None:
+        return None
+    return render_post_payload(payload, post_id in get_like_status(db, current_user.id, post_ids=[post_id])[0])
+
+
+def invalidate_post_cache(post_id: Optional[int]) -> None:
+    """Called by every write that changes a post's payload: edits, deletes, likes, comments and shares."""
+    if post_id is not None:
+        post_cache.delete(post_id)
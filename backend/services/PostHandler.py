@@ -3,50 +3,150 @@ from uuid import uuid4
 import uuid
 from fastapi import APIRouter, Depends, HTTPException, Form, File, UploadFile, Query, Request
 from sqlalchemy.orm import Session
-from typing import Optional, List, Union
+from typing import Optional, List, Union, Dict, Set, Iterator
 import os
 import secrets
 from pathlib import Path
 from datetime import datetime, timezone
 from api.v1.endpoints.auth import get_current_user
 from models.user import User
-from models.post import Post, PostMedia, PostDocument, Event, Like, Comment
+from models.post import Post, PostMedia, PostDocument, Event, Like, Comment, PostStatusEnum
 from schemas.post import PostResponse, MediaPostResponse, DocumentPostResponse, EventResponse, TextPostUpdate
 from database.session import SessionLocal
 from zoneinfo import ZoneInfo
 from sqlalchemy.orm import Session, joinedload
 import shutil
+from sqlalchemy import or_, tuple_
 from core.connection_crud import get_connections
 from crud.notification import create_notification
-from AI.moderation import moderate_text
+from AI.moderation import moderate_text, ensure_appropriate
+from services.RankingHandler import initial_engagement_score
+from services.LikeCounterBuffer import pending_like_delta
+from services.LikeStatusCache import get_like_status
 import re
+import base64
+import json
+from fastapi.encoders import jsonable_encoder
 
 STATUS_404_ERROR = "Post not found"
+POST_BATCH_MAX_SIZE = int(os.getenv("POST_BATCH_MAX_SIZE", "100"))  # Ids accepted by one /posts/batch call
+POST_STREAM_BATCH_SIZE = int(os.getenv("POST_STREAM_BATCH_SIZE", "500"))  # Rows fetched per round trip when streaming
 
 def _get_post_query(db: Session, last_seen_post: Optional[int]) -> Session:
+    published = db.query(Post).filter(Post.status == PostStatusEnum.PUBLISHED)
     if not last_seen_post:
-        return db.query(Post)
-    
-    latest_post = db.query(Post).filter(Post.id == last_seen_post).first()
-    if not latest_post:
-        return db.query(Post)
-    
-    return db.query(Post).filter(Post.created_at > latest_post.created_at)
+        return published
+
+    # Resolve the last seen post's timestamp inside the same statement instead of a separate lookup
+    last_seen_created_at = (
+        db.query(Post.created_at).filter(Post.id == last_seen_post).scalar_subquery()
+    )
+    return published.filter(
+        or_(last_seen_created_at.is_(None), Post.created_at > last_seen_created_at)
+    )
 
 def get_newer_posts(last_seen_post: Optional[int], db: Session):
     return _get_post_query(db, last_seen_post)
 
+def visible_post_filter(viewer_id: Optional[int] = None):
+    """Published posts, plus the viewer's own posts that are still processing or failed."""
+    published = Post.status == PostStatusEnum.PUBLISHED
+    return or_(published, Post.user_id == viewer_id) if viewer_id is not None else published
+
+def _encode_cursor(payload: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> dict:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+
+def encode_post_cursor(post: Post) -> str:
+    """Build an opaque cursor pointing just after `post` in (created_at, id) order."""
+    return _encode_cursor({"c": post.created_at.isoformat(), "i": post.id})
+
+def decode_post_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        payload = _decode_cursor(cursor)
+        return datetime.fromisoformat(payload["c"]), int(payload["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def encode_ranked_cursor(post: Post) -> str:
+    """Build an opaque cursor pointing just after `post` in (engagement_score, id) order."""
+    return _encode_cursor({"s": post.engagement_score, "i": post.id})
+
+def decode_ranked_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        payload = _decode_cursor(cursor)
+        return float(payload["s"]), int(payload["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def encode_comment_cursor(comment: Comment) -> str:
+    """Build an opaque cursor pointing just after `comment` in (created_at, id) order, oldest first."""
+    return _encode_cursor({"c": comment.created_at.isoformat(), "i": comment.id})
+
+def decode_comment_cursor(cursor: str) -> tuple[datetime, int]:
+    return decode_post_cursor(cursor)  # Same shape as a post cursor
+
+def paginate_posts(query, limit: int, cursor: Optional[str] = None, offset: int = 0) -> tuple[List[Post], Optional[str]]:
+    """
+    Page through posts newest first on the (created_at, id) key.
+    With a cursor each page is an index range scan that costs the same at any depth;
+    `offset` is kept for older clients. Returns the page and the cursor for the next one.
+    """
+    if cursor:
+        query = query.filter(tuple_(Post.created_at, Post.id) < decode_post_cursor(cursor))
+
+    query = query.order_by(Post.created_at.desc(), Post.id.desc())
+    if not cursor and offset:
+        query = query.offset(offset)  # Must follow order_by: Query refuses order_by once OFFSET is applied
+
+    rows = query.limit(limit + 1).all()
+    posts = rows[:limit]
+    next_cursor = encode_post_cursor(posts[-1]) if len(rows) > limit and posts else None
+    return posts, next_cursor
+
+def paginate_ranked_posts(query, limit: int, cursor: Optional[str] = None, offset: int = 0) -> tuple[List[Post], Optional[str]]:
+    """Same as `paginate_posts`, highest engagement_score first, scanning ix_posts_engagement_score_id."""
+    if cursor:
+        query = query.filter(tuple_(Post.engagement_score, Post.id) < decode_ranked_cursor(cursor))
+
+    query = query.order_by(Post.engagement_score.desc(), Post.id.desc())
+    if not cursor and offset:
+        query = query.offset(offset)
+
+    rows = query.limit(limit + 1).all()
+    posts = rows[:limit]
+    next_cursor = encode_ranked_cursor(posts[-1]) if len(rows) > limit and posts else None
+    return posts, next_cursor
+
 def get_user_like_status(post_id: int, user_id: int, db: Session):
-    return db.query(Like).filter(Like.post_id == post_id, Like.user_id == user_id).first() is not None
+    return post_id in get_like_status(db, user_id, post_ids=[post_id])[0]
+
+def get_liked_post_ids(post_ids: List[int], user_id: int, db: Session) -> Set[int]:
+    """Return the subset of `post_ids` the user has liked, in one query."""
+    if not post_ids:
+        return set()
+    rows = db.query(Like.post_id).filter(Like.user_id == user_id, Like.post_id.in_(post_ids)).all()
+    return {post_id for (post_id,) in rows}
 
 def get_comments_for_post(post_id: int, db: Session):
     return db.query(Comment).filter(Comment.post_id == post_id).all()
 
-def create_post_entry(db: Session, user_id: int, content: Optional[str], post_type: str) -> Post:
+def create_post_entry(
+    db: Session,
+    user_id: int,
+    content: Optional[str],
+    post_type: str,
+    status: PostStatusEnum = PostStatusEnum.PUBLISHED
+) -> Post:
+    ensure_appropriate(content, "post")
     post = Post(content=content, user_id=user_id, post_type=post_type)
+    post.engagement_score = initial_engagement_score()
+    post.status = status
     db.add(post)
-    db.commit()
-    db.refresh(post)
+    db.flush()  # Attachments need post.id; the caller commits
     return post
 
 def _validate_post_ownership(post: Optional[Post], user_id: int) -> None:
@@ -63,6 +163,70 @@ def get_post_by_id(db: Session, post_id: int, user_id: int = None):
     _validate_post_ownership(post, user_id)
     return post
 
+def parse_post_ids(ids: str) -> List[int]:
+    """Parse a comma separated id list, dropping duplicates but keeping the requested order."""
+    try:
+        post_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma separated list of integers")
+    post_ids = list(dict.fromkeys(post_ids))
+    if not post_ids:
+        raise HTTPException(status_code=400, detail="At least one post id is required")
+    if len(post_ids) > POST_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {POST_BATCH_MAX_SIZE} post ids per request")
+    return post_ids
+
+def get_posts_by_ids(post_ids: List[int], db: Session, viewer_id: Optional[int] = None) -> tuple[List[Post], List[int]]:
+    """Fetch posts in one query. Returns them in `post_ids` order, plus the ids that were not found (or not visible)."""
+    posts = db.query(Post).filter(Post.id.in_(post_ids), visible_post_filter(viewer_id)).all()
+    posts_by_id = {post.id: post for post in posts}
+    found = [posts_by_id[post_id] for post_id in post_ids if post_id in posts_by_id]
+    missing = [post_id for post_id in post_ids if post_id not in posts_by_id]
+    return found, missing
+
+def iter_posts_ndjson(user_id: Optional[int] = None, batch_size: int = POST_STREAM_BATCH_SIZE) -> Iterator[str]:
+    """
+    Yield every published post (optionally one user's) as newline-delimited JSON.
+    Rows come from a server-side cursor `batch_size` at a time and are plain
+    column tuples, so memory stays flat however many posts there are.
+    The generator owns its session: request dependencies are closed before a
+    streaming body is sent.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(*Post.__table__.columns).filter(visible_post_filter())
+        if user_id:
+            query = query.filter(Post.user_id == user_id)
+        rows = query.order_by(Post.id).execution_options(stream_results=True, yield_per=batch_size)
+        for row in rows:
+            yield json.dumps(jsonable_encoder(dict(row._mapping))) + "\n"
+    finally:
+        db.close()
+
+# Every column a post response depends on that can change after creation; see `post_version`
+POST_VERSION_COLUMNS = (Post.id, Post.updated_at, Post.like_count, Post.comment_count, Post.share_count)
+
+def post_version(post) -> tuple:
+    """Version tuple of a post (ORM row or a row of POST_VERSION_COLUMNS), for ETags. Buffered likes count too."""
+    return (post.id, post.updated_at, post.like_count, post.comment_count, post.share_count, pending_like_delta(post.id))
+
+def get_post_version(db: Session, post_id: int, viewer_id: Optional[int] = None) -> Optional[tuple]:
+    """Version of one post from a single narrow query, without hydrating it. None if the viewer cannot see it."""
+    row = db.query(*POST_VERSION_COLUMNS).filter(Post.id == post_id, visible_post_filter(viewer_id)).first()
+    return post_version(row) if row else None
+
+def get_post_versions(db: Session, post_ids: List[int], viewer_id: Optional[int] = None) -> List[tuple]:
+    """Versions of the visible posts among `post_ids`, in that order, from one narrow query."""
+    if not post_ids:
+        return []
+    rows = db.query(*POST_VERSION_COLUMNS).filter(Post.id.in_(post_ids), visible_post_filter(viewer_id)).all()
+    versions = {row.id: post_version(row) for row in rows}
+    return [versions[post_id] for post_id in post_ids if post_id in versions]
+
+def touch_post(post: Post) -> None:
+    """Mark a post as changed when only its attachments or event were edited."""
+    post.updated_at = datetime.now(timezone.utc)
+
 def update_post_content(post: Post, content: Optional[str]):
     if content is not None:
         post.content = content
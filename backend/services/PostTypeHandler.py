@@ -1,10 +1,12 @@
 #all helper functions related to post, will be here
 from sqlalchemy.orm import Session
 from models.post import Post, PostMedia, PostDocument, Event
+from utils.image_variants import variant_url
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 import os
-from typing import Any, Dict
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
 
 # Load environment variables
 load_dotenv()
@@ -14,20 +16,21 @@ API_URL = os.getenv("VITE_API_URL")
 
 STATUS_404_ERROR = "Post not found"
 
-def _get_media_post_data(post: Post, db: Session) -> Dict[str, Any]:
-    media = db.query(PostMedia).filter(PostMedia.post_id == post.id).first()
+def _format_media_data(media: Optional[PostMedia]) -> Dict[str, Any]:
+    if not media:
+        return {"media_url": None}
+    # Feeds get the feed-width copy; clients pick another size from media_variants
     return {
-        "media_url": media.media_url if media else None
+        "media_url": variant_url(media.media_url, media.variants, "feed"),
+        "media_variants": {**(media.variants if isinstance(media.variants, dict) else {}), "original": media.media_url}
     }
 
-def _get_document_post_data(post: Post, db: Session) -> Dict[str, Any]:
-    document = db.query(PostDocument).filter(PostDocument.post_id == post.id).first()
+def _format_document_data(document: Optional[PostDocument]) -> Dict[str, Any]:
     return {
         "document_url": document.document_url if document else None
     }
 
-def _get_event_post_data(post: Post, db: Session) -> Dict[str, Any]:
-    event = db.query(Event).filter(Event.post_id == post.id).first()
+def _format_event_data(event: Optional[Event]) -> Dict[str, Any]:
     if not event:
         return {}
     return {
@@ -39,6 +42,18 @@ def _get_event_post_data(post: Post, db: Session) -> Dict[str, Any]:
         }
     }
 
+def _get_media_post_data(post: Post, db: Session) -> Dict[str, Any]:
+    media = db.query(PostMedia).filter(PostMedia.post_id == post.id).first()
+    return _format_media_data(media)
+
+def _get_document_post_data(post: Post, db: Session) -> Dict[str, Any]:
+    document = db.query(PostDocument).filter(PostDocument.post_id == post.id).first()
+    return _format_document_data(document)
+
+def _get_event_post_data(post: Post, db: Session) -> Dict[str, Any]:
+    event = db.query(Event).filter(Event.post_id == post.id).first()
+    return _format_event_data(event)
+
 def get_post_additional_data(post: Post, db: Session) -> Dict[str, Any]:
     """Get additional data based on the post type (media, document, event)."""
     handlers = {
@@ -48,3 +63,44 @@ def get_post_additional_data(post: Post, db: Session) -> Dict[str, Any]:
     }
     handler = handlers.get(post.post_type)
     return handler(post, db) if handler else {}
+
+def get_loaded_post_additional_data(post: Post) -> Dict[str, Any]:
+    """Same as `get_post_additional_data`, from attachments already loaded with the post (no queries)."""
+    attachments = {
+        "media": (post.media, _format_media_data),
+        "document": (post.documents, _format_document_data),
+        "event": ([post.event] if post.event else [], _format_event_data),
+    }
+    if post.post_type not in attachments:
+        return {}
+    rows, formatter = attachments[post.post_type]
+    return formatter(min(rows, key=lambda row: row.id, default=None))
+
+# (model, formatter) per post type, used by the bulk loader below
+_BULK_HANDLERS = {
+    "media": (PostMedia, _format_media_data),
+    "document": (PostDocument, _format_document_data),
+    "event": (Event, _format_event_data),
+}
+
+def _first_row_by_post_id(db: Session, model, post_ids: List[int]) -> Dict[int, Any]:
+    rows = db.query(model).filter(model.post_id.in_(post_ids)).order_by(model.id).all()
+    first_rows: Dict[int, Any] = {}
+    for row in rows:
+        first_rows.setdefault(row.post_id, row)
+    return first_rows
+
+def get_posts_additional_data(posts: List[Post], db: Session) -> Dict[int, Dict[str, Any]]:
+    """Bulk version of `get_post_additional_data`: one query per post type present."""
+    post_ids_by_type = defaultdict(list)
+    for post in posts:
+        if post.post_type in _BULK_HANDLERS:
+            post_ids_by_type[post.post_type].append(post.id)
+
+    additional_data: Dict[int, Dict[str, Any]] = {}
+    for post_type, post_ids in post_ids_by_type.items():
+        model, formatter = _BULK_HANDLERS[post_type]
+        rows = _first_row_by_post_id(db, model, post_ids)
+        for post_id in post_ids:
+            additional_data[post_id] = formatter(rows.get(post_id))
+    return additional_data
@@ -0,0 +1,247 @@
+#all helper functions related to background (asynchronous) post publishing, will be here
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from database.session import SessionLocal, unit_of_work
+from models.post import Post, PostMedia, PostDocument, PostStatusEnum
+from models.publish_job import PublishJob
+from models.user import User
+from services.DedupHandler import upload_to_cloudinary_deduplicated, upload_to_supabase_deduplicated, release_stored_files, purge_stored_files
+from services.ImageHandler import create_image_variants
+from services.FileHandler import save_upload_file, generate_secure_filename, remove_old_file_if_exists
+from services.NotificationHandler import send_post_notifications
+from services.TimelineHandler import fan_out_post, home_feed_readers, trim_timelines
+from services.FeedCache import invalidate_feed_cache
+from services.PostCache import invalidate_post_cache
+from services.PostHandler import touch_post
+from utils.image_variants import variant_urls
+
+load_dotenv()
+
+PUBLISH_SPOOL_DIR = os.getenv("PUBLISH_SPOOL_DIR", "uploads/spool")  # Local copies of uploads awaiting publish
+PUBLISH_MAX_ATTEMPTS = int(os.getenv("PUBLISH_MAX_ATTEMPTS", "4"))
+PUBLISH_RETRY_BASE_SECONDS = float(os.getenv("PUBLISH_RETRY_BASE_SECONDS", "2"))  # Doubles after each failed attempt
+# A pending/running job untouched this long lost its worker (crash or deploy) and may be picked up again
+PUBLISH_STALE_SECONDS = float(os.getenv("PUBLISH_STALE_SECONDS", "600"))
+MEDIA_FOLDER = "noobsquad/media_uploads"
+os.makedirs(PUBLISH_SPOOL_DIR, exist_ok=True)
+
+
+async def spool_upload(upload_file: UploadFile, user_id: int, ext: str) -> str:
+    """Copy the request body to local disk (off the event loop) and return the path."""
+    filename = generate_secure_filename(user_id, ext)
+    return await run_in_threadpool(save_upload_file, upload_file, PUBLISH_SPOOL_DIR, filename)
+
+
+def enqueue_publish(db: Session, post: Post, kind: str, spool_path: str, ext: str) -> PublishJob:
+    """Record the pending upload of a post created with status PROCESSING."""
+    job = PublishJob(post_id=post.id, kind=kind, spool_path=spool_path, file_ext=ext)
+    db.add(job)
+    db.flush()  # The background task needs job.id; the caller commits
+    return job
+
+
+def get_publish_status(db: Session, post_id: int, user_id: int) -> dict:
+    post = db.query(Post).filter(Post.id == post_id, Post.user_id == user_id).first()
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+    job = db.query(PublishJob).filter(PublishJob.post_id == post_id).first()
+    return {
+        "post_id": post.id,
+        "status": post.status,
+        "attempts": job.attempts if job else 0,
+        "last_error": job.last_error if job else None,
+    }
+
+
+def unfinished_spool_path(db: Session, post_id: int) -> Optional[str]:
+    """
+    Spool file of a post's publish that has not finished, if any. Deleting the
+    post cascades to its job row, so the caller removes the file once the delete commits.
+    """
+    return (
+        db.query(PublishJob.spool_path)
+        .filter(PublishJob.post_id == post_id, PublishJob.status != "done")
+        .scalar()
+    )
+
+
+def _stale_before() -> datetime:
+    # updated_at is stored without a time zone, in UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=PUBLISH_STALE_SECONDS)
+
+
+def _is_stalled(job: PublishJob) -> bool:
+    updated_at = job.updated_at.replace(tzinfo=None) if job.updated_at else None
+    return job.status in ("pending", "running") and updated_at is not None and updated_at < _stale_before()
+
+
+def reset_failed_publish(db: Session, post_id: int, user_id: int) -> PublishJob:
+    """Put a failed (or stalled) publish back in the queue for another round of attempts."""
+    job = (
+        db.query(PublishJob)
+        .join(Post, Post.id == PublishJob.post_id)
+        .filter(PublishJob.post_id == post_id, Post.user_id == user_id)
+        .first()
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="No background publish for this post")
+    if job.status != "failed" and not _is_stalled(job):
+        raise HTTPException(status_code=409, detail=f"Publish is {job.status}, only failed or stalled publishes can be retried")
+
+    job.status = "pending"
+    job.attempts = 0
+    db.query(Post).filter(Post.id == post_id).update({Post.status: PostStatusEnum.PROCESSING}, synchronize_session=False)
+    db.commit()
+    return job
+
+
+async def _upload(db: Session, job: PublishJob) -> Tuple[str, Optional[Dict[str, str]]]:
+    """Store the spooled file; returns its URL and, for images, the URLs of its resized variants."""
+    filename = os.path.basename(job.spool_path)
+    with open(job.spool_path, "rb") as spooled:
+        if job.kind == "media":
+            result = await upload_to_cloudinary_deduplicated(db, spooled, MEDIA_FOLDER)
+            variants = await create_image_variants(spooled, job.file_ext, MEDIA_FOLDER)
+            return result["secure_url"], variants
+        return await upload_to_supabase_deduplicated(db, spooled, filename, section="upload_documents"), None
+
+
+def _attach(db: Session, job: PublishJob, url: str, variants: Optional[Dict[str, str]]) -> None:
+    if job.kind == "media":
+        db.add(PostMedia(post_id=job.post_id, media_url=url, media_type=job.file_ext, variants=variants))
+    else:
+        db.add(PostDocument(post_id=job.post_id, document_url=url, document_type=job.file_ext))
+
+
+async def _discard_upload(db: Session, url: str, variants: Optional[Dict[str, str]], spool_path: str) -> None:
+    """Give back the references an upload took for a post that no longer exists, and drop its spool file."""
+    released = release_stored_files(db, [url] + variant_urls(variants))
+    db.commit()
+    await purge_stored_files(released)
+    remove_old_file_if_exists(spool_path)
+
+
+async def _attempt(db: Session, job_id: int) -> Optional[float]:
+    """One upload attempt. Returns the delay before the next attempt, or None when the job is finished."""
+    # Claim the job: the row lock (skipped by anyone else claiming it) plus the
+    # status switch keep a resumed job from being uploaded by two workers
+    job = db.query(PublishJob).filter(PublishJob.id == job_id).with_for_update(skip_locked=True).first()
+    if not job or job.status != "pending":
+        db.rollback()
+        return None
+    post_id, spool_path = job.post_id, job.spool_path
+    post = db.get(Post, post_id)
+    if not post:
+        db.rollback()
+        remove_old_file_if_exists(spool_path)  # Post deleted while queued
+        return None
+
+    job.status = "running"
+    job.attempts += 1
+    db.commit()
+
+    try:
+        url, variants = await _upload(db, job)
+    except Exception as e:
+        error = e.detail if isinstance(e, HTTPException) else str(e)
+        # Drop whatever the failed upload wrote (e.g. StoredFile refs taken before
+        # the variants failed), then record the failure on fresh rows
+        db.rollback()
+        job, post = db.get(PublishJob, job_id), db.get(Post, post_id)
+        if not job or not post:
+            return None
+        job.last_error = error
+        if job.attempts >= PUBLISH_MAX_ATTEMPTS:
+            job.status = "failed"
+            post.status = PostStatusEnum.FAILED
+            db.commit()
+            return None
+        job.status = "pending"
+        db.commit()
+        return PUBLISH_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+
+    # Lock the post so a delete cannot land between this check and the publish commit
+    post = db.get(Post, post_id, populate_existing=True, with_for_update=True)
+    if not post:
+        await _discard_upload(db, url, variants, spool_path)  # Post deleted while uploading
+        return None
+
+    author = db.get(User, post.user_id)
+    with unit_of_work(db):
+        _attach(db, job, url, variants)
+        post.status = PostStatusEnum.PUBLISHED
+        touch_post(post)
+        job.status = "done"
+        job.last_error = None
+        send_post_notifications(db, author, post)
+        recipients = fan_out_post(db, author, post)
+    remove_old_file_if_exists(spool_path)
+    trim_timelines(recipients)
+
+    invalidate_feed_cache(author.id, home_feed_readers(db, author, recipients))
+    invalidate_post_cache(post.id)
+    return None
+
+
+def reclaim_unfinished_publishes(db: Session) -> List[int]:
+    """
+    Ids of the jobs to resume after a restart: every pending job, plus running
+    jobs whose worker is gone (untouched for PUBLISH_STALE_SECONDS), which go
+    back to pending. Jobs still held by a live worker cannot be claimed twice.
+    """
+    jobs = (
+        db.query(PublishJob)
+        .filter(or_(
+            PublishJob.status == "pending",
+            and_(PublishJob.status == "running", PublishJob.updated_at < _stale_before()),
+        ))
+        .all()
+    )
+    for job in jobs:
+        job.status = "pending"
+    db.commit()
+    return [job.id for job in jobs]
+
+
+_resumed_tasks = set()  # Keeps the resumed tasks referenced until they finish
+
+
+async def resume_unfinished_publishes() -> None:
+    """On startup, pick up the publishes a crash or deploy left unfinished."""
+    db = SessionLocal()
+    try:
+        job_ids = reclaim_unfinished_publishes(db)
+    except Exception as e:
+        db.rollback()
+        print(f"Error resuming background publishes: {e}")
+        return
+    finally:
+        db.close()
+    for job_id in job_ids:
+        task = asyncio.create_task(process_publish_job(job_id))
+        _resumed_tasks.add(task)
+        task.add_done_callback(_resumed_tasks.discard)
+
+
+async def process_publish_job(job_id: int) -> None:
+    """
+    Background task: upload the spooled file, attach it, publish the post and
+    notify. Failed attempts are retried with exponential backoff until
+    PUBLISH_MAX_ATTEMPTS, after which the post is marked FAILED.
+    """
+    while True:
+        db = SessionLocal()
+        try:
+            delay = await _attempt(db, job_id)
+        finally:
+            db.close()
+        if delay is None:
+            return
+        await asyncio.sleep(delay)
@@ -0,0 +1,97 @@
+#all helper functions related to the ranked (engagement) feed, will be here
+import math
+import os
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import Float, cast, extract, func, select, update
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from models.post import Comment, Like, Post, Share
+
+load_dotenv()
+
+# Weight of one interaction of each kind in the engagement total
+RANKING_LIKE_WEIGHT = float(os.getenv("RANKING_LIKE_WEIGHT", "1"))
+RANKING_COMMENT_WEIGHT = float(os.getenv("RANKING_COMMENT_WEIGHT", "2"))
+RANKING_SHARE_WEIGHT = float(os.getenv("RANKING_SHARE_WEIGHT", "3"))
+# A post this many hours older needs twice the engagement to rank level
+RANKING_HALF_LIFE_HOURS = float(os.getenv("RANKING_HALF_LIFE_HOURS", "12"))
+
+# engagement_score = log2(1 + weighted engagement) + created_at / half-life
+#
+# Decay is relative: instead of shrinking every score as time passes, newer
+# posts start higher. Ordering is the same as decaying all scores by
+# 2^(-age / half-life), but a score only changes when its own post does, so
+# it can be stored, indexed, and updated in the write that changes a counter.
+
+
+def _recency(hours_since_epoch):
+    return hours_since_epoch / RANKING_HALF_LIFE_HOURS
+
+
+def initial_engagement_score(created_at: Optional[datetime] = None) -> float:
+    """Score of a post with no interactions yet."""
+    created_at = created_at or datetime.now(timezone.utc)
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)  # Naive timestamps are stored in UTC
+    return _recency(created_at.timestamp() / 3600)
+
+
+def engagement_score_expression(like_count, comment_count, share_count, created_at):
+    """The same formula as a SQL expression over the given column expressions."""
+    engagement = (
+        RANKING_LIKE_WEIGHT * func.coalesce(like_count, 0)
+        + RANKING_COMMENT_WEIGHT * func.coalesce(comment_count, 0)
+        + RANKING_SHARE_WEIGHT * func.coalesce(share_count, 0)
+    )
+    hours_since_epoch = cast(extract("epoch", created_at), Float) / 3600
+    return func.ln(1 + cast(engagement, Float)) / math.log(2) + _recency(hours_since_epoch)
+
+
+def post_counter_values(**deltas) -> dict:
+    """
+    SET clause adding `deltas` (ints or SQL expressions) to the named counters,
+    floored at 0, with the engagement score recomputed from the new values.
+    """
+    counters = {
+        name: getattr(Post, name) + deltas.get(name, 0)
+        for name in ("like_count", "comment_count", "share_count")
+    }
+    values = {name: func.greatest(expression, 0) for name, expression in counters.items() if name in deltas}
+    values["engagement_score"] = engagement_score_expression(
+        func.greatest(counters["like_count"], 0),
+        func.greatest(counters["comment_count"], 0),
+        func.greatest(counters["share_count"], 0),
+        Post.created_at
+    )
+    return values
+
+
+def adjust_post_counters(db: Session, post_id: int, **deltas: int) -> None:
+    """
+    Add `deltas` to the named counters (like_count, comment_count, share_count)
+    and re-score the post in the same UPDATE, in the caller's transaction.
+    With no deltas it only re-scores from the counters already in the row.
+    """
+    db.execute(
+        update(Post).where(Post.id == post_id).values(post_counter_values(**deltas)).execution_options(synchronize_session=False)
+    )
+
+
+def reconcile_engagement_scores(db: Session) -> int:
+    """Recompute post counters from their source tables and re-score every post. Returns the number of posts."""
+    like_count = select(func.count(Like.id)).where(Like.post_id == Post.id).scalar_subquery()
+    comment_count = select(func.count(Comment.id)).where(Comment.post_id == Post.id).scalar_subquery()
+    share_count = select(func.count(Share.id)).where(Share.post_id == Post.id).scalar_subquery()
+    result = db.execute(
+        update(Post)
+        .values(
+            like_count=like_count,
+            comment_count=comment_count,
+            share_count=share_count,
+            engagement_score=engagement_score_expression(like_count, comment_count, share_count, Post.created_at),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
@@ -3,6 +3,8 @@ from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from models.post import Post
 from models.user import User
+from utils.image_variants import avatar_url
+from services.LikeCounterBuffer import pending_like_delta
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,7 +16,7 @@ def _format_post_response(post: Post) -> Dict[str, Any]:
         "content": post.content,
         "post_type": post.post_type,
         "created_at": post.created_at.isoformat(),
-        "like_count": post.like_count
+        "like_count": max((post.like_count or 0) + pending_like_delta(post.id), 0)
     }
 
 def _format_user_response(user: User) -> Dict[str, Any]:
@@ -22,7 +24,7 @@ def _format_user_response(user: User) -> Dict[str, Any]:
         "id": user.id,
         "username": user.username,
         "email": user.email,
-        "profile_picture": user.profile_picture
+        "profile_picture": avatar_url(user)
     }
 
 def _search_posts_by_keyword(db: Session, keyword: str) -> List[Post]:
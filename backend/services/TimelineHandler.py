@@ -0,0 +1,255 @@
+#all helper functions related to the home timeline, will be here
+import os
+from collections import defaultdict
+from datetime import datetime
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import case, delete, func, insert, literal, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from database.session import SessionLocal
+from models.connection import Connection, ConnectionStatus
+from models.post import Post, PostStatusEnum
+from models.timeline import TimelineEntry
+from models.user import User
+from core.connection_crud import get_connections
+from services.PostHandler import decode_post_cursor, encode_post_cursor, visible_post_filter
+
+load_dotenv()
+
+# Oldest entries beyond this are trimmed from each user's materialized timeline
+TIMELINE_MAX_ENTRIES = int(os.getenv("TIMELINE_MAX_ENTRIES", "500"))
+TIMELINE_TRIM_BATCH_SIZE = int(os.getenv("TIMELINE_TRIM_BATCH_SIZE", "500"))  # Timelines trimmed per statement, after the response
+# Authors with at least this many connections are not fanned out; their posts are merged at read time
+CELEBRITY_CONNECTION_THRESHOLD = int(os.getenv("CELEBRITY_CONNECTION_THRESHOLD", "1000"))
+# Hybrid mode skips fan-out for celebrity authors; with it off every read is a single range scan
+TIMELINE_HYBRID_MODE = os.getenv("TIMELINE_HYBRID_MODE", "true").lower() == "true"
+
+TimelineKey = Tuple[datetime, int]  # (created_at, post_id), newest first
+
+
+class SqlTimelineStore:
+    """
+    Timeline rows in the `home_timeline` table; a page is one range scan on
+    its (user, created_at, post) index. Pushes only insert: timelines are
+    trimmed back to TIMELINE_MAX_ENTRIES later by `trim_timelines`.
+    """
+
+    def push(self, db: Session, user_ids: List[int], post: Post) -> None:
+        if not user_ids:
+            return
+        db.execute(
+            insert(TimelineEntry),
+            [
+                {"user_id": user_id, "post_id": post.id, "author_id": post.user_id, "created_at": post.created_at}
+                for user_id in user_ids
+            ],
+        )
+
+    def trim(self, db: Session, user_ids: List[int]) -> None:
+        ranked = (
+            select(
+                TimelineEntry.user_id,
+                TimelineEntry.post_id,
+                func.row_number().over(
+                    partition_by=TimelineEntry.user_id,
+                    order_by=(TimelineEntry.created_at.desc(), TimelineEntry.post_id.desc()),
+                ).label("position"),
+            )
+            .where(TimelineEntry.user_id.in_(user_ids))
+            .subquery()
+        )
+        overflow = select(ranked.c.user_id, ranked.c.post_id).where(ranked.c.position > TIMELINE_MAX_ENTRIES)
+        db.execute(
+            delete(TimelineEntry).where(tuple_(TimelineEntry.user_id, TimelineEntry.post_id).in_(overflow))
+        )
+
+    def page(self, db: Session, user_id: int, limit: int, before: Optional[TimelineKey] = None) -> List[TimelineKey]:
+        query = db.query(TimelineEntry.created_at, TimelineEntry.post_id).filter(TimelineEntry.user_id == user_id)
+        if before:
+            query = query.filter(tuple_(TimelineEntry.created_at, TimelineEntry.post_id) < before)
+        rows = query.order_by(TimelineEntry.created_at.desc(), TimelineEntry.post_id.desc()).limit(limit).all()
+        return [(created_at, post_id) for created_at, post_id in rows]
+
+
+class InMemoryTimelineStore:
+    """Process-local stand-in with the same interface, for tests and single-process development."""
+
+    def __init__(self):
+        self._timelines: Dict[int, List[TimelineKey]] = defaultdict(list)
+        self._lock = Lock()
+
+    def push(self, db: Session, user_ids: List[int], post: Post) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                timeline = self._timelines[user_id]
+                timeline.append((post.created_at, post.id))
+                timeline.sort(reverse=True)
+                del timeline[TIMELINE_MAX_ENTRIES:]
+
+    def trim(self, db: Session, user_ids: List[int]) -> None:
+        pass  # `push` already caps each list
+
+    def page(self, db: Session, user_id: int, limit: int, before: Optional[TimelineKey] = None) -> List[TimelineKey]:
+        with self._lock:
+            entries = [key for key in self._timelines.get(user_id, []) if before is None or key < before]
+        return entries[:limit]
+
+
+_STORES = {"sql": SqlTimelineStore, "memory": InMemoryTimelineStore}
+timeline_store = _STORES[os.getenv("TIMELINE_STORE", "sql")]()
+
+
+def _connection_ids(connections: List[dict], user_id: int) -> List[int]:
+    return [c["friend_id"] if c["user_id"] == user_id else c["user_id"] for c in connections]
+
+
+def _merged_at_read_time(author: User) -> bool:
+    return TIMELINE_HYBRID_MODE and (author.connection_count or 0) >= CELEBRITY_CONNECTION_THRESHOLD
+
+
+def fan_out_post(db: Session, author: User, post: Post) -> List[int]:
+    """
+    Append a new post to the home timeline of its author and every connection.
+    Celebrity authors only get their own entry; readers merge their posts at read time.
+    Both sides decide on the stored User.connection_count, so they always agree.
+    Returns the user ids whose timelines were written. The caller commits.
+    """
+    recipients = [author.id]
+    if not _merged_at_read_time(author):
+        recipients.extend(_connection_ids(get_connections(db, author.id), author.id))
+
+    timeline_store.push(db, recipients, post)
+    return recipients
+
+
+def home_feed_readers(db: Session, author: User, recipients: Optional[List[int]] = None) -> List[int]:
+    """
+    Users whose home feed shows `author`'s posts: the `fan_out_post` recipients
+    when those are passed, plus every connection of a celebrity author, whose
+    posts are merged at read time instead of fanned out.
+    """
+    if recipients is not None and not _merged_at_read_time(author):
+        return recipients
+    return [author.id] + _connection_ids(get_connections(db, author.id), author.id)
+
+
+def trim_timelines(user_ids: List[int]) -> None:
+    """
+    Cut the given timelines back to TIMELINE_MAX_ENTRIES. Runs as a background
+    task after a post is fanned out, in batches, with its own session.
+    """
+    db = SessionLocal()
+    try:
+        for start in range(0, len(user_ids), TIMELINE_TRIM_BATCH_SIZE):
+            timeline_store.trim(db, user_ids[start:start + TIMELINE_TRIM_BATCH_SIZE])
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error trimming home timelines: {e}")
+    finally:
+        db.close()
+
+
+def _connection_id_column(user_id: int):
+    """The other side of each of `user_id`'s connections."""
+    return case((Connection.user_id == user_id, Connection.friend_id), else_=Connection.user_id)
+
+
+def _celebrity_connection_ids(db: Session, user_id: int) -> List[int]:
+    """Connections of `user_id` whose stored connection count puts them over the fan-out threshold."""
+    rows = (
+        db.query(User.id)
+        .join(Connection, User.id == _connection_id_column(user_id))
+        .filter(
+            or_(Connection.user_id == user_id, Connection.friend_id == user_id),
+            Connection.status == ConnectionStatus.ACCEPTED,
+            User.connection_count >= CELEBRITY_CONNECTION_THRESHOLD,
+        )
+        .distinct()
+        .all()
+    )
+    return [member_id for (member_id,) in rows]
+
+
+def backfill_home_timeline(db: Session, user_id: int) -> None:
+    """
+    Fill a user's timeline with the newest published posts of the user and
+    their fanned-out connections, as if it had been materialized from the start.
+    Entries already there are kept. The caller commits.
+    """
+    authors = select(_connection_id_column(user_id)).where(
+        or_(Connection.user_id == user_id, Connection.friend_id == user_id),
+        Connection.status == ConnectionStatus.ACCEPTED,
+    )
+    if TIMELINE_HYBRID_MODE:  # Celebrity posts are merged at read time instead
+        authors = authors.join(User, User.id == _connection_id_column(user_id)).where(
+            User.connection_count < CELEBRITY_CONNECTION_THRESHOLD
+        )
+    newest = (
+        select(literal(user_id), Post.id, Post.user_id, Post.created_at)
+        .where(or_(Post.user_id == user_id, Post.user_id.in_(authors)), Post.status == PostStatusEnum.PUBLISHED)
+        .order_by(Post.created_at.desc(), Post.id.desc())
+        .limit(TIMELINE_MAX_ENTRIES)
+    )
+    db.execute(
+        pg_insert(TimelineEntry)
+        .from_select(["user_id", "post_id", "author_id", "created_at"], newest)
+        .on_conflict_do_nothing()
+    )
+    timeline_store.trim(db, [user_id])
+
+
+def _celebrity_keys(db: Session, author_ids: List[int], limit: int, before: Optional[TimelineKey]) -> List[TimelineKey]:
+    if not author_ids:
+        return []
+    query = db.query(Post.created_at, Post.id).filter(Post.user_id.in_(author_ids), visible_post_filter())
+    if before:
+        query = query.filter(tuple_(Post.created_at, Post.id) < before)
+    rows = query.order_by(Post.created_at.desc(), Post.id.desc()).limit(limit).all()
+    return [(created_at, post_id) for created_at, post_id in rows]
+
+
+def _load_visible_posts(db: Session, keys) -> Dict[int, Post]:
+    post_ids = [post_id for _, post_id in keys]
+    if not post_ids:
+        return {}
+    return {post.id: post for post in db.query(Post).filter(Post.id.in_(post_ids), visible_post_filter()).all()}
+
+
+def read_home_timeline(
+    db: Session,
+    user_id: int,
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[Post], Optional[str]]:
+    """
+    Read one page of a user's home feed, newest first, with the same cursor format as the main feed.
+    Only published posts are listed; timeline entries of processing or failed posts are skipped
+    by scanning further down the stored timeline, so pages stay full.
+    """
+    before = decode_post_cursor(cursor) if cursor else None
+
+    batch = timeline_store.page(db, user_id, limit + 1, before)
+    candidates = set(batch)
+    if TIMELINE_HYBRID_MODE:
+        celebrity_ids = _celebrity_connection_ids(db, user_id)
+        candidates |= set(_celebrity_keys(db, celebrity_ids, limit + 1, before))
+    posts_by_id = _load_visible_posts(db, candidates)
+
+    while len(batch) == limit + 1:
+        frontier = batch[-1]  # Everything newer than this is already a candidate
+        settled = [key for key in candidates if key >= frontier and key[1] in posts_by_id]
+        if len(settled) > limit:
+            break
+        batch = timeline_store.page(db, user_id, limit + 1, frontier)
+        fresh = set(batch) - candidates
+        candidates |= fresh
+        posts_by_id.update(_load_visible_posts(db, fresh))
+
+    keys = sorted((key for key in candidates if key[1] in posts_by_id), reverse=True)
+    posts = [posts_by_id[post_id] for _, post_id in keys[:limit]]
+
+    next_cursor = encode_post_cursor(posts[-1]) if len(keys) > limit and posts else None
+    return posts, next_cursor
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_
 from models.chat import Message
 from models.user import User
+from utils.image_variants import avatar_url
 from typing import List
 
 async def fetch_conversations(db: Session, user_id: int) -> List[dict]:
@@ -24,7 +25,7 @@ async def fetch_conversations(db: Session, user_id: int) -> List[dict]:
             conversations[friend_id] = {
                 "user_id": friend_id,
                 "username": friend.username,
-                "avatar": friend.profile_picture,
+                "avatar": avatar_url(friend),
                 "last_message": msg.content,
                 "file_url": msg.file_url,
                 "message_type": msg.message_type,
@@ -6,7 +6,7 @@ from services.FileHandler import validate_file_extension, generate_secure_filena
 from werkzeug.utils import secure_filename
 from pathlib import Path
 from dotenv import load_dotenv
-from utils.supabase import upload_file_to_supabase
+from services.DedupHandler import upload_to_supabase_deduplicated
 import uuid
 from fastapi.responses import StreamingResponse
 
@@ -16,10 +16,11 @@ UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 API_URL = os.getenv("VITE_API_URL")
 ALLOWED_DOCS = [".pdf", ".doc", ".docx"]
 
-async def save_uploaded_research_paper(file, user_id: int) -> str:
+async def save_uploaded_research_paper(file, user_id: int, db) -> str:
     ext = validate_file_extension(file.filename, ALLOWED_DOCS)
     filename = secure_filename(generate_secure_filename(user_id, ext))
-    file_path = await upload_file_to_supabase(file, filename, section="research_papers")
+    # The paper saved with this path holds the reference; it is committed with the paper
+    file_path = await upload_to_supabase_deduplicated(db, file, filename, section="research_papers")
     return file_path
 
 def get_file_response(filepath: str, filename: str):
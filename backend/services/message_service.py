@@ -1,8 +1,29 @@
 # services/message_service.py
 
+from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from models.chat import Message
+from models.chat import Message, ChatUpload
+from models.stored_file import StoredFile
 from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from services.DedupHandler import release_stored_files
+
+def record_chat_upload(db: Session, user_id: int, file_url: str) -> None:
+    """Remember that `user_id` holds the reference /chat/upload just took on file_url."""
+    stored_file_id = db.query(StoredFile.id).filter(StoredFile.url == file_url).scalar()
+    if stored_file_id is not None:
+        db.add(ChatUpload(user_id=user_id, stored_file_id=stored_file_id))
+
+def _claim_chat_upload(db: Session, sender_id: int, file_url: str) -> Optional[ChatUpload]:
+    """The sender's oldest unsent upload of file_url, locked, or None if they never uploaded it."""
+    return (
+        db.query(ChatUpload)
+        .join(StoredFile, StoredFile.id == ChatUpload.stored_file_id)
+        .filter(ChatUpload.user_id == sender_id, ChatUpload.message_id.is_(None), StoredFile.url == file_url)
+        .order_by(ChatUpload.id)
+        .with_for_update(of=ChatUpload)
+        .first()
+    )
 
 def create_message(db: Session, sender_id: int, receiver_id: int, content: str, file_url: str = None, message_type: str = "text") -> Message:
     message = Message(
@@ -14,10 +35,35 @@ def create_message(db: Session, sender_id: int, receiver_id: int, content: str,
         timestamp=datetime.now(timezone.utc)
     )
     db.add(message)
+    if file_url:
+        # Only a file the sender uploaded themselves becomes owned by the message
+        upload = _claim_chat_upload(db, sender_id, file_url)
+        if upload:
+            db.flush()
+            upload.message_id = message.id
     db.commit()
     db.refresh(message)
     return message
 
+def delete_message(db: Session, message_id: int, sender_id: int) -> List[Dict[str, Any]]:
+    """
+    Delete one of the sender's messages. A message only owns the reference its
+    sender's /chat/upload took on file_url; any other URL is left alone.
+    Returns the stored files to purge after commit.
+    """
+    message = db.query(Message).filter(Message.id == message_id, Message.sender_id == sender_id).first()
+    if not message:
+        raise HTTPException(status_code=404, detail="Message not found")
+    released = []
+    upload = db.query(ChatUpload).filter(ChatUpload.message_id == message.id).first()
+    if upload:
+        url = db.query(StoredFile.url).filter(StoredFile.id == upload.stored_file_id).scalar()
+        db.delete(upload)
+        released = release_stored_files(db, [url]) if url else []
+    db.delete(message)
+    db.commit()
+    return released
+
 def prepare_message_event(message: Message) -> dict:
     return {
         "type": "message",
@@ -1,4 +1,7 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, noload
+from sqlalchemy import DateTime, Integer, delete, exists, func, literal, literal_column, select, true, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from models.post import Like, Comment, Post
 from models.user import User
 from schemas.postReaction import LikeCreate
@@ -7,9 +10,12 @@ from models.user import User
 from models.post import Post, Like, Comment
 from zoneinfo import ZoneInfo
 from crud.notification import create_notification
+from services.RankingHandler import adjust_post_counters, post_counter_values
+from services.PostHandler import encode_comment_cursor, decode_comment_cursor
+from utils.image_variants import avatar_url
 from dotenv import load_dotenv
 import os
-from typing import Any
+from typing import Any, Optional
 
 # Load environment variables
 load_dotenv()
@@ -19,65 +25,218 @@ API_URL = os.getenv("VITE_API_URL")
 def _get_like_target(like_data: LikeCreate) -> tuple[type, int]:
     return (Post, like_data.post_id) if like_data.post_id else (Comment, like_data.comment_id)
 
-def _update_like_count(db: Session, like_data: LikeCreate, action: str) -> None:
-    model, obj_id = _get_like_target(like_data)
-    instance = db.query(model).filter(model.id == obj_id).first()
-    if instance:
-        delta = 1 if action == "add" else -1
-        instance.like_count = max(0, instance.like_count + delta)
-        db.commit()
+def update_comment_count(db: Session, post_id: int, delta: int) -> None:
+    """Adjust Post.comment_count (and the engagement score) in the database, in the caller's transaction."""
+    adjust_post_counters(db, post_id, comment_count=delta)
+
+def reconcile_comment_counts(db: Session) -> int:
+    """Recompute Post.comment_count from the comments table. Returns how many posts were corrected."""
+    actual_count = select(func.count(Comment.id)).where(Comment.post_id == Post.id).scalar_subquery()
+    result = db.execute(
+        update(Post)
+        .where(Post.comment_count.is_distinct_from(actual_count))
+        .values(comment_count=actual_count)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+def reconcile_comment_like_counts(db: Session) -> int:
+    """Recompute Comment.like_count from the likes table. Returns how many comments were corrected."""
+    actual_count = select(func.count(Like.id)).where(Like.comment_id == Comment.id).scalar_subquery()
+    result = db.execute(
+        update(Comment)
+        .where(Comment.like_count.is_distinct_from(actual_count))
+        .values(like_count=actual_count)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
 
 def notify_if_not_self(db: Session, actor_id: int, recipient_id: int, notif_type: str, post_id: int) -> None:
     if actor_id != recipient_id:
         create_notification(db, recipient_id, actor_id, notif_type, post_id)
 
-def remove_like(existing_like: Like, db: Session, like_data: LikeCreate) -> None:
-    db.delete(existing_like)
-    _update_like_count(db, like_data, "remove")
-
-def add_like(like_data: LikeCreate, db: Session, current_user: User) -> Like:
-    created_at = datetime.now(ZoneInfo("UTC"))
-    new_like = Like(
-        user_id=current_user.id,
-        post_id=like_data.post_id,
-        comment_id=like_data.comment_id,
-        created_at=created_at
-    )
-    db.add(new_like)
-    _update_like_count(db, like_data, "add")
-    db.commit()
-    db.refresh(new_like)
-    return new_like
+def toggle_like(db: Session, user_id: int, like_data: LikeCreate, buffered: bool = False) -> Optional[dict[str, Any]]:
+    """
+    Like the target if the user has not, otherwise unlike it, in one statement:
+    delete the user's like, or (if there was none) insert it, and move the
+    target's like_count (and a post's engagement score) by the difference in
+    the database. The unique (user, target) indexes make concurrent toggles
+    safe, and the counter is never read-modified-written in Python.
+    Returns the like row, the new count, the count's `delta` and whether the
+    user now likes the target; None if the target does not exist. The caller
+    commits. With `buffered`, a post's row is only read, not updated: the
+    caller adds `delta` to the like counter buffer once committed.
+    """
+    model, target_id = _get_like_target(like_data)
+    target_column = Like.post_id if model is Post else Like.comment_id
 
-def get_like_count(db: Session, like_data: LikeCreate) -> int:
-    model, obj_id = _get_like_target(like_data)
-    return db.query(model).filter(model.id == obj_id).first().like_count
+    removed = (
+        delete(Like)
+        .where(Like.user_id == user_id, target_column == target_id)
+        .returning(Like.id, Like.created_at)
+        .cte("removed")
+    )
+    insert_like = pg_insert(Like).from_select(
+        ["user_id", "post_id", "comment_id", "created_at"],
+        select(
+            literal(user_id),
+            literal(like_data.post_id, Integer),
+            literal(like_data.comment_id, Integer),
+            literal(datetime.now(ZoneInfo("UTC")), DateTime),
+        ).where(~exists(select(removed.c.id)))
+    )
+    added = (
+        # A concurrent request from the same user may have inserted it first: the
+        # no-op update waits for it and returns that row, flagged as not inserted
+        insert_like.on_conflict_do_update(
+            index_elements=[Like.user_id, target_column],
+            index_where=target_column.isnot(None),
+            set_={"user_id": insert_like.excluded.user_id},
+        )
+        .returning(Like.id, Like.created_at, literal_column("xmax = 0").label("inserted"))
+        .cte("added")
+    )
+    delta = (
+        select(func.count()).select_from(added).where(added.c.inserted).scalar_subquery()
+        - select(func.count()).select_from(removed).scalar_subquery()
+    )
+    if buffered and model is Post:
+        counter = select(model.like_count, model.user_id).where(model.id == target_id).cte("counter")
+    else:
+        if model is Post:
+            values = post_counter_values(like_count=delta)
+        else:
+            values = {"like_count": func.greatest(func.coalesce(model.like_count, 0) + delta, 0)}
+        counter = (
+            update(model)
+            .where(model.id == target_id)
+            .values(values)
+            .returning(model.like_count, model.user_id)
+            .cte("counter")
+        )
+    statement = (
+        select(
+            counter.c.like_count,
+            counter.c.user_id.label("owner_id"),
+            func.coalesce(added.c.id, removed.c.id).label("id"),
+            func.coalesce(added.c.created_at, removed.c.created_at).label("created_at"),
+            removed.c.id.is_(None).label("user_liked"),
+            func.coalesce(added.c.inserted, False).label("created"),
+            delta.label("delta"),
+        )
+        .select_from(counter.outerjoin(added, true()).outerjoin(removed, true()))
+    )
+    try:
+        row = db.execute(statement).first()
+    except IntegrityError:  # The target was deleted or never existed
+        db.rollback()
+        return None
+    return row._asdict() if row else None
 
 def _serialize_user(user: User) -> dict[str, Any]:
     return {
         "id": user.id,
         "username": user.username,
-        "profile_picture": user.profile_picture
+        "profile_picture": avatar_url(user)
     }
 
-def _build_reply_response(reply: Comment, user: User) -> dict[str, Any]:
-    return {
-        "id": reply.id,
-        "content": reply.content,
-        "created_at": reply.created_at,
-        "user": _serialize_user(reply.user),
-        "total_likes": len(reply.likes),
-        "user_liked": any(l.user_id == user.id for l in reply.likes)
-    }
-
-def build_comment_response(comment: Comment, db: Session, user: User) -> dict[str, Any]:
-    replies = db.query(Comment).filter(Comment.parent_id == comment.id).all()
+def _serialize_comment(comment: Comment, liked_ids: set[int]) -> dict[str, Any]:
     return {
         "id": comment.id,
         "content": comment.content,
         "created_at": comment.created_at,
         "user": _serialize_user(comment.user),
-        "total_likes": len(comment.likes),
-        "user_liked": any(l.user_id == user.id for l in comment.likes),
-        "replies": [_build_reply_response(r, user) for r in replies]
-    }
\ No newline at end of file
+        "total_likes": comment.like_count or 0,
+        "user_liked": comment.id in liked_ids
+    }
+
+def _comments_query(db: Session):
+    # Authors come in the same query; likes are never loaded, like_count is read instead
+    return db.query(Comment).options(joinedload(Comment.user), noload(Comment.likes), noload(Comment.replies))
+
+def _after_cursor(query, cursor: Optional[str]):
+    if cursor:
+        query = query.filter(tuple_(Comment.created_at, Comment.id) > decode_comment_cursor(cursor))
+    return query.order_by(Comment.created_at, Comment.id)
+
+def get_liked_comment_ids(comment_ids: list[int], user_id: int, db: Session) -> set[int]:
+    """Which of these comments the user likes, in one query."""
+    if not comment_ids:
+        return set()
+    rows = db.query(Like.comment_id).filter(Like.user_id == user_id, Like.comment_id.in_(comment_ids)).all()
+    return {row.comment_id for row in rows}
+
+def _first_replies(db: Session, root_ids: list[int], limit: int) -> dict[int, tuple[list[Comment], int]]:
+    """The first `limit` replies of each root and its reply total, in one windowed query."""
+    if not root_ids or limit <= 0:
+        return {}
+    ranked = (
+        select(
+            Comment.id,
+            func.row_number().over(partition_by=Comment.parent_id, order_by=(Comment.created_at, Comment.id)).label("position"),
+            func.count().over(partition_by=Comment.parent_id).label("total"),
+        )
+        .where(Comment.parent_id.in_(root_ids))
+        .subquery()
+    )
+    rows = (
+        _comments_query(db)
+        .add_columns(ranked.c.total)
+        .join(ranked, ranked.c.id == Comment.id)
+        .filter(ranked.c.position <= limit)
+        .order_by(Comment.created_at, Comment.id)
+        .all()
+    )
+    replies: dict[int, tuple[list[Comment], int]] = {}
+    for reply, total in rows:
+        replies.setdefault(reply.parent_id, ([], total))[0].append(reply)
+    return replies
+
+def load_comment_tree(
+    db: Session,
+    post_id: int,
+    user: User,
+    limit: int,
+    cursor: Optional[str] = None,
+    replies_limit: int = 0,
+) -> dict[str, Any]:
+    """
+    A page of a post's root comments, oldest first, each with its first
+    `replies_limit` replies, in three queries whatever the page size: roots
+    with authors, replies with authors (windowed per root), and the viewer's
+    likes. Threads with more replies carry `replies_next_cursor` for
+    `load_replies`.
+    """
+    rows = (
+        _after_cursor(_comments_query(db).filter(Comment.post_id == post_id, Comment.parent_id.is_(None)), cursor)
+        .limit(limit + 1)
+        .all()
+    )
+    roots = rows[:limit]
+    replies = _first_replies(db, [root.id for root in roots], replies_limit)
+    loaded = [root.id for root in roots] + [reply.id for thread, _ in replies.values() for reply in thread]
+    liked_ids = get_liked_comment_ids(loaded, user.id, db)
+
+    comments = []
+    for root in roots:
+        thread, total = replies.get(root.id, ([], 0 if replies_limit > 0 else None))  # Unknown when no replies were asked for
+        comments.append({
+            **_serialize_comment(root, liked_ids),
+            "replies": [_serialize_comment(reply, liked_ids) for reply in thread],
+            "reply_count": total,
+            "replies_next_cursor": encode_comment_cursor(thread[-1]) if thread and total > len(thread) else None,
+        })
+    next_cursor = encode_comment_cursor(roots[-1]) if len(rows) > limit and roots else None
+    return {"comments": comments, "next_cursor": next_cursor}
+
+def load_replies(db: Session, comment_id: int, user: User, limit: int, cursor: Optional[str] = None) -> dict[str, Any]:
+    """The next page of one thread's replies ("load more replies"), in two queries."""
+    rows = _after_cursor(_comments_query(db).filter(Comment.parent_id == comment_id), cursor).limit(limit + 1).all()
+    replies = rows[:limit]
+    liked_ids = get_liked_comment_ids([reply.id for reply in replies], user.id, db)
+    return {
+        "replies": [_serialize_comment(reply, liked_ids) for reply in replies],
+        "next_cursor": encode_comment_cursor(replies[-1]) if len(rows) > limit and replies else None,
+    }
@@ -7,6 +7,7 @@ from services.message_service import create_message, prepare_message_event
 from services.chat_service import fetch_chat_history
 from models.chat import Message
 from sqlalchemy.orm import Session
+from AI.moderation import moderate_text
 
 clients: Dict[int, WebSocket] = {}
 
@@ -31,6 +32,11 @@ async def handle_chat_message(db: Session, user_id: int, message_data: dict):
     content = message_data.get("content")
     file_url = message_data.get("file_url", None)
     message_type = message_data.get("message_type", "text")
+
+    if moderate_text(content):
+        # Only the sender hears about it; nothing is stored or delivered
+        await send_socket_message(from_id, {"type": "error", "detail": "Inappropriate content detected, Please revise your message."})
+        return
     
     message = create_message(db, from_id, to_id, content, file_url, message_type)
     event = prepare_message_event(message)
@@ -0,0 +1,141 @@
+import pytest
+import time
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.cache import InMemoryCacheBackend, LocalRedisStandIn, RedisCacheBackend, ResponseCache
+import services.FeedCache as feed_cache_module
+from services.FeedCache import feed_cache_key, feed_cache_scope, invalidate_feed_cache
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request):
+    if request.param == "memory":
+        backend = InMemoryCacheBackend(maxsize=2, ttl=60)
+    else:
+        backend = RedisCacheBackend(LocalRedisStandIn(), ttl=60)
+    return ResponseCache("test", backend=backend)
+
+
+def test_hit_and_miss_counters(cache):
+    assert cache.get("page") is None
+    cache.set("page", {"posts": [1, 2]})
+
+    assert cache.get("page") == {"posts": [1, 2]}
+    assert cache.stats() == {"namespace": "test", "hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+
+def test_invalidate_drops_every_entry(cache):
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.invalidate()
+
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+
+
+def test_scoped_invalidate_drops_only_that_scope(cache):
+    cache.set("page", 1, scope=("home", 1))
+    cache.set("page", 2, scope=("home", 2))
+
+    cache.invalidate([("home", 1)])
+
+    assert cache.get("page", scope=("home", 1)) is None
+    assert cache.get("page", scope=("home", 2)) == 2
+
+
+def test_invalidate_without_scopes_drops_scoped_entries_too(cache):
+    cache.set("page", 1, scope=("home", 1))
+
+    cache.invalidate()
+
+    assert cache.get("page", scope=("home", 1)) is None
+
+
+def test_get_or_set_computes_once(cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "value"
+
+    assert cache.get_or_set("key", compute) == "value"
+    assert cache.get_or_set("key", compute) == "value"
+    assert len(calls) == 1
+
+
+def test_get_or_set_does_not_store_result_invalidated_mid_compute(cache):
+    def compute():
+        cache.invalidate()  # A write lands while the page is being built
+        return "stale"
+
+    cache.get_or_set("key", compute)
+
+    assert cache.get("key") is None
+
+
+def test_in_memory_backend_evicts_least_recently_used():
+    cache = ResponseCache("lru", backend=InMemoryCacheBackend(maxsize=2, ttl=60))
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_in_memory_backend_expires_entries():
+    cache = ResponseCache("ttl", backend=InMemoryCacheBackend(maxsize=10, ttl=0.01))
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+
+
+def test_in_memory_backend_honours_per_entry_ttl():
+    backend = InMemoryCacheBackend(maxsize=10, ttl=60)
+    backend.set("short", 1, ttl=0.01)
+    backend.add("marker", "pending", ttl=0.01)
+    backend.set("default", 2)
+    time.sleep(0.02)
+
+    assert backend.get("short") is None
+    assert backend.get("default") == 2
+    assert backend.add("marker", "again") is True  # The expired marker no longer blocks
+
+
+@pytest.mark.parametrize("backend", [InMemoryCacheBackend(maxsize=10, ttl=60), RedisCacheBackend(LocalRedisStandIn(), ttl=60)])
+def test_add_only_sets_absent_keys(backend):
+    assert backend.add("lock", "first") is True
+    assert backend.add("lock", "second") is False
+    assert backend.get("lock") == "first"
+
+    backend.delete("lock")
+    assert backend.add("lock", "third") is True
+
+
+def test_feed_cache_key_is_order_independent():
+    assert feed_cache_key(1, cursor="x", user_id=None) == feed_cache_key(1, user_id=None, cursor="x")
+    assert feed_cache_key(1, cursor="x") != feed_cache_key(2, cursor="x")
+
+
+def test_invalidate_feed_cache_keeps_other_viewers_home_pages(monkeypatch):
+    cache = ResponseCache("feed-test", backend=InMemoryCacheBackend(maxsize=16, ttl=60))
+    monkeypatch.setattr(feed_cache_module, "feed_cache", cache)
+    pages = {
+        "reader_home": feed_cache_scope(2, "home", None),
+        "stranger_home": feed_cache_scope(3, "home", None),
+        "all": feed_cache_scope(3, "all", None),
+        "author_profile": feed_cache_scope(3, "all", 1),
+        "other_profile": feed_cache_scope(3, "all", 4),
+    }
+    for name, scope in pages.items():
+        cache.set(name, [1], scope=scope)
+
+    invalidate_feed_cache(1, [1, 2])
+
+    assert {name for name, scope in pages.items() if cache.get(name, scope=scope)} == {"stranger_home", "other_profile"}
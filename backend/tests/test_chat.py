@@ -98,7 +98,7 @@ def test_get_chat_history_unauthorized():
 
 # --- Upload Endpoint ---
 def test_upload_file_success(override_auth_and_db):
-    with patch("api.v1.endpoints.chat.upload_file_to_supabase", new_callable=AsyncMock) as mock_upload, \
+    with patch("api.v1.endpoints.chat.upload_to_supabase_deduplicated", new_callable=AsyncMock) as mock_upload, \
          patch("api.v1.endpoints.chat.generate_secure_filename", return_value="secure.jpg"):
         mock_upload.return_value = "https://cdn.supabase.io/chat/secure.jpg"
         file_content = b"test file content"
@@ -114,7 +114,7 @@ def test_upload_file_success(override_auth_and_db):
 
 def test_upload_file_invalid_type(override_auth_and_db):
     with patch("api.v1.endpoints.chat.generate_secure_filename", return_value="secure.exe"), \
-         patch("api.v1.endpoints.chat.upload_file_to_supabase", new_callable=AsyncMock) as mock_upload:
+         patch("api.v1.endpoints.chat.upload_to_supabase_deduplicated", new_callable=AsyncMock) as mock_upload:
         # Simulate error in upload (invalid type)
         mock_upload.side_effect = Exception("Unsupported file type")
         file_content = b"test file content"
@@ -133,4 +133,14 @@ def test_upload_file_unauthorized():
         "/chat/upload",
         files={"file": ("test_file.jpg", test_file, "image/jpeg")}
     )
+    assert response.status_code == 401
+
+# --- Delete Message Endpoint ---
+def test_delete_message_releases_its_file(override_auth_and_db):
+    with patch("api.v1.endpoints.chat.delete_message", return_value=[{"remote_id": "chat/a.jpg"}]) as mock_delete, \
+         patch("api.v1.endpoints.chat.purge_stored_files", new_callable=AsyncMock) as mock_purge:
+        response = client.delete("/chat/messages/5")
+
     assert response.status_code == 200
+    mock_delete.assert_called_once_with(override_auth_and_db, 5, 1)
+    mock_purge.assert_awaited_once_with([{"remote_id": "chat/a.jpg"}])
@@ -0,0 +1,60 @@
+import pytest
+from unittest.mock import MagicMock, Mock, patch
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from models.post import Comment
+from services.reaction import update_comment_count
+from routes.postReaction import delete_comment
+
+
+@pytest.fixture
+def mock_db():
+    return MagicMock(spec=Session)
+
+
+@pytest.fixture
+def mock_comment():
+    comment = Mock(spec=Comment)
+    comment.id = 4
+    comment.user_id = 1
+    comment.post_id = 9
+    return comment
+
+
+def test_update_comment_count_issues_single_update(mock_db):
+    update_comment_count(mock_db, 9, 1)
+
+    mock_db.execute.assert_called_once()
+    mock_db.commit.assert_not_called()  # Caller commits together with the comment row
+
+
+@patch('routes.postReaction.invalidate_post_cache')
+@patch('routes.postReaction.update_comment_count')
+@patch('routes.postReaction.get_comment_by_id')
+def test_delete_comment_decrements_comment_and_replies(mock_get_comment, mock_update, mock_invalidate, mock_db, mock_comment):
+    mock_get_comment.return_value = mock_comment
+    mock_db.query.return_value.filter.return_value.count.return_value = 2
+
+    result = delete_comment(mock_comment.id, db=mock_db, current_user=Mock(id=1))
+
+    assert result == {"message": "Comment deleted successfully"}
+    mock_update.assert_called_once_with(mock_db, 9, -3)
+    mock_db.delete.assert_called_once_with(mock_comment)
+    mock_db.commit.assert_called_once()
+    mock_invalidate.assert_called_once_with(9)
+
+
+@patch('routes.postReaction.update_comment_count')
+@patch('routes.postReaction.get_comment_by_id')
+def test_delete_comment_rejects_other_users(mock_get_comment, mock_update, mock_db, mock_comment):
+    mock_get_comment.return_value = mock_comment
+
+    with pytest.raises(HTTPException) as exc_info:
+        delete_comment(mock_comment.id, db=mock_db, current_user=Mock(id=2))
+
+    assert exc_info.value.status_code == 403
+    mock_update.assert_not_called()
+    mock_db.delete.assert_not_called()
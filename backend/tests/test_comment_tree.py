@@ -0,0 +1,111 @@
+import sys
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import event
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from database.session import SessionLocal, Base, engine
+# Every mapped model must be imported before the first query so relationships resolve
+from models import chat, collaboration_request, connection, hashtag, notifications, post, publish_job, research_collaboration, research_paper, stored_file, timeline, university, user  # noqa: F401
+from models.post import Comment, Like, Post
+from models.user import User
+from services.reaction import load_comment_tree, load_replies
+
+pytestmark = pytest.mark.skipif(engine.dialect.name != "postgresql", reason="Needs the PostgreSQL test database")
+
+
+@pytest.fixture
+def thread():
+    """A post with 6 root comments; the first two have 5 replies each. The viewer liked root 0 and its first reply."""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    tag = uuid.uuid4().hex[:8]
+    users = [User(username=f"commenter_{tag}_{i}", email=f"commenter_{tag}_{i}@example.invalid", hashed_password="-") for i in range(3)]
+    db.add_all(users)
+    db.flush()
+    post = Post(user_id=users[0].id, content="thread", post_type="TEXT")
+    db.add(post)
+    db.flush()
+    roots = [Comment(user_id=users[i % 3].id, post_id=post.id, content=f"root {i}", like_count=0) for i in range(6)]
+    db.add_all(roots)
+    db.flush()
+    replies = {
+        root.id: [Comment(user_id=users[j % 3].id, post_id=post.id, parent_id=root.id, content=f"reply {i}.{j}", like_count=0) for j in range(5)]
+        for i, root in enumerate(roots[:2])
+    }
+    db.add_all([reply for thread_replies in replies.values() for reply in thread_replies])
+    db.flush()
+    viewer = users[1]
+    for comment in (roots[0], replies[roots[0].id][0]):
+        db.add(Like(user_id=viewer.id, comment_id=comment.id))
+        comment.like_count = 1
+    db.commit()
+    ids = SimpleNamespace(post=post.id, roots=[root.id for root in roots], viewer=SimpleNamespace(id=viewer.id), users=[u.id for u in users])
+    db.close()
+
+    db = SessionLocal()
+    yield db, ids
+    db.rollback()
+    db.query(Like).filter(Like.user_id.in_(ids.users)).delete(synchronize_session=False)
+    db.query(Comment).filter(Comment.post_id == ids.post, Comment.parent_id.isnot(None)).delete(synchronize_session=False)
+    db.query(Comment).filter(Comment.post_id == ids.post).delete(synchronize_session=False)
+    db.query(Post).filter(Post.id == ids.post).delete()
+    db.query(User).filter(User.id.in_(ids.users)).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def record(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def test_page_of_roots_with_replies_in_three_queries(thread, statements):
+    db, ids = thread
+
+    tree = load_comment_tree(db, ids.post, ids.viewer, limit=4, replies_limit=2)
+
+    assert len(statements) == 3
+    comments = tree["comments"]
+    assert [c["content"] for c in comments] == ["root 0", "root 1", "root 2", "root 3"]
+    assert [r["content"] for r in comments[0]["replies"]] == ["reply 0.0", "reply 0.1"]
+    assert comments[0]["reply_count"] == 5 and comments[0]["replies_next_cursor"]
+    assert comments[2]["replies"] == [] and comments[2]["reply_count"] == 0 and comments[2]["replies_next_cursor"] is None
+    assert (comments[0]["total_likes"], comments[0]["user_liked"]) == (1, True)
+    assert (comments[1]["total_likes"], comments[1]["user_liked"]) == (0, False)
+    assert comments[0]["replies"][0]["user_liked"] is True
+    assert comments[0]["user"]["username"].startswith("commenter_")
+    assert tree["next_cursor"]
+
+
+def test_cursor_walks_the_remaining_roots(thread):
+    db, ids = thread
+
+    first = load_comment_tree(db, ids.post, ids.viewer, limit=4)
+    second = load_comment_tree(db, ids.post, ids.viewer, limit=4, cursor=first["next_cursor"])
+
+    assert [c["content"] for c in second["comments"]] == ["root 4", "root 5"]
+    assert second["next_cursor"] is None
+
+
+def test_load_more_replies_continues_the_thread(thread, statements):
+    db, ids = thread
+    root = load_comment_tree(db, ids.post, ids.viewer, limit=1, replies_limit=2)["comments"][0]
+    statements.clear()
+
+    page = load_replies(db, ids.roots[0], ids.viewer, limit=2, cursor=root["replies_next_cursor"])
+    last = load_replies(db, ids.roots[0], ids.viewer, limit=2, cursor=page["next_cursor"])
+
+    assert len(statements) == 4  # Replies with authors, then likes-by-me, per page
+    assert [r["content"] for r in page["replies"]] == ["reply 0.2", "reply 0.3"]
+    assert [r["content"] for r in last["replies"]] == ["reply 0.4"]
+    assert last["next_cursor"] is None
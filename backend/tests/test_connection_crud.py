@@ -93,6 +93,24 @@ def test_accept_request_success(mock_db):
     assert result.status == ConnectionStatus.ACCEPTED
     mock_db.commit.assert_called_once()
 
+def test_accept_request_counts_the_connection_for_both_users(mock_db):
+    mock_connection = Mock(spec=Connection, id=1, user_id=1, friend_id=2, status=ConnectionStatus.PENDING)
+    mock_db.query.return_value.filter_by.return_value.first.return_value = mock_connection
+    mock_db.query.return_value.filter.return_value.first.return_value = None  # Not yet connected the other way
+
+    accept_request(mock_db, request_id=1)
+
+    mock_db.query.return_value.filter.return_value.update.assert_called_once()
+
+def test_accept_request_does_not_count_a_pair_twice(mock_db):
+    mock_connection = Mock(spec=Connection, id=1, user_id=1, friend_id=2, status=ConnectionStatus.PENDING)
+    mock_db.query.return_value.filter_by.return_value.first.return_value = mock_connection
+    mock_db.query.return_value.filter.return_value.first.return_value = (7,)  # 2 -> 1 already accepted
+
+    accept_request(mock_db, request_id=1)
+
+    mock_db.query.return_value.filter.return_value.update.assert_not_called()
+
 def test_accept_request_not_found(mock_db):
     # Setup
     mock_db.query.return_value.filter_by.return_value.first.return_value = None
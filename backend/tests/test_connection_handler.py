@@ -107,6 +107,14 @@ class TestConnectionHandler(TestCase):
         self.mock_db.commit.assert_called_once()
         self.assertEqual(result["message"], "Connection accepted!")
 
+    def test_accept_connection_request_counts_the_connection(self):
+        mock_connection = Mock(user_id=2, friend_id=self.user_id, status=ConnectionStatus.PENDING)
+        self.mock_db.query.return_value.filter.return_value.first.side_effect = [mock_connection, None]
+
+        ConnectionHandler.accept_connection_request(self.mock_db, request_id=1, user_id=self.user_id)
+
+        self.mock_db.query.return_value.filter.return_value.update.assert_called_once()
+
     def test_reject_connection_request_success(self):
         mock_connection = Mock(
             friend_id=self.user_id,
@@ -0,0 +1,120 @@
+import hashlib
+import io
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from models.stored_file import StoredFile
+import services.DedupHandler as dedup_handler
+from services.DedupHandler import hash_stream, upload_deduplicated, release_stored_files, purge_stored_files
+
+
+def make_db(existing=None, inserted=None):
+    db = MagicMock()
+    db.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = existing
+    db.query.return_value.populate_existing.return_value.filter.return_value.one.return_value = inserted
+    db.execute.return_value.scalar_one.return_value = 7
+    return db
+
+
+def make_stored(**fields):
+    stored = MagicMock(spec=StoredFile)
+    stored.configure_mock(**fields)
+    return stored
+
+
+def test_hash_stream_reads_whole_content_and_rewinds():
+    stream = io.BytesIO(b"slides" * 1000)
+    stream.seek(10)
+
+    digest, size = hash_stream(stream)
+
+    assert digest == hashlib.sha256(b"slides" * 1000).hexdigest()
+    assert size == 6000
+    assert stream.tell() == 0
+
+
+@pytest.mark.asyncio
+async def test_duplicate_content_skips_upload_and_takes_reference():
+    existing = make_stored(url="https://cdn/a.pdf", ref_count=2)
+    db = make_db(existing=existing)
+    upload = AsyncMock()
+
+    stored = await upload_deduplicated(db, io.BytesIO(b"same"), "supabase", upload)
+
+    assert stored is existing
+    assert existing.ref_count == 3
+    upload.assert_not_called()
+    db.commit.assert_not_called()  # The caller commits the reference with the row that uses it
+
+
+@pytest.mark.asyncio
+async def test_new_content_is_uploaded_and_indexed():
+    inserted = make_stored(url="https://cdn/new.pdf", ref_count=1)
+    db = make_db(inserted=inserted)
+    upload = AsyncMock(return_value={"url": "https://cdn/new.pdf", "remote_id": "chat/new.pdf"})
+
+    stored = await upload_deduplicated(db, io.BytesIO(b"new"), "supabase", upload)
+
+    assert stored is inserted
+    upload.assert_awaited_once()
+    values = db.execute.call_args[0][0].compile().params
+    assert values["digest"] == hashlib.sha256(b"new").hexdigest()
+    assert values["url"] == "https://cdn/new.pdf" and values["size"] == 3
+
+
+@pytest.mark.asyncio
+async def test_cloudinary_hit_returns_stored_resource_type():
+    existing = make_stored(url="https://res.cloudinary.com/x/video/upload/a.mp4", resource_type="video", ref_count=1)
+    db = make_db(existing=existing)
+
+    with patch.object(dedup_handler, "run_upload", AsyncMock()) as run_upload:
+        result = await dedup_handler.upload_to_cloudinary_deduplicated(db, io.BytesIO(b"clip"), "folder")
+
+    assert result == {"secure_url": existing.url, "resource_type": "video"}
+    run_upload.assert_not_called()
+
+
+def test_release_keeps_shared_objects():
+    stored = make_stored(url="https://cdn/a.pdf", ref_count=2)
+    db = make_db(existing=stored)
+
+    assert release_stored_files(db, ["https://cdn/a.pdf"]) == []
+    assert stored.ref_count == 1
+    db.delete.assert_not_called()
+
+
+def test_release_of_last_reference_returns_object_to_purge():
+    stored = make_stored(url="https://cdn/a.pdf", ref_count=1, destination="supabase", remote_id="chat/a.pdf", resource_type=None)
+    db = make_db(existing=stored)
+
+    released = release_stored_files(db, ["https://cdn/a.pdf"])
+
+    assert released == [{"destination": "supabase", "remote_id": "chat/a.pdf", "resource_type": None}]
+    db.delete.assert_called_once_with(stored)
+
+
+def test_release_ignores_untracked_urls():
+    db = make_db(existing=None)
+
+    assert release_stored_files(db, ["https://legacy/upload.jpg"]) == []
+    db.delete.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_purge_deletes_from_the_right_destination_and_survives_errors():
+    storage = MagicMock()
+    released = [
+        {"destination": "cloudinary", "remote_id": "media/a", "resource_type": "video"},
+        {"destination": "supabase", "remote_id": "chat/b.pdf", "resource_type": None},
+    ]
+    run_upload = AsyncMock(side_effect=[Exception("cloudinary down"), None])
+
+    with patch.object(dedup_handler, "run_upload", run_upload), \
+         patch.object(dedup_handler, "get_storage", return_value=storage):
+        await purge_stored_files(released)
+
+    assert run_upload.await_args_list[0].args == ("cloudinary", dedup_handler.delete_from_cloudinary, "media/a", "video")
+    assert run_upload.await_args_list[1].args == ("supabase", storage.delete, "chat/b.pdf")
@@ -0,0 +1,127 @@
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock, Mock, patch
+from fastapi import Response
+from sqlalchemy.orm import Session
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.cache import InMemoryCacheBackend, ResponseCache
+from routes import post as post_routes
+from services.PostHandler import post_version
+from utils.etag import weak_etag, etag_matches
+
+
+def make_request(if_none_match=None):
+    request = Mock()
+    request.headers = {"if-none-match": if_none_match} if if_none_match else {}
+    return request
+
+
+@pytest.fixture
+def feed_cache(monkeypatch):
+    cache = ResponseCache("etag-test", backend=InMemoryCacheBackend(maxsize=16, ttl=60))
+    monkeypatch.setattr(post_routes, "feed_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def page_post():
+    return Mock(id=1, updated_at=datetime(2025, 1, 1), like_count=2, comment_count=0, share_count=0)
+
+
+def test_etag_matches_uses_weak_comparison():
+    etag = weak_etag(1, "v")
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(etag.removeprefix("W/"), etag)
+    assert etag_matches(f'W/"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches(weak_etag(2, "v"), etag)
+
+
+# routes.post defines two functions named get_posts; take the feed one from its route
+feed_endpoint = next(route.endpoint for route in post_routes.router.routes if route.path == "/")
+
+
+def get_feed(request, response, db, user):
+    return feed_endpoint(
+        request, response, limit=10, offset=0, last_seen_post=None, user_id=None,
+        cursor=None, feed="all", rank="recent", db=db, current_user=user
+    )
+
+
+@patch('routes.post.prepare_cached_posts_response')
+@patch('routes.post._select_feed_posts')
+def test_feed_returns_304_for_current_etag(mock_select, mock_prepare, feed_cache, page_post):
+    mock_select.return_value = ([page_post], None)
+    mock_prepare.return_value = [{"id": 1, "total_likes": 2}]
+    db, user = MagicMock(spec=Session), Mock(id=7)
+
+    first_response = Response()
+    page = get_feed(make_request(), first_response, db, user)
+    etag = first_response.headers["ETag"]
+
+    feed_cache.invalidate()  # A new post elsewhere drops the cached composition
+    result = get_feed(make_request(etag), Response(), db, user)
+
+    assert page["posts"] == [{"id": 1, "total_likes": 2}]
+    assert result.status_code == 304
+    assert result.headers["ETag"] == etag
+    mock_prepare.assert_called_once()
+
+
+@patch('routes.post.get_post_versions')
+@patch('routes.post.prepare_cached_posts_response')
+@patch('routes.post._select_feed_posts')
+def test_feed_shows_new_counters_without_invalidating_the_page(mock_select, mock_prepare, mock_versions, feed_cache, page_post):
+    mock_select.return_value = ([page_post], None)
+    mock_prepare.return_value = [{"id": 1, "total_likes": 2}]
+    db, user = MagicMock(spec=Session), Mock(id=7)
+
+    first_response = Response()
+    get_feed(make_request(), first_response, db, user)
+    mock_versions.return_value = [(1, page_post.updated_at, 3, 0, 0, 0)]  # A like since the first read
+    mock_prepare.return_value = [{"id": 1, "total_likes": 3}]
+    second_response = Response()
+    result = get_feed(make_request(first_response.headers["ETag"]), second_response, db, user)
+
+    assert result["posts"] == [{"id": 1, "total_likes": 3}]
+    assert second_response.headers["ETag"] != first_response.headers["ETag"]
+    mock_select.assert_called_once()  # The page composition came from the feed cache
+    mock_versions.assert_called_once_with(db, [1], user.id)
+    assert mock_prepare.call_args[0][1] == [1]
+
+
+@patch('routes.post.get_post_versions')
+@patch('routes.post.prepare_cached_posts_response')
+@patch('routes.post._select_feed_posts')
+def test_cached_feed_page_returns_304_without_hydrating(mock_select, mock_prepare, mock_versions, feed_cache, page_post):
+    mock_select.return_value = ([page_post], None)
+    mock_prepare.return_value = [{"id": 1, "total_likes": 2}]
+    db, user = MagicMock(spec=Session), Mock(id=7)
+
+    first_response = Response()
+    get_feed(make_request(), first_response, db, user)
+    mock_versions.return_value = [post_version(page_post)]
+    result = get_feed(make_request(first_response.headers["ETag"]), Response(), db, user)
+
+    assert result.status_code == 304
+    mock_prepare.assert_called_once()  # Only the first, uncached request rendered the page
+
+
+@patch('routes.post.prepare_post_response')
+@patch('routes.post.get_post_version')
+def test_single_post_returns_304_without_hydrating(mock_version, mock_prepare):
+    mock_version.return_value = (1, datetime(2025, 1, 1), 2, 0, 0)
+    user = Mock(id=7)
+
+    result = post_routes.get_single_post(
+        1, make_request(weak_etag(user.id, mock_version.return_value)), Response(),
+        db=MagicMock(spec=Session), current_user=user
+    )
+
+    assert result.status_code == 304
+    mock_prepare.assert_not_called()
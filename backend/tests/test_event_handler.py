@@ -110,7 +110,8 @@ class TestEventHandler(TestCase):
             "event"
         )
         self.mock_db.add.assert_called_once()
-        self.mock_db.commit.assert_called_once()
+        self.mock_db.flush.assert_called_once()
+        self.mock_db.commit.assert_not_called()  # The route's unit of work commits
         self.assertEqual(post, mock_post)
         self.assertIsNotNone(created_event)
 
@@ -132,7 +133,7 @@ class TestEventHandler(TestCase):
         self.assertEqual(updated_event.title, "Updated Title")
         self.assertEqual(updated_event.description, "Updated Description")
         self.assertEqual(updated_event.location, "Updated Location")
-        self.mock_db.commit.assert_called_once()
+        self.mock_db.commit.assert_not_called()
 
     def test_format_event_response(self):
         mock_post = Mock(
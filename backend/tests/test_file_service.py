@@ -16,7 +16,7 @@ class TestFileService(IsolatedAsyncioTestCase):
     @patch('services.file_service.validate_file_extension')
     @patch('services.file_service.secure_filename')
     @patch('services.file_service.generate_secure_filename')
-    @patch('services.file_service.upload_file_to_supabase')
+    @patch('services.file_service.upload_to_supabase_deduplicated')
     async def test_save_uploaded_research_paper(
         self,
         mock_upload_to_supabase,
@@ -31,13 +31,15 @@ class TestFileService(IsolatedAsyncioTestCase):
         mock_upload_to_supabase.return_value = "https://example.com/papers/secure_name.pdf"
 
         # Call function
-        result = await save_uploaded_research_paper(self.mock_file, self.user_id)
+        mock_db = Mock()
+        result = await save_uploaded_research_paper(self.mock_file, self.user_id, mock_db)
 
         # Verify
         mock_validate_extension.assert_called_once_with(self.mock_file.filename, ALLOWED_DOCS)
         mock_generate_filename.assert_called_once_with(self.user_id, ".pdf")
         mock_secure_filename.assert_called_once_with("generated_name.pdf")
         mock_upload_to_supabase.assert_called_once_with(
+            mock_db,
             self.mock_file,
             "secure_name.pdf",
             section="research_papers"
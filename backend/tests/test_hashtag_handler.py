@@ -0,0 +1,83 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from sqlalchemy.dialects import postgresql
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.cache import InMemoryCacheBackend
+import services.HashtagHandler as hashtag_handler
+from services.HashtagHandler import UniversityNameMatcher, attach_hashtags
+
+
+def make_db(*names):
+    db = MagicMock()
+    db.query.return_value.all.return_value = [(name,) for name in names]
+    return db
+
+
+@pytest.fixture
+def matcher():
+    return UniversityNameMatcher(ttl=300, backend=InMemoryCacheBackend(maxsize=1, ttl=300))
+
+
+def test_match_keeps_university_tags_lowercased_and_unique(matcher):
+    db = make_db("MIT", "Stanford")
+
+    assert matcher.match(db, ["mit", "MIT", "Stanford", "random"]) == ["mit", "stanford"]
+
+
+def test_names_are_loaded_once_per_process(matcher):
+    db = make_db("MIT")
+
+    for _ in range(5):
+        matcher.match(db, ["mit"])
+
+    db.query.assert_called_once()
+
+
+def test_posts_without_hashtags_do_not_load_names(matcher):
+    db = make_db("MIT")
+
+    assert matcher.match(db, []) == []
+    db.query.assert_not_called()
+
+
+def test_invalidate_reloads_on_next_match(matcher):
+    matcher.match(make_db("MIT"), ["oxford"])
+
+    matcher.invalidate()
+    db = make_db("MIT", "Oxford")
+
+    assert matcher.match(db, ["oxford"]) == ["oxford"]
+    db.query.assert_called_once()
+
+
+def test_names_are_reloaded_after_ttl(matcher):
+    db = make_db("MIT")
+    matcher.match(db, ["mit"])
+
+    with patch.object(hashtag_handler.time, "monotonic", return_value=hashtag_handler.time.monotonic() + 301):
+        matcher.match(db, ["mit"])
+
+    assert db.query.call_count == 2
+
+
+def test_attach_hashtags_upserts_in_one_statement():
+    db = MagicMock()
+    db.execute.return_value.scalars.return_value.all.return_value = [3, 9]
+
+    attach_hashtags(db, 42, ["mit", "oxford"])
+
+    upsert = str(db.execute.call_args_list[0].args[0].compile(dialect=postgresql.dialect()))
+    assert upsert.count("INSERT INTO hashtags") == 1
+    assert "ON CONFLICT (name) DO UPDATE SET usage_count = (hashtags.usage_count + " in upsert
+    assert db.execute.call_args_list[1].args[1] == [{"post_id": 42, "hashtag_id": 3}, {"post_id": 42, "hashtag_id": 9}]
+
+
+def test_attach_hashtags_without_names_does_nothing():
+    db = MagicMock()
+
+    attach_hashtags(db, 42, [])
+
+    db.execute.assert_not_called()
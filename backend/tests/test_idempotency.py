@@ -0,0 +1,216 @@
+import asyncio
+import re
+import pytest
+from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.cache import InMemoryCacheBackend
+from core.idempotency import IdempotencyMiddleware, IDEMPOTENT_ROUTES, PENDING
+
+USERS = {b"Bearer user-1": 1, b"Bearer user-2": 2}  # Stands in for verifying the JWT
+
+
+@pytest.fixture
+def app_and_calls():
+    app = FastAPI()
+    backend = InMemoryCacheBackend(maxsize=100, ttl=60)
+    app.add_middleware(
+        IdempotencyMiddleware,
+        routes=[re.compile(r"^/posts/create_text_post/$"), re.compile(r"^/fails$"), re.compile(r"^/slow$")],
+        backend=backend,
+        identify=USERS.get
+    )
+    calls = {"create": 0, "fails": 0, "slow": 0}
+
+    @app.post("/posts/create_text_post/")
+    def create():
+        calls["create"] += 1
+        return {"id": calls["create"]}
+
+    @app.post("/slow")
+    def slow(background_tasks: BackgroundTasks):
+        calls["slow"] += 1
+
+        def background():
+            # The response is already out: a retry now replays it instead of getting 409
+            calls["during_background"] = backend.get(IdempotencyMiddleware.store_key(1, "/slow", b"bg"))["status"]
+            raise RuntimeError("notification delivery failed")
+
+        background_tasks.add_task(background)
+        return {"id": calls["slow"]}
+
+    @app.post("/fails")
+    def fails():
+        calls["fails"] += 1
+        if calls["fails"] == 1:
+            raise HTTPException(status_code=503, detail="Upload timed out")
+        return {"ok": True}
+
+    @app.post("/other")
+    def other():
+        return {"ok": True}
+
+    return TestClient(app), calls, backend
+
+
+def test_retry_with_same_key_replays_the_first_response(app_and_calls):
+    client, calls, _ = app_and_calls
+    headers = {"Idempotency-Key": "abc", "Authorization": "Bearer user-1"}
+
+    first = client.post("/posts/create_text_post/", headers=headers)
+    retry = client.post("/posts/create_text_post/", headers=headers)
+
+    assert calls["create"] == 1
+    assert retry.json() == first.json() == {"id": 1}
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+
+
+def test_keys_are_scoped_to_the_caller(app_and_calls):
+    client, calls, _ = app_and_calls
+
+    client.post("/posts/create_text_post/", headers={"Idempotency-Key": "abc", "Authorization": "Bearer user-1"})
+    other = client.post("/posts/create_text_post/", headers={"Idempotency-Key": "abc", "Authorization": "Bearer user-2"})
+
+    assert calls["create"] == 2
+    assert other.json() == {"id": 2}
+
+
+def test_requests_without_key_always_run(app_and_calls):
+    client, calls, _ = app_and_calls
+
+    client.post("/posts/create_text_post/")
+    client.post("/posts/create_text_post/")
+
+    assert calls["create"] == 2
+
+
+def test_failed_responses_are_not_replayed(app_and_calls):
+    client, calls, _ = app_and_calls
+    headers = {"Idempotency-Key": "k", "Authorization": "Bearer user-1"}
+
+    assert client.post("/fails", headers=headers).status_code == 503
+    assert client.post("/fails", headers=headers).status_code == 200
+    assert calls["fails"] == 2
+
+
+def test_retry_while_first_request_runs_gets_409(app_and_calls):
+    client, calls, backend = app_and_calls
+    headers = {"Idempotency-Key": "busy", "Authorization": "Bearer user-1"}
+    first_request = client.build_request("POST", "/posts/create_text_post/", headers=headers)
+    store_key = IdempotencyMiddleware.store_key(1, "/posts/create_text_post/", b"busy")
+    backend.set(store_key, {"status": PENDING, "fingerprint": _fingerprint_of(first_request)})  # First request still running
+
+    response = client.post("/posts/create_text_post/", headers=headers)
+
+    assert response.status_code == 409
+    assert calls["create"] == 0
+
+
+def test_reusing_a_key_for_a_different_body_gets_422(app_and_calls):
+    client, calls, _ = app_and_calls
+    headers = {"Idempotency-Key": "abc", "Authorization": "Bearer user-1"}
+
+    client.post("/posts/create_text_post/", headers=headers, content=b"first post")
+    reused = client.post("/posts/create_text_post/", headers=headers, content=b"another post")
+
+    assert reused.status_code == 422
+    assert calls["create"] == 1
+
+
+def test_multipart_retry_with_a_new_boundary_is_replayed(app_and_calls):
+    client, calls, _ = app_and_calls
+    headers = {"Idempotency-Key": "upload", "Authorization": "Bearer user-1"}
+
+    for boundary in ("first-attempt", "second-attempt"):
+        response = client.post(
+            "/posts/create_text_post/",
+            headers={**headers, "Content-Type": f"multipart/form-data; boundary={boundary}"},
+            content=f'--{boundary}\r\nContent-Disposition: form-data; name="content"\r\n\r\nhello\r\n--{boundary}--\r\n'.encode(),
+        )
+
+    assert calls["create"] == 1
+    assert response.headers["idempotent-replayed"] == "true"
+
+
+def test_response_is_stored_before_background_tasks_run(app_and_calls):
+    client, calls, _ = app_and_calls
+    headers = {"Idempotency-Key": "bg", "Authorization": "Bearer user-1"}
+
+    with pytest.raises(RuntimeError):
+        client.post("/slow", headers=headers)
+    retry = client.post("/slow", headers=headers)
+
+    assert calls["during_background"] == 200
+    assert calls["slow"] == 1  # A failing background task does not let the retry create again
+    assert retry.json() == {"id": 1}
+
+
+def test_unauthenticated_requests_pass_through(app_and_calls):
+    client, calls, backend = app_and_calls
+
+    client.post("/posts/create_text_post/", headers={"Idempotency-Key": "abc", "Authorization": "Bearer forged"})
+    client.post("/posts/create_text_post/", headers={"Idempotency-Key": "abc", "Authorization": "Bearer forged"})
+
+    assert calls["create"] == 2
+    assert len(backend._entries) == 0
+
+
+def test_routes_not_listed_are_untouched(app_and_calls):
+    client, _, backend = app_and_calls
+
+    client.post("/other", headers={"Idempotency-Key": "abc"})
+
+    assert len(backend._entries) == 0
+
+
+@pytest.mark.parametrize("path", [
+    "/posts/create_media_post/",
+    "/posts/create_event_post/",
+    "/interactions/4/comment",
+    "/interactions/4/comment/9/reply",
+    "/interactions/4/share",
+    "/chat/upload",
+])
+def test_create_routes_are_idempotent(path):
+    assert any(route.match(path) for route in IDEMPOTENT_ROUTES)
+
+
+def test_likes_are_not_in_the_idempotent_routes():
+    assert not any(route.match("/interactions/like") for route in IDEMPOTENT_ROUTES)
+
+
+def test_cancelled_request_releases_its_key():
+    backend = InMemoryCacheBackend(maxsize=100, ttl=60)
+
+    async def cancelled_app(scope, receive, send):
+        raise asyncio.CancelledError()
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    middleware = IdempotencyMiddleware(
+        cancelled_app, routes=[re.compile(r"^/posts/create_text_post/$")], backend=backend, identify=USERS.get
+    )
+    scope = {"type": "http", "method": "POST", "path": "/posts/create_text_post/",
+             "headers": [(b"idempotency-key", b"abc"), (b"authorization", b"Bearer user-1")]}
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(middleware(scope, receive, None))
+
+    assert backend.add(IdempotencyMiddleware.store_key(1, scope["path"], b"abc"), PENDING) is True  # Not left PENDING
+
+
+def _fingerprint_of(request) -> str:
+    from core.idempotency import _spool_body
+    body = iter([{"type": "http.request", "body": request.read(), "more_body": False}])
+
+    async def receive():
+        return next(body)
+
+    spooled, _, fingerprint = asyncio.run(_spool_body(receive, None))
+    spooled.close()
+    return fingerprint
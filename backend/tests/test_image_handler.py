@@ -0,0 +1,120 @@
+import io
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from PIL import Image
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import services.ImageHandler as image_handler
+from services.ImageHandler import IMAGE_VARIANT_WIDTHS, create_image_variants, render_variants
+from services.PostTypeHandler import _format_media_data
+from utils.image_variants import avatar_url, variant_url
+
+
+def image_bytes(size, mode="RGB", fmt="JPEG"):
+    out = io.BytesIO()
+    Image.new(mode, size, color=(200, 30, 30, 128) if mode == "RGBA" else (200, 30, 30)).save(out, fmt)
+    return out.getvalue()
+
+
+def test_render_variants_produces_webp_at_each_width():
+    variants = render_variants(image_bytes((2400, 1600)))
+
+    assert set(variants) == set(IMAGE_VARIANT_WIDTHS)
+    for name, data in variants.items():
+        with Image.open(io.BytesIO(data)) as image:
+            assert image.format == "WEBP"
+            assert image.size == (IMAGE_VARIANT_WIDTHS[name], round(IMAGE_VARIANT_WIDTHS[name] * 2 / 3))
+
+
+def test_render_variants_never_upscales_and_keeps_transparency():
+    variants = render_variants(image_bytes((100, 50), mode="RGBA", fmt="PNG"))
+
+    with Image.open(io.BytesIO(variants["full"])) as image:
+        assert image.size == (100, 50)
+        assert image.mode == "RGBA"
+
+
+@pytest.fixture
+def variant_sessions():
+    sessions = []
+
+    def new_session():
+        sessions.append(MagicMock())
+        return sessions[-1]
+
+    with patch.object(image_handler, "SessionLocal", side_effect=new_session):
+        yield sessions
+
+
+@pytest.mark.asyncio
+async def test_create_image_variants_uploads_each_variant_in_its_own_session(variant_sessions):
+    upload = AsyncMock(side_effect=lambda db, stream, folder: {"secure_url": f"https://cdn/{len(stream.getvalue())}.webp"})
+    stream = io.BytesIO(image_bytes((1600, 900)))
+
+    with patch.object(image_handler, "upload_to_cloudinary_deduplicated", upload):
+        urls = await create_image_variants(stream, ".JPG", "folder")
+
+    assert set(urls) == set(IMAGE_VARIANT_WIDTHS)
+    assert upload.await_count == len(IMAGE_VARIANT_WIDTHS)
+    assert {id(call.args[0]) for call in upload.await_args_list} == {id(session) for session in variant_sessions}
+    for session in variant_sessions:
+        session.commit.assert_called_once()
+        session.close.assert_called_once()
+    assert stream.tell() == 0  # Left rewound for the caller
+
+
+@pytest.mark.asyncio
+async def test_create_image_variants_releases_the_others_when_one_upload_fails(variant_sessions):
+    async def upload(db, stream, folder):
+        if db is variant_sessions[0]:
+            raise RuntimeError("cloudinary is down")
+        return {"secure_url": f"https://cdn/{id(db)}.webp"}
+
+    with patch.object(image_handler, "upload_to_cloudinary_deduplicated", AsyncMock(side_effect=upload)), \
+         patch.object(image_handler, "release_stored_files", return_value=[{"remote_id": "x"}]) as release, \
+         patch.object(image_handler, "purge_stored_files", new_callable=AsyncMock) as purge:
+        with pytest.raises(RuntimeError, match="cloudinary is down"):
+            await create_image_variants(io.BytesIO(image_bytes((800, 600))), ".png", "folder")
+
+    variant_sessions[0].rollback.assert_called_once()
+    released_urls = release.call_args[0][1]
+    assert len(released_urls) == len(IMAGE_VARIANT_WIDTHS) - 1
+    purge.assert_awaited_once_with([{"remote_id": "x"}])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("content, ext", [(b"\x00\x00\x00\x18ftypmp42", ".mp4"), (b"GIF89a", ".gif"), (b"not an image", ".png")])
+async def test_create_image_variants_skips_what_it_cannot_resize(content, ext):
+    upload = AsyncMock()
+
+    with patch.object(image_handler, "upload_to_cloudinary_deduplicated", upload):
+        assert await create_image_variants(io.BytesIO(content), ext, "folder") is None
+
+    upload.assert_not_called()
+
+
+def test_feed_payload_uses_feed_variant():
+    media = MagicMock(media_url="https://cdn/original.jpg", variants={"thumb": "https://cdn/t.webp", "feed": "https://cdn/f.webp"})
+
+    data = _format_media_data(media)
+
+    assert data["media_url"] == "https://cdn/f.webp"
+    assert data["media_variants"]["original"] == "https://cdn/original.jpg"
+
+
+def test_originals_are_served_when_there_are_no_variants():
+    media = MagicMock(media_url="https://cdn/clip.mp4", variants=None)
+    user = MagicMock(profile_picture="https://cdn/me.gif", profile_picture_variants=None)
+
+    assert _format_media_data(media)["media_url"] == "https://cdn/clip.mp4"
+    assert avatar_url(user) == "https://cdn/me.gif"
+    assert variant_url(None, None, "thumb") is None
+
+
+def test_avatar_url_defaults_to_thumbnail():
+    user = MagicMock(profile_picture="https://cdn/me.jpg", profile_picture_variants={"thumb": "https://cdn/me_t.webp", "feed": "https://cdn/me_f.webp"})
+
+    assert avatar_url(user) == "https://cdn/me_t.webp"
+    assert avatar_url(user, "feed") == "https://cdn/me_f.webp"
@@ -0,0 +1,79 @@
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import pytest
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from database.session import SessionLocal, Base, engine
+# Every mapped model must be imported before the first query so relationships resolve
+from models import chat, collaboration_request, connection, hashtag, notifications, post, publish_job, research_collaboration, research_paper, stored_file, timeline, university, user  # noqa: F401
+from models.post import Like, Post
+from models.user import User
+from schemas.postReaction import LikeCreate
+from services.reaction import toggle_like
+
+THREADS = 12  # Within the engine's default pool (5 + 10 overflow)
+
+pytestmark = pytest.mark.skipif(engine.dialect.name != "postgresql", reason="The like toggle uses PostgreSQL upserts")
+
+
+@pytest.fixture
+def target():
+    """A post and 60 users, removed afterwards."""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    tag = uuid.uuid4().hex[:8]
+    users = [User(username=f"liker_{tag}_{i}", email=f"liker_{tag}_{i}@example.invalid", hashed_password="-") for i in range(60)]
+    db.add_all(users)
+    db.flush()
+    post = Post(user_id=users[0].id, content="hammered", post_type="TEXT", like_count=0)
+    db.add(post)
+    db.commit()
+    user_ids, post_id = [u.id for u in users], post.id
+    yield db, user_ids, post_id
+    db.query(Like).filter(Like.post_id == post_id).delete()
+    db.query(Post).filter(Post.id == post_id).delete()
+    db.query(User).filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+
+def _toggle(user_id: int, post_id: int) -> None:
+    db = SessionLocal()
+    try:
+        toggle_like(db, user_id, LikeCreate(post_id=post_id, comment_id=None))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _counts(db, post_id: int):
+    db.expire_all()
+    like_count = db.query(Post.like_count).filter(Post.id == post_id).scalar()
+    rows = db.query(Like).filter(Like.post_id == post_id).count()
+    return like_count, rows
+
+
+def test_concurrent_likes_from_many_users_are_all_counted(target):
+    db, user_ids, post_id = target
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        list(pool.map(lambda uid: _toggle(uid, post_id), user_ids))
+    assert _counts(db, post_id) == (len(user_ids), len(user_ids))
+
+    # And all unliked again
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        list(pool.map(lambda uid: _toggle(uid, post_id), user_ids))
+    assert _counts(db, post_id) == (0, 0)
+
+
+def test_one_user_toggling_concurrently_keeps_count_and_rows_in_step(target):
+    db, user_ids, post_id = target
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        list(pool.map(lambda _: _toggle(user_ids[1], post_id), range(200)))
+
+    like_count, rows = _counts(db, post_id)
+    assert rows in (0, 1)
+    assert like_count == rows
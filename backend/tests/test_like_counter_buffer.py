@@ -0,0 +1,121 @@
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from services import LikeCounterBuffer as buffer_module
+from services.LikeCounterBuffer import LikeCounterBuffer
+from utils.post_utils import render_post_payload
+
+
+def _buffer(session=None):
+    session = session or MagicMock()
+    return LikeCounterBuffer(shards=4, interval=60, session_factory=lambda: session), session
+
+
+def test_add_accumulates_per_post():
+    buffer, _ = _buffer()
+
+    assert buffer.add(7, 1) == 1
+    assert buffer.add(7, 1) == 2
+    assert buffer.add(7, -1) == 1
+    assert buffer.add(11, 1) == 1  # Same shard (11 % 4 == 7 % 4), separate counter
+
+    assert buffer.pending(7) == 1
+    assert buffer.pending(8) == 0
+
+
+@patch("services.LikeCounterBuffer.apply_like_deltas")
+def test_flush_applies_all_deltas_in_one_batch(mock_apply):
+    buffer, session = _buffer()
+    flushed = []
+    buffer._on_flush = flushed.extend
+    buffer.add(1, 1)
+    buffer.add(2, 1)
+    buffer.add(2, 1)
+    buffer.add(3, 1)
+    buffer.add(3, -1)  # Nets to zero: nothing to write
+
+    assert buffer.flush() == 2
+
+    mock_apply.assert_called_once_with(session, {1: 1, 2: 2})
+    session.commit.assert_called_once()
+    session.close.assert_called_once()
+    assert sorted(flushed) == [1, 2]
+    assert buffer.pending(2) == 0
+
+
+@patch("services.LikeCounterBuffer.apply_like_deltas")
+def test_pending_includes_deltas_being_flushed(mock_apply):
+    buffer, session = _buffer()
+    buffer.add(5, 1)
+    seen_during_flush = []
+    session.commit.side_effect = lambda: seen_during_flush.append(buffer.add(5, 1))
+
+    buffer.flush()
+
+    assert seen_during_flush == [2]  # The drained like is still visible until the commit lands
+    assert buffer.pending(5) == 1  # Only the like added during the flush remains
+
+
+@patch("services.LikeCounterBuffer.apply_like_deltas")
+def test_in_flight_deltas_clear_once_the_commit_lands(mock_apply):
+    buffer, session = _buffer()
+    buffer.add(5, 1)
+    seen_at_close = []
+    session.close.side_effect = lambda: seen_at_close.append(buffer.pending(5))
+
+    buffer.flush()
+
+    assert seen_at_close == [0]  # A reader between commit and close must not add the flushed like twice
+
+
+@patch("services.LikeCounterBuffer.apply_like_deltas", side_effect=Exception("deadlock"))
+def test_failed_flush_keeps_deltas(mock_apply):
+    buffer, session = _buffer()
+    buffer.add(5, 1)
+
+    assert buffer.flush() == 0
+
+    session.rollback.assert_called_once()
+    assert buffer.pending(5) == 1
+
+
+def test_flush_with_nothing_pending_skips_the_database():
+    buffer, session = _buffer()
+
+    assert buffer.flush() == 0
+    session.execute.assert_not_called()
+
+
+@patch("services.LikeCounterBuffer.apply_like_deltas")
+def test_stop_flushes_what_is_left(mock_apply):
+    buffer, _ = _buffer()
+    buffer.start()
+    buffer.add(9, 1)
+
+    buffer.stop()
+
+    mock_apply.assert_called_once()
+    assert buffer.pending(9) == 0
+    assert buffer._thread is None
+
+
+def test_apply_like_deltas_is_one_update():
+    session = MagicMock()
+
+    buffer_module.apply_like_deltas(session, {1: 3, 2: -1})
+
+    session.execute.assert_called_once()
+    sql = str(session.execute.call_args[0][0])
+    assert sql.startswith("UPDATE posts SET")
+    assert "like_count=greatest(posts.like_count + like_deltas.delta" in sql
+    assert "FROM (VALUES" in sql
+
+
+def test_render_merges_pending_likes(monkeypatch):
+    payload = {"post": {"id": 4, "total_likes": 10}, "type_data": {}}
+    monkeypatch.setattr("utils.post_utils.pending_like_delta", lambda post_id: 3)
+
+    assert render_post_payload(payload, True)["total_likes"] == 13
+    assert payload["post"]["total_likes"] == 10  # The cached payload is not modified
@@ -0,0 +1,99 @@
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy.orm import Session
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import services.LikeStatusCache as like_status_module
+from core.cache import InMemoryCacheBackend, ResponseCache
+from services.LikeStatusCache import get_like_status, record_like_status
+
+
+@pytest.fixture(autouse=True)
+def like_status_cache(monkeypatch):
+    cache = ResponseCache("like-status-test", backend=InMemoryCacheBackend(maxsize=16, ttl=60))
+    monkeypatch.setattr(like_status_module, "like_status_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def mock_db():
+    db = MagicMock(spec=Session)
+    db.query.return_value.filter.return_value.all.return_value = [
+        MagicMock(post_id=2, comment_id=None),
+        MagicMock(post_id=None, comment_id=9),
+    ]
+    return db
+
+
+def test_posts_and_comments_answered_in_one_query(mock_db):
+    liked_posts, liked_comments = get_like_status(mock_db, 1, post_ids=[2, 3, 2], comment_ids=[9, 10])
+
+    assert (liked_posts, liked_comments) == ({2}, {9})
+    mock_db.query.assert_called_once()
+
+
+def test_second_lookup_is_served_from_cache(mock_db):
+    get_like_status(mock_db, 1, post_ids=[2, 3], comment_ids=[9])
+
+    assert get_like_status(mock_db, 1, post_ids=[3, 2], comment_ids=[9]) == ({2}, {9})
+    mock_db.query.assert_called_once()  # "Not liked" answers are cached too
+
+
+def test_only_unknown_targets_are_queried(mock_db):
+    get_like_status(mock_db, 1, post_ids=[2])
+    mock_db.query.reset_mock()
+    mock_db.query.return_value.filter.return_value.all.return_value = []
+
+    assert get_like_status(mock_db, 1, post_ids=[2, 4]) == ({2}, set())
+    mock_db.query.assert_called_once()
+    sql = str(mock_db.query.return_value.filter.call_args[0][1])
+    assert "likes.post_id IN" in sql and "comment_id" not in sql
+
+
+def test_like_writes_update_the_cached_answer(mock_db):
+    get_like_status(mock_db, 1, post_ids=[2, 3])
+
+    record_like_status(1, 2, None, False)
+    record_like_status(1, 3, None, True)
+
+    assert get_like_status(mock_db, 1, post_ids=[2, 3]) == ({3}, set())
+    mock_db.query.assert_called_once()
+
+
+def test_lookup_does_not_overwrite_a_recorded_like(like_status_cache, mock_db):
+    # A like recorded while the lookup's query was running wins over the query's answer
+    mock_db.query.return_value.filter.return_value.all.side_effect = lambda: record_like_status(1, 7, None, True) or []
+
+    get_like_status(mock_db, 1, post_ids=[7])
+
+    assert like_status_cache.get(1)[("post", 7)] is True
+
+
+def test_cache_entry_is_bounded_per_user(like_status_cache, mock_db, monkeypatch):
+    monkeypatch.setattr(like_status_module, "LIKE_STATUS_CACHE_TARGETS", 3)
+    mock_db.query.return_value.filter.return_value.all.return_value = []
+
+    get_like_status(mock_db, 1, post_ids=[1, 2, 3, 4, 5])
+
+    assert len(like_status_cache.get(1)) == 3
+
+
+def test_users_do_not_share_answers(mock_db):
+    get_like_status(mock_db, 1, post_ids=[2])
+    mock_db.query.return_value.filter.return_value.all.return_value = []
+
+    assert get_like_status(mock_db, 2, post_ids=[2]) == (set(), set())
+    assert mock_db.query.call_count == 2
+
+
+def test_oldest_answers_are_dropped_first(like_status_cache, mock_db, monkeypatch):
+    monkeypatch.setattr(like_status_module, "LIKE_STATUS_CACHE_TARGETS", 3)
+    mock_db.query.return_value.filter.return_value.all.return_value = []
+    get_like_status(mock_db, 1, post_ids=[1, 2, 3])
+
+    record_like_status(1, 1, None, True)  # Refreshes post 1
+    get_like_status(mock_db, 1, post_ids=[4])
+
+    assert list(like_status_cache.get(1)) == [("post", 3), ("post", 1), ("post", 4)]
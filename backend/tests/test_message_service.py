@@ -1,8 +1,11 @@
 from unittest import TestCase
 from unittest.mock import Mock, patch
 from datetime import datetime, timezone
+from fastapi import HTTPException
 from services.message_service import (
     create_message,
+    delete_message,
+    record_chat_upload,
     prepare_message_event
 )
 
@@ -34,6 +37,64 @@ class TestMessageService(TestCase):
         self.mock_db.refresh.assert_called_once_with(mock_message)
         self.assertEqual(result, mock_message)
 
+    @patch('services.message_service.Message')
+    def test_create_message_claims_the_senders_upload(self, mock_message_class):
+        mock_message = Mock(id=9)
+        mock_message_class.return_value = mock_message
+        upload = Mock(message_id=None)
+        claim = self.mock_db.query.return_value.join.return_value.filter.return_value
+        claim.order_by.return_value.with_for_update.return_value.first.return_value = upload
+
+        create_message(self.mock_db, self.sender_id, self.receiver_id, None, self.file_url, "file")
+
+        self.assertEqual(upload.message_id, 9)
+        self.mock_db.flush.assert_called_once()
+        self.mock_db.commit.assert_called_once()
+
+    def test_record_chat_upload_ties_the_reference_to_the_uploader(self):
+        self.mock_db.query.return_value.filter.return_value.scalar.return_value = 4
+
+        record_chat_upload(self.mock_db, self.sender_id, self.file_url)
+
+        upload = self.mock_db.add.call_args.args[0]
+        self.assertEqual((upload.user_id, upload.stored_file_id), (self.sender_id, 4))
+
+    @patch('services.message_service.release_stored_files', return_value=[{"remote_id": "chat/file.pdf"}])
+    def test_delete_message_releases_its_own_upload(self, mock_release):
+        message = Mock(id=7, file_url=self.file_url)
+        upload = Mock(stored_file_id=4)
+        self.mock_db.query.return_value.filter.return_value.first.side_effect = [message, upload]
+        self.mock_db.query.return_value.filter.return_value.scalar.return_value = self.file_url
+
+        released = delete_message(self.mock_db, 7, self.sender_id)
+
+        mock_release.assert_called_once_with(self.mock_db, [self.file_url])
+        self.mock_db.delete.assert_any_call(upload)
+        self.mock_db.delete.assert_any_call(message)
+        self.mock_db.commit.assert_called_once()
+        self.assertEqual(released, [{"remote_id": "chat/file.pdf"}])
+
+    @patch('services.message_service.release_stored_files')
+    def test_delete_message_leaves_urls_it_did_not_upload_alone(self, mock_release):
+        # e.g. someone else's post image pasted into a message
+        message = Mock(id=7, file_url="https://res.cloudinary.com/demo/image/upload/post.jpg")
+        self.mock_db.query.return_value.filter.return_value.first.side_effect = [message, None]
+
+        released = delete_message(self.mock_db, 7, self.sender_id)
+
+        mock_release.assert_not_called()
+        self.mock_db.delete.assert_called_once_with(message)
+        self.assertEqual(released, [])
+
+    def test_delete_message_of_someone_else_is_not_found(self):
+        self.mock_db.query.return_value.filter.return_value.first.return_value = None
+
+        with self.assertRaises(HTTPException) as context:
+            delete_message(self.mock_db, 7, self.sender_id)
+
+        self.assertEqual(context.exception.status_code, 404)
+        self.mock_db.delete.assert_not_called()
+
     def test_prepare_message_event(self):
         mock_time = datetime.now(timezone.utc)
         mock_message = Mock(
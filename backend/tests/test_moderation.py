@@ -2,7 +2,9 @@ import pytest
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[1]))
-from AI.moderation import moderate_text
+from unittest.mock import patch
+import AI.moderation as moderation
+from AI.moderation import ModerationEngine, moderate_text, moderate_texts, ensure_appropriate
 from fastapi import HTTPException
 
 def test_moderate_text_with_clean_content():
@@ -36,3 +38,54 @@ def test_moderate_text_with_multiple_languages():
     """Test moderation with text in different languages"""
     text = "Hello こんにちは Bonjour"
     assert moderate_text(text) is False
+
+def test_moderate_text_catches_obfuscated_variants():
+    assert moderate_text("what the h3ll") is True
+    assert moderate_text("go to HELL!") is True
+
+def test_moderate_text_matches_whole_words_only():
+    assert moderate_text("hello from the shell") is False
+
+def test_moderate_text_does_not_join_letters_split_by_separators():
+    assert moderate_text("h.e.l.l") is False
+    assert moderate_text("a.s.s") is False
+    assert moderate_text("sh-it happens") is False
+    assert moderate_text("the U.S.A. team") is False
+
+def test_moderate_text_catches_listed_spelled_out_forms_anywhere():
+    # Listed as such in the word list; better-profanity misses them only at the very end of the text
+    assert moderate_text("f.u.c.k") is True
+    assert moderate_text("S-H-I-T") is True
+    assert moderate_text("f.u.c.k off") is True
+
+def test_moderate_texts_returns_one_verdict_per_text():
+    assert moderate_texts(["hello", "hell", None, "hello"]) == [False, True, False, False]
+
+def test_engine_caches_verdicts_by_content():
+    engine = ModerationEngine(["hell"], {"e": ("e", "3")})
+    with patch.object(engine, "_scan", wraps=engine._scan) as scan:
+        engine.moderate_batch(["h3ll no", "h3ll no", "fine"])
+
+    assert scan.call_count == 2
+
+def test_engine_matches_phrases_across_words():
+    engine = ModerationEngine(["bad word"], {})
+
+    assert engine.is_inappropriate("a bad word here") is True
+    assert engine.is_inappropriate("a badword here") is False
+
+def test_ensure_appropriate_rejects_with_400():
+    with pytest.raises(HTTPException) as exc:
+        ensure_appropriate("what the hell", "comment")
+
+    assert exc.value.status_code == 400
+    assert exc.value.detail == "Inappropriate content detected, Please revise your comment."
+
+def test_engine_is_compiled_on_first_use_only():
+    with patch.object(moderation, "_engine", None), \
+            patch.object(moderation, "ModerationEngine", wraps=ModerationEngine) as build:
+        assert build.call_count == 0
+        moderate_text("hello")
+        moderate_text("hell")
+
+    build.assert_called_once()
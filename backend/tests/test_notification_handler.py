@@ -1,8 +1,10 @@
 from unittest import TestCase
 from unittest.mock import Mock, patch
+from sqlalchemy.dialects import postgresql
 from services.NotificationHandler import (
     create_notification,
     send_post_notifications,
+    deliver_post_notifications,
     mark_notification_as_read,
     get_user_notifications,
     get_unread_notification_count,
@@ -93,4 +95,34 @@ class TestNotificationHandler(TestCase):
         )
 
         self.assertEqual(result, expected_count)
-        self.mock_db.commit.assert_called_once()
\ No newline at end of file
+        self.mock_db.commit.assert_called_once()
+
+    def test_send_post_notifications_inserts_all_rows_in_one_statement(self):
+        self.mock_db.execute.return_value.scalars.return_value.all.return_value = [3, 4, 5]
+
+        result = send_post_notifications(self.mock_db, Mock(id=self.actor_id), Mock(id=self.post_id))
+
+        self.assertEqual(result, [3, 4, 5])
+        self.mock_db.execute.assert_called_once()
+        statement = str(self.mock_db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        self.assertIn("INSERT INTO notifications (user_id, actor_id, type, post_id, is_read, created_at) SELECT", statement)
+        self.assertIn("FROM connections", statement)
+        self.mock_db.add.assert_not_called()
+        self.mock_db.commit.assert_not_called()
+
+    def test_deliver_post_notifications_uses_its_own_session(self):
+        with patch('services.NotificationHandler.SessionLocal', return_value=self.mock_db):
+            deliver_post_notifications(self.actor_id, self.post_id)
+
+        self.mock_db.execute.assert_called_once()
+        self.mock_db.commit.assert_called_once()
+        self.mock_db.close.assert_called_once()
+
+    def test_deliver_post_notifications_rolls_back_on_error(self):
+        self.mock_db.execute.side_effect = Exception("connection lost")
+
+        with patch('services.NotificationHandler.SessionLocal', return_value=self.mock_db):
+            deliver_post_notifications(self.actor_id, self.post_id)
+
+        self.mock_db.rollback.assert_called_once()
+        self.mock_db.close.assert_called_once()
@@ -2,7 +2,7 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from datetime import datetime
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from pathlib import Path
 import sys
 from zoneinfo import ZoneInfo
@@ -193,9 +193,9 @@ def override_dependencies(monkeypatch):
 
     monkeypatch.setattr(post, "moderate_text", mock_moderate_text)
 
-    # Mock send_post_notifications
+    # Mock deliver_post_notifications
     mock_send_notifications = MagicMock()
-    monkeypatch.setattr(post, "send_post_notifications", mock_send_notifications)
+    monkeypatch.setattr(post, "deliver_post_notifications", mock_send_notifications)
 
     # Mock helper functions
     mock_get_user_like_status = MagicMock()
@@ -404,10 +404,35 @@ def test_create_media_post(override_dependencies):
     assert data["media_url"] == fake_media.media_url
     assert data["media_type"] == fake_media.media_type
 
-    # Ensure database operations are called
+    # Ensure database operations are called; the unit of work commits without a refresh
     session.add.assert_called()
     session.commit.assert_called()
-    session.refresh.assert_called()
+    session.refresh.assert_not_called()
+
+def test_create_media_post_gives_back_uploads_when_the_post_fails(override_dependencies):
+    session = override_dependencies["session"]
+    calls = []
+    session.commit.side_effect = lambda: calls.append("commit")
+
+    async def upload(*args, **kwargs):
+        calls.append("upload")
+        return {"secure_url": "https://cdn/a.jpg", "resource_type": "image"}
+
+    async def variants(*args):
+        calls.append("variants")  # Committed in their own sessions
+        return {"feed": "https://cdn/a_feed.webp"}
+
+    with patch("routes.post.handle_media_upload", side_effect=upload), \
+         patch("routes.post.create_image_variants", side_effect=variants), \
+         patch("routes.post.create_base_post", side_effect=lambda *args: calls.append("post") or 1 / 0), \
+         patch("routes.post.release_stored_files", return_value=[{"remote_id": "a"}]) as mock_release, \
+         patch("routes.post.purge_stored_files", new_callable=AsyncMock) as mock_purge:
+        with pytest.raises(ZeroDivisionError):
+            client.post("/posts/create_media_post/", files={"media_file": ("a.jpg", b"image", "image/jpeg")})
+
+    assert calls[:4] == ["upload", "commit", "variants", "post"]  # References committed before the post's transaction opens
+    mock_release.assert_called_once_with(session, ["https://cdn/a.jpg", "https://cdn/a_feed.webp"])
+    mock_purge.assert_awaited_once_with([{"remote_id": "a"}])
 
 def test_create_media_post_invalid_type(override_dependencies):
     mocks = override_dependencies
@@ -453,11 +478,13 @@ def test_update_media_post(override_dependencies):
         "media_file": ("updated.jpg", b"updated image content", "image/jpeg")
     }
 
-    # Send request to update media post
-    response = client.put(
-        "/posts/update_media_post/1",
-        files=test_file
-    )
+    # Send request to update media post; the replaced file's references are released
+    with patch("routes.post.release_stored_files", return_value=[]) as mock_release, \
+         patch("routes.post.purge_stored_files", new_callable=AsyncMock):
+        response = client.put(
+            "/posts/update_media_post/1",
+            files=test_file
+        )
 
     assert response.status_code == 200
     data = response.json()
@@ -470,6 +497,7 @@ def test_update_media_post(override_dependencies):
     assert updated_post["post_type"] == "text"
     assert "created_at" in updated_post
     assert "media_url" in updated_post
+    mock_release.assert_called_once()
 
 # Document post tests
 # def test_create_document_post(override_dependencies):
@@ -538,7 +566,8 @@ def test_update_document_post(override_dependencies):
     mock_generate_secure_filename = mocks["generate_secure_filename"]
     
     # Mock supabase upload
-    with patch("routes.post.upload_file_to_supabase") as mock_upload:
+    with patch("routes.post.upload_to_supabase_deduplicated", new_callable=AsyncMock) as mock_upload, \
+         patch("routes.post.release_stored_files", return_value=[]):
         mock_upload.return_value = "mocked_document_url"
         
         # Set return values for document files
@@ -640,12 +669,23 @@ def test_delete_post(override_dependencies):
     session = mocks["session"]
 
     # Send request to delete post
-    response = client.delete("/posts/delete_post/1")
+    with patch("routes.post.unfinished_spool_path", return_value=None), \
+         patch("routes.post.remove_old_file_if_exists") as mock_remove:
+        response = client.delete("/posts/delete_post/1")
 
     assert response.status_code == 200
     assert response.json()["message"] == "Post deleted successfully"
     session.delete.assert_called()
     session.commit.assert_called()
+    mock_remove.assert_not_called()
+
+def test_delete_processing_post_removes_its_spooled_upload(override_dependencies):
+    with patch("routes.post.unfinished_spool_path", return_value="uploads/spool/a.jpg"), \
+         patch("routes.post.remove_old_file_if_exists") as mock_remove:
+        response = client.delete("/posts/delete_post/1")
+
+    assert response.status_code == 200
+    mock_remove.assert_called_once_with("uploads/spool/a.jpg")
 
 def test_delete_post_not_found(override_dependencies):
     mocks = override_dependencies
@@ -14,10 +14,13 @@ with patch("langchain_huggingface.HuggingFaceEndpoint", MagicMock()) as mock_hf_
     mock_hf_endpoint.return_value.predict.return_value = "mocked response"
     sys.path.append(str(Path(__file__).resolve().parents[1]))
     from main import app
-    from models.post import Post, Like, Comment, PostMedia, PostDocument, Event, Share
+    from models.post import Post, Like, Comment, PostMedia, PostDocument, Event, Share, PostStatusEnum
     from models.user import User
     from models.post import EventAttendee
     from routes import postReaction
+    from services.PostCache import post_cache, invalidate_post_cache
+    from routes.PostReaction.ShareHandler import share_token_cache
+    from services.LikeStatusCache import like_status_cache
 
 client = TestClient(app)
 
@@ -135,6 +138,9 @@ fake_attendee = EventAttendee(
 # Fixture to override dependencies for all tests
 @pytest.fixture
 def override_dependencies(monkeypatch):
+    post_cache.invalidate()  # Payloads cached by one test must not leak into the next
+    like_status_cache.invalidate()
+    share_token_cache.invalidate()
     mock_session = MagicMock(spec=Session)
 
     # Mock database operations
@@ -185,15 +191,15 @@ def override_dependencies(monkeypatch):
     mock_attendee_query.filter.return_value.all.return_value = []
 
     mock_session.query.side_effect = lambda model: (
-        mock_post_query if model == Post else
-        mock_like_query if model == Like else
-        mock_comment_query if model == Comment else
-        mock_user_query if model == User else
-        mock_share_query if model == Share else
-        mock_media_query if model == PostMedia else
-        mock_document_query if model == PostDocument else
-        mock_event_query if model == Event else
-        mock_attendee_query if model == EventAttendee else
+        mock_post_query if model is Post else
+        mock_like_query if model is Like else
+        mock_comment_query if model is Comment else
+        mock_user_query if model is User else
+        mock_share_query if model is Share else
+        mock_media_query if model is PostMedia else
+        mock_document_query if model is PostDocument else
+        mock_event_query if model is Event else
+        mock_attendee_query if model is EventAttendee else
         MagicMock()
     )
 
@@ -222,19 +228,14 @@ def override_dependencies(monkeypatch):
     app.dependency_overrides.clear()
 
 # Test for adding a like
-def test_like_action_add(override_dependencies):
+def test_like_action_add(override_dependencies, monkeypatch):
     mock_session, mock_notify_if_not_self, mock_create_notification = override_dependencies
 
-    # Mock Post and Like queries
-    mock_post_query = MagicMock()
-    mock_post_query.filter.return_value.first.return_value = fake_post
-    mock_like_query = MagicMock()
-    mock_like_query.filter.return_value.first.return_value = None  # No existing like
-    mock_session.query.side_effect = lambda model: (
-        mock_post_query if model == Post else
-        mock_like_query if model == Like else
-        MagicMock()
-    )
+    mock_toggle_like = MagicMock(return_value={
+        "id": 1, "created_at": fake_like.created_at, "like_count": 6,
+        "owner_id": fake_other_user.id, "user_liked": True, "created": True
+    })
+    monkeypatch.setattr(postReaction, "toggle_like", mock_toggle_like)
 
     # Send request to add like
     response = client.post("/interactions/like", json={"post_id": 2, "comment_id": None})
@@ -243,33 +244,26 @@ def test_like_action_add(override_dependencies):
     data = response.json()
     assert data["message"] == "Like added successfully"
     assert data["user_liked"] is True
-    assert data["total_likes"] == 6  # like_count: 5 -> 6
+    assert data["total_likes"] == 6  # like_count: 5 -> 6, as returned by the UPDATE
     assert data["id"] == 1
     assert data["user_id"] == fake_user.id
     assert data["post_id"] == 2
     assert data["comment_id"] is None
     
-    # Ensure database operations are called
-    mock_session.add.assert_called()
-    mock_session.commit.assert_called()
-    mock_session.refresh.assert_called()
-    # Notification may be called depending on endpoint logic
-    mock_create_notification.assert_not_called()  # Assume no notification for self
+    # One statement and one commit; the count is not re-read
+    mock_toggle_like.assert_called_once()
+    mock_session.commit.assert_called_once()
+    mock_session.query.assert_not_called()
+    mock_notify_if_not_self.assert_called_once_with(mock_session, fake_user.id, fake_other_user.id, "like", 2)
 
 # Test for removing a like
-def test_like_action_remove(override_dependencies):
+def test_like_action_remove(override_dependencies, monkeypatch):
     mock_session, mock_notify_if_not_self, mock_create_notification = override_dependencies
 
-    # Mock Post and Like queries
-    mock_post_query = MagicMock()
-    mock_post_query.filter.return_value.first.return_value = fake_post
-    mock_like_query = MagicMock()
-    mock_like_query.filter.return_value.first.return_value = fake_like  # Existing like
-    mock_session.query.side_effect = lambda model: (
-        mock_post_query if model == Post else
-        mock_like_query if model == Like else
-        MagicMock()
-    )
+    monkeypatch.setattr(postReaction, "toggle_like", MagicMock(return_value={
+        "id": fake_like.id, "created_at": fake_like.created_at, "like_count": 4,
+        "owner_id": fake_other_user.id, "user_liked": False, "created": False
+    }))
 
     # Send request to remove like
     response = client.post("/interactions/like", json={"post_id": 2, "comment_id": None})
@@ -278,17 +272,102 @@ def test_like_action_remove(override_dependencies):
     data = response.json()
     assert data["message"] == "Like removed"
     assert data["user_liked"] is False
-    assert data["total_likes"] == 5  # like_count: 5 -> 4, then max(0, 4 - 1) = 3
+    assert data["total_likes"] == 4  # like_count: 5 -> 4
     assert data["id"] == fake_like.id
     assert data["user_id"] == fake_user.id
     assert data["post_id"] == 2
     assert data["comment_id"] is None
     
-    # Ensure database operations are called
-    mock_session.delete.assert_called()
-    mock_session.commit.assert_called()
-    # Notification may be called depending on endpoint logic
-    mock_create_notification.assert_not_called()  # Assume no notification for self
+    mock_session.commit.assert_called_once()
+    mock_notify_if_not_self.assert_not_called()  # No notification for an unlike
+
+# Test for a like with the counter buffer on: the response adds the pending likes to the stored count
+def test_like_action_buffered(override_dependencies, monkeypatch):
+    mock_session, _, _ = override_dependencies
+    mock_toggle_like = MagicMock(return_value={
+        "id": 1, "created_at": fake_like.created_at, "like_count": 5,
+        "owner_id": fake_other_user.id, "user_liked": True, "created": True, "delta": 1
+    })
+    mock_buffer = MagicMock()
+    mock_buffer.add.return_value = 3  # This like and two others not flushed yet
+    monkeypatch.setattr(postReaction, "toggle_like", mock_toggle_like)
+    monkeypatch.setattr(postReaction, "LIKE_COUNTER_BUFFER", True)
+    monkeypatch.setattr(postReaction, "like_counter_buffer", mock_buffer)
+
+    response = client.post("/interactions/like", json={"post_id": 2, "comment_id": None})
+
+    assert response.status_code == 200
+    assert response.json()["total_likes"] == 8
+    assert mock_toggle_like.call_args.kwargs["buffered"] is True
+    mock_buffer.add.assert_called_once_with(2, 1)
+
+# Test for liking a post that does not exist
+def test_like_action_missing_target(override_dependencies, monkeypatch):
+    mock_session, _, _ = override_dependencies
+    monkeypatch.setattr(postReaction, "toggle_like", MagicMock(return_value=None))
+
+    response = client.post("/interactions/like", json={"post_id": 99, "comment_id": None})
+
+    assert response.status_code == 404
+    mock_session.commit.assert_not_called()
+
+# Test for the batched like-status lookup
+def test_like_status(override_dependencies, monkeypatch):
+    mock_session, _, _ = override_dependencies
+    mock_status = MagicMock(return_value=({2}, {9}))
+    monkeypatch.setattr(postReaction, "get_like_status", mock_status)
+
+    response = client.post("/interactions/likes/status", json={"post_ids": [2, 3], "comment_ids": [9]})
+
+    assert response.status_code == 200
+    assert response.json() == {"posts": {"2": True, "3": False}, "comments": {"9": True}}
+    mock_status.assert_called_once_with(mock_session, fake_user.id, [2, 3], [9])
+
+def test_like_status_rejects_too_many_ids(override_dependencies, monkeypatch):
+    monkeypatch.setattr("services.LikeStatusCache.LIKE_STATUS_MAX_TARGETS", 2)
+
+    response = client.post("/interactions/likes/status", json={"post_ids": [1, 2], "comment_ids": [3]})
+
+    assert response.status_code == 400
+
+def test_like_action_records_like_status(override_dependencies, monkeypatch):
+    monkeypatch.setattr(postReaction, "toggle_like", MagicMock(return_value={
+        "id": 1, "created_at": fake_like.created_at, "like_count": 6,
+        "owner_id": fake_other_user.id, "user_liked": True, "created": True, "delta": 1
+    }))
+    mock_record = MagicMock()
+    monkeypatch.setattr(postReaction, "record_like_status", mock_record)
+
+    client.post("/interactions/like", json={"post_id": 2, "comment_id": None})
+
+    mock_record.assert_called_once_with(fake_user.id, 2, None, True)
+
+# Test for the paginated comment tree
+def test_get_comments_passes_page_params(override_dependencies, monkeypatch):
+    mock_session, _, _ = override_dependencies
+    tree = {"comments": [], "next_cursor": None}
+    mock_load = MagicMock(return_value=tree)
+    monkeypatch.setattr(postReaction, "load_comment_tree", mock_load)
+
+    response = client.get("/interactions/2/comments?limit=5&cursor=abc&replies=1")
+
+    assert response.status_code == 200
+    assert response.json() == tree
+    mock_load.assert_called_once_with(mock_session, 2, fake_user, 5, "abc", 1)
+
+def test_get_replies(override_dependencies, monkeypatch):
+    mock_session, _, _ = override_dependencies
+    mock_load = MagicMock(return_value={"replies": [], "next_cursor": None})
+    monkeypatch.setattr(postReaction, "load_replies", mock_load)
+
+    response = client.get("/interactions/comments/7/replies")
+
+    assert response.status_code == 200
+    mock_load.assert_called_once_with(mock_session, 7, fake_user, postReaction.COMMENT_PAGE_SIZE, None)
+
+def test_get_comments_rejects_oversized_page(override_dependencies):
+    response = client.get(f"/interactions/2/comments?limit={postReaction.COMMENT_PAGE_MAX_SIZE + 1}")
+    assert response.status_code == 422
 
 # Test for missing post_id or comment_id
 def test_like_action_missing_post_or_comment(override_dependencies):
@@ -311,8 +390,8 @@ def test_comment_post_create(override_dependencies):
     mock_comment_query = MagicMock()
     mock_comment_query.filter.return_value.first.return_value = None
     mock_session.query.side_effect = lambda model: (
-        mock_post_query if model == Post else
-        mock_comment_query if model == Comment else
+        mock_post_query if model is Post else
+        mock_comment_query if model is Comment else
         MagicMock()
     )
 
@@ -345,8 +424,8 @@ def test_comment_post_with_parent_id(override_dependencies):
     mock_comment_query = MagicMock()
     mock_comment_query.filter.return_value.first.return_value = None
     mock_session.query.side_effect = lambda model: (
-        mock_post_query if model == Post else
-        mock_comment_query if model == Comment else
+        mock_post_query if model is Post else
+        mock_comment_query if model is Comment else
         MagicMock()
     )
 
@@ -373,8 +452,8 @@ def test_share_post(override_dependencies):
     mock_user_query = MagicMock()
     mock_user_query.filter.return_value.first.return_value = fake_user
     mock_session.query.side_effect = lambda model: (
-        mock_post_query if model == Post else
-        mock_user_query if model == User else
+        mock_post_query if model is Post else
+        mock_user_query if model is User else
         MagicMock()
     )
 
@@ -403,7 +482,7 @@ def test_share_post_not_found(override_dependencies):
     # Mock Post query to return None
     mock_post_query = MagicMock()
     mock_post_query.filter.return_value.first.return_value = None
-    mock_session.query.side_effect = lambda model: mock_post_query if model == Post else MagicMock()
+    mock_session.query.side_effect = lambda model: mock_post_query if model is Post else MagicMock()
 
     # Send request to share non-existent post
     response = client.post("/interactions/999/share", json={"post_id": 999})
@@ -428,8 +507,8 @@ def test_share_post_with_notification(override_dependencies):
     mock_user_query = MagicMock()
     mock_user_query.filter.return_value.first.return_value = fake_other_user
     mock_session.query.side_effect = lambda model: (
-        mock_post_query if model == Post else
-        mock_user_query if model == User else
+        mock_post_query if model is Post else
+        mock_user_query if model is User else
         MagicMock()
     )
 
@@ -448,59 +527,97 @@ def test_share_post_with_notification(override_dependencies):
         post_id=fake_post.id
     )
 
-# Test for getting a shared text post
-def test_get_shared_post(override_dependencies):
-    mock_session, mock_notify_if_not_self, mock_create_notification = override_dependencies
-
-    # Mock Share, Post, and Like queries
-    mock_share_query = MagicMock()
-    mock_share_query.filter.return_value.first.return_value = fake_share
+def _mock_shared_post_query(mock_session, post):
+    """The share page loads the post, author and attachments in one joined query."""
     mock_post_query = MagicMock()
-    mock_post_query.filter.return_value.first.return_value = fake_post
+    mock_post_query.options.return_value.join.return_value.filter.return_value.first.return_value = post
+    mock_post_query.options.return_value.filter.return_value.first.return_value = post
     mock_like_query = MagicMock()
-    mock_like_query.filter.return_value.first.return_value = None
-    mock_session.query.side_effect = lambda model: (
-        mock_share_query if model == Share else
-        mock_post_query if model == Post else
-        mock_like_query if model == Like else
+    mock_like_query.filter.return_value.all.return_value = []
+    mock_session.query.side_effect = lambda *models: (
+        mock_post_query if models[0] is Post else
+        mock_like_query if models[0] is Like.post_id else
         MagicMock()
     )
+    return mock_post_query
+
+def _shared_post(post_id, post_type, author=fake_user, status=PostStatusEnum.PUBLISHED, **attachments):
+    return Post(
+        id=post_id, user_id=author.id, content=f"{post_type} post", post_type=post_type, status=status,
+        created_at=datetime.now(ZoneInfo("UTC")), like_count=5, comment_count=0, user=author, **attachments
+    )
+
+# Test for getting a shared text post
+def test_get_shared_post(override_dependencies):
+    mock_session, mock_notify_if_not_self, mock_create_notification = override_dependencies
+    post = _shared_post(2, "text")
+    mock_post_query = _mock_shared_post_query(mock_session, post)
 
     # Send request to get shared post
     response = client.get("/interactions/share/mocked-uuid")
     
     assert response.status_code == 200
     data = response.json()
-    assert data["id"] == fake_post.id
+    assert data["id"] == post.id
     assert data["post_type"] == "text"
-    assert data["content"] == fake_post.content
+    assert data["content"] == post.content
     assert data["user"]["id"] == fake_user.id
     assert data["user"]["username"] == fake_user.username
     assert data["user"]["profile_picture"] == f"http://127.0.0.1:8000/uploads/profile_pictures/{fake_user.profile_picture}"
-    assert data["total_likes"] == fake_post.like_count
+    assert data["total_likes"] == post.like_count
     assert data["user_liked"] is False
     assert "created_at" in data
+    mock_post_query.options.return_value.join.return_value.filter.return_value.first.assert_called_once()
+
+# Test that a second visit is served from the token and post caches
+def test_get_shared_post_cached(override_dependencies):
+    mock_session, _, _ = override_dependencies
+    _mock_shared_post_query(mock_session, _shared_post(2, "text"))
+
+    first = client.get("/interactions/share/mocked-uuid")
+    mock_session.query.reset_mock()
+    second = client.get("/interactions/share/mocked-uuid")
+
+    assert second.json() == first.json()
+    mock_session.query.assert_not_called()  # Token, payload and like status all cached
+
+# Test that editing or deleting the post drops the cached payload
+def test_get_shared_post_after_delete(override_dependencies):
+    mock_session, _, _ = override_dependencies
+    mock_post_query = _mock_shared_post_query(mock_session, _shared_post(2, "text"))
+    client.get("/interactions/share/mocked-uuid")
+
+    invalidate_post_cache(2)
+    mock_post_query.options.return_value.filter.return_value.first.return_value = None
+    response = client.get("/interactions/share/mocked-uuid")
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Post not found."
+
+# Test that a post still processing is only shown to its author
+def test_get_shared_unpublished_post(override_dependencies):
+    mock_session, _, _ = override_dependencies
+    _mock_shared_post_query(mock_session, _shared_post(6, "text", author=fake_other_user, status=PostStatusEnum.PROCESSING))
+
+    response = client.get("/interactions/share/mocked-uuid")
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Post not found."
+
+def test_get_own_shared_unpublished_post(override_dependencies):
+    mock_session, _, _ = override_dependencies
+    _mock_shared_post_query(mock_session, _shared_post(7, "text", status=PostStatusEnum.PROCESSING))
+
+    first = client.get("/interactions/share/mocked-uuid")
+    second = client.get("/interactions/share/mocked-uuid")
+
+    assert first.status_code == second.status_code == 200
+    assert not post_cache.get(7)  # Never cached while unpublished
 
 # Test for getting a shared media post
 def test_get_shared_media_post(override_dependencies):
     mock_session, mock_notify_if_not_self, mock_create_notification = override_dependencies
-
-    # Mock Share, Post, Like, and PostMedia queries
-    mock_share_query = MagicMock()
-    mock_share_query.filter.return_value.first.return_value = Share(id=1, user_id=fake_user.id, post_id=3, share_token="mocked-uuid")
-    mock_post_query = MagicMock()
-    mock_post_query.filter.return_value.first.return_value = fake_media_post
-    mock_like_query = MagicMock()
-    mock_like_query.filter.return_value.first.return_value = None
-    mock_media_query = MagicMock()
-    mock_media_query.filter.return_value.first.return_value = fake_media
-    mock_session.query.side_effect = lambda model: (
-        mock_share_query if model == Share else
-        mock_post_query if model == Post else
-        mock_like_query if model == Like else
-        mock_media_query if model == PostMedia else
-        MagicMock()
-    )
+    _mock_shared_post_query(mock_session, _shared_post(3, "media", media=[PostMedia(id=1, post_id=3, media_url="media.jpg")]))
 
     # Send request to get shared media post
     response = client.get("/interactions/share/mocked-uuid")
@@ -510,26 +627,23 @@ def test_get_shared_media_post(override_dependencies):
     assert data["post_type"] == "media"
     assert data["media_url"] == f"http://127.0.0.1:8000/uploads/media/{fake_media.media_url}"
 
+# Test that absolute Cloudinary/variant URLs are passed through unchanged
+def test_get_shared_post_keeps_absolute_urls(override_dependencies):
+    mock_session, _, _ = override_dependencies
+    author = User(id=3, username="cdnuser", profile_picture="https://res.cloudinary.com/x/avatar.jpg",
+                  profile_picture_variants={"thumb": "https://res.cloudinary.com/x/avatar_thumb.webp"})
+    media = PostMedia(id=2, post_id=8, media_url="https://res.cloudinary.com/x/photo.jpg")
+    _mock_shared_post_query(mock_session, _shared_post(8, "media", author=author, media=[media]))
+
+    data = client.get("/interactions/share/mocked-uuid").json()
+
+    assert data["user"]["profile_picture"] == "https://res.cloudinary.com/x/avatar_thumb.webp"
+    assert data["media_url"] == "https://res.cloudinary.com/x/photo.jpg"
+
 # Test for getting a shared document post
 def test_get_shared_document_post(override_dependencies):
     mock_session, mock_notify_if_not_self, mock_create_notification = override_dependencies
-
-    # Mock Share, Post, Like, and PostDocument queries
-    mock_share_query = MagicMock()
-    mock_share_query.filter.return_value.first.return_value = Share(id=1, user_id=fake_user.id, post_id=4, share_token="mocked-uuid")
-    mock_post_query = MagicMock()
-    mock_post_query.filter.return_value.first.return_value = fake_document_post
-    mock_like_query = MagicMock()
-    mock_like_query.filter.return_value.first.return_value = None
-    mock_document_query = MagicMock()
-    mock_document_query.filter.return_value.first.return_value = fake_document
-    mock_session.query.side_effect = lambda model: (
-        mock_share_query if model == Share else
-        mock_post_query if model == Post else
-        mock_like_query if model == Like else
-        mock_document_query if model == PostDocument else
-        MagicMock()
-    )
+    _mock_shared_post_query(mock_session, _shared_post(4, "document", documents=[PostDocument(id=1, post_id=4, document_url="document.pdf")]))
 
     # Send request to get shared document post
     response = client.get("/interactions/share/mocked-uuid")
@@ -542,23 +656,9 @@ def test_get_shared_document_post(override_dependencies):
 # Test for getting a shared event post
 def test_get_shared_event_post(override_dependencies):
     mock_session, mock_notify_if_not_self, mock_create_notification = override_dependencies
-
-    # Mock Share, Post, Like, and Event queries
-    mock_share_query = MagicMock()
-    mock_share_query.filter.return_value.first.return_value = Share(id=1, user_id=fake_user.id, post_id=5, share_token="mocked-uuid")
-    mock_post_query = MagicMock()
-    mock_post_query.filter.return_value.first.return_value = fake_event_post
-    mock_like_query = MagicMock()
-    mock_like_query.filter.return_value.first.return_value = None
-    mock_event_query = MagicMock()
-    mock_event_query.filter.return_value.first.return_value = fake_event
-    mock_session.query.side_effect = lambda model: (
-        mock_share_query if model == Share else
-        mock_post_query if model == Post else
-        mock_like_query if model == Like else
-        mock_event_query if model == Event else
-        MagicMock()
-    )
+    event = Event(id=1, post_id=5, title=fake_event.title, description=fake_event.description,
+                  event_datetime=fake_event.event_datetime, location=fake_event.location)
+    _mock_shared_post_query(mock_session, _shared_post(5, "event", event=event))
 
     # Send request to get shared event post
     response = client.get("/interactions/share/mocked-uuid")
@@ -573,11 +673,7 @@ def test_get_shared_event_post(override_dependencies):
 # Test for invalid share token
 def test_get_shared_post_invalid_token(override_dependencies):
     mock_session, mock_notify_if_not_self, mock_create_notification = override_dependencies
-
-    # Mock Share query to return None
-    mock_share_query = MagicMock()
-    mock_share_query.filter.return_value.first.return_value = None
-    mock_session.query.side_effect = lambda model: mock_share_query if model == Share else MagicMock()
+    _mock_shared_post_query(mock_session, None)
 
     # Send request with invalid share token
     response = client.get("/interactions/share/invalid-uuid")
@@ -595,8 +691,8 @@ def test_rsvp_event(override_dependencies):
     mock_attendee_query = MagicMock()
     mock_attendee_query.filter.return_value.first.return_value = None
     mock_session.query.side_effect = lambda model: (
-        mock_event_query if model == Event else
-        mock_attendee_query if model == EventAttendee else
+        mock_event_query if model is Event else
+        mock_attendee_query if model is EventAttendee else
         MagicMock()
     )
 
@@ -642,8 +738,8 @@ def test_rsvp_event_update(override_dependencies):
     mock_attendee_query = MagicMock()
     mock_attendee_query.filter.return_value.first.return_value = fake_attendee
     mock_session.query.side_effect = lambda model: (
-        mock_event_query if model == Event else
-        mock_attendee_query if model == EventAttendee else
+        mock_event_query if model is Event else
+        mock_attendee_query if model is EventAttendee else
         MagicMock()
     )
 
@@ -665,7 +761,7 @@ def test_rsvp_event_not_found(override_dependencies):
     # Mock Event query to return None
     mock_event_query = MagicMock()
     mock_event_query.filter.return_value.first.return_value = None
-    mock_session.query.side_effect = lambda model: mock_event_query if model == Event else MagicMock()
+    mock_session.query.side_effect = lambda model: mock_event_query if model is Event else MagicMock()
 
     # Send request to RSVP
     response = client.post("/interactions/event/999/rsvp", json={"event_id": 999,"status": "going"})
@@ -682,7 +778,7 @@ def test_get_event_attendees(override_dependencies):
     # Mock EventAttendee query
     mock_attendee_query = MagicMock()
     mock_attendee_query.filter.return_value.all.return_value = [fake_attendee]
-    mock_session.query.side_effect = lambda model: mock_attendee_query if model == EventAttendee else MagicMock()
+    mock_session.query.side_effect = lambda model: mock_attendee_query if model is EventAttendee else MagicMock()
 
     # Send request to get attendees
     response = client.get("/interactions/event/1/attendees")
@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import MagicMock, Mock, patch
+from sqlalchemy.orm import Session
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import services.PostCache as post_cache_module
+from core.cache import InMemoryCacheBackend, ResponseCache
+from models.post import PostStatusEnum
+from services.PostCache import get_post_payload, get_post_payloads, prepare_cached_post_response, invalidate_post_cache
+
+PAYLOAD = {"post": {"id": 3, "total_likes": 1}, "type_data": {"media_url": "a.jpg"}}
+
+
+@pytest.fixture(autouse=True)
+def post_cache(monkeypatch):
+    cache = ResponseCache("post-test", backend=InMemoryCacheBackend(maxsize=16, ttl=60))
+    monkeypatch.setattr(post_cache_module, "post_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def mock_db():
+    return MagicMock(spec=Session)
+
+
+@patch('services.PostCache.build_post_payloads')
+def test_payload_is_built_once_then_served_from_cache(mock_build, mock_db):
+    mock_build.return_value = {3: PAYLOAD}
+
+    assert get_post_payload(mock_db, 3) == PAYLOAD
+    assert get_post_payload(mock_db, 3) == PAYLOAD
+
+    mock_build.assert_called_once()
+    mock_db.query.assert_called_once()  # Only the miss loads the post row
+
+
+@patch('services.PostCache.build_post_payloads')
+def test_invalidate_post_cache_forces_rebuild(mock_build, mock_db):
+    mock_build.return_value = {3: PAYLOAD}
+
+    get_post_payload(mock_db, 3)
+    invalidate_post_cache(3)
+    get_post_payload(mock_db, 3)
+
+    assert mock_build.call_count == 2
+
+
+def test_missing_post_is_not_cached(mock_db):
+    mock_db.query.return_value.filter.return_value.first.return_value = None
+
+    assert get_post_payload(mock_db, 404) is None
+    assert get_post_payload(mock_db, 404) is None
+    assert mock_db.query.call_count == 2
+
+
+@patch('services.PostCache.build_post_payloads')
+def test_unpublished_post_is_built_for_its_author_only(mock_build, mock_db):
+    published, owned = MagicMock(), MagicMock()
+    mock_db.query.return_value.filter.side_effect = [published, owned, published]
+    published.first.return_value = None  # Not published yet
+    owned.first.return_value = Mock(id=3, user_id=5)
+    mock_build.return_value = {3: PAYLOAD}
+
+    assert get_post_payload(mock_db, 3, viewer_id=5) == PAYLOAD
+    assert get_post_payload(mock_db, 3) is None  # Nothing was cached for other viewers
+
+
+@patch('services.PostCache.build_post_payloads')
+def test_page_builds_only_its_misses_in_one_batch(mock_build, mock_db):
+    other = {"post": {"id": 4, "total_likes": 0}, "type_data": {}}
+    mock_build.return_value = {3: PAYLOAD}
+    get_post_payload(mock_db, 3)
+    rows = [Mock(id=3, status=PostStatusEnum.PUBLISHED), Mock(id=4, status=PostStatusEnum.PUBLISHED)]
+    mock_build.return_value = {4: other}
+
+    payloads = get_post_payloads(mock_db, [3, 4], posts=rows)
+
+    assert payloads == {3: PAYLOAD, 4: other}
+    assert mock_build.call_args[0][0] == [rows[1]]  # Post 3 came from the cache
+    assert get_post_payloads(mock_db, [4]) == {4: other}
+    assert mock_build.call_count == 2
+
+
+@patch('services.PostCache.get_like_status')
+@patch('services.PostCache.build_post_payloads')
+def test_user_liked_is_overlaid_per_viewer(mock_build, mock_liked, mock_db):
+    mock_build.return_value = {3: PAYLOAD}
+    mock_liked.side_effect = lambda db, user_id, post_ids: ({3} if user_id == 1 else set(), set())
+
+    liker = prepare_cached_post_response(mock_db, 3, Mock(id=1))
+    other = prepare_cached_post_response(mock_db, 3, Mock(id=2))
+
+    assert liker["user_liked"] is True
+    assert other["user_liked"] is False
+    assert liker["media_url"] == "a.jpg"
+    mock_build.assert_called_once()
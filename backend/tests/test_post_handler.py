@@ -5,9 +5,23 @@ from services.PostHandler import (
     create_post_entry,
     extract_hashtags,
     get_user_like_status,
+    encode_post_cursor,
+    decode_post_cursor,
+    paginate_posts,
+    paginate_ranked_posts,
+    decode_ranked_cursor,
+    parse_post_ids,
+    get_posts_by_ids,
+    POST_BATCH_MAX_SIZE,
+    iter_posts_ndjson,
     STATUS_404_ERROR
 )
+import json
+from datetime import datetime
 from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+from models.post import Post
 
 class TestPostHandler(TestCase):
     def setUp(self):
@@ -34,10 +48,114 @@ class TestPostHandler(TestCase):
             )
             
         self.mock_db.add.assert_called_once_with(mock_post)
-        self.mock_db.commit.assert_called_once()
-        self.mock_db.refresh.assert_called_once_with(mock_post)
+        self.mock_db.flush.assert_called_once()
+        self.mock_db.commit.assert_not_called()  # The route's unit of work commits
         self.assertEqual(result, mock_post)
 
+    def test_post_cursor_round_trip(self):
+        post = Mock(id=42, created_at=datetime(2025, 4, 30, 13, 42, 4))
+
+        cursor = encode_post_cursor(post)
+
+        self.assertEqual(decode_post_cursor(cursor), (post.created_at, 42))
+
+    def test_decode_post_cursor_invalid(self):
+        with self.assertRaises(HTTPException) as context:
+            decode_post_cursor("not-a-cursor")
+
+        self.assertEqual(context.exception.status_code, 400)
+
+    def test_paginate_posts_returns_next_cursor_when_more_rows(self):
+        rows = [Mock(id=i, created_at=datetime(2025, 1, 1)) for i in (3, 2, 1)]
+        query = Mock()
+        query.order_by.return_value.limit.return_value.all.return_value = rows
+
+        posts, next_cursor = paginate_posts(query, limit=2)
+
+        self.assertEqual(posts, rows[:2])
+        self.assertEqual(decode_post_cursor(next_cursor), (datetime(2025, 1, 1), 2))
+        query.order_by.return_value.limit.assert_called_once_with(3)
+
+    def test_paginate_posts_last_page_has_no_cursor(self):
+        rows = [Mock(id=1, created_at=datetime(2025, 1, 1))]
+        query = Mock()
+        query.filter.return_value.order_by.return_value.limit.return_value.all.return_value = rows
+        cursor = encode_post_cursor(Mock(id=2, created_at=datetime(2025, 1, 1)))
+
+        posts, next_cursor = paginate_posts(query, limit=2, cursor=cursor)
+
+        self.assertEqual(posts, rows)
+        self.assertIsNone(next_cursor)
+        query.filter.assert_called_once()
+
+    def test_paginate_posts_offset_applies_after_order_by_on_real_query(self):
+        rows = [Mock(id=i, created_at=datetime(2025, 1, 1)) for i in (3, 2)]
+
+        with patch.object(Query, "all", autospec=True, return_value=rows) as mock_all:
+            posts, next_cursor = paginate_posts(Query(Post), limit=2, offset=10)
+
+        sql = str(mock_all.call_args.args[0].statement.compile(dialect=postgresql.dialect()))
+        self.assertEqual(posts, rows)
+        self.assertIsNone(next_cursor)
+        self.assertLess(sql.index("ORDER BY"), sql.index("LIMIT"))
+        self.assertIn("OFFSET", sql)
+
+    def test_paginate_ranked_posts_orders_by_score_and_returns_score_cursor(self):
+        rows = [Mock(id=i, engagement_score=score) for i, score in ((7, 9.5), (3, 9.5), (8, 1.25))]
+        query = Mock()
+        query.order_by.return_value.limit.return_value.all.return_value = rows
+
+        posts, next_cursor = paginate_ranked_posts(query, limit=2)
+
+        self.assertEqual(posts, rows[:2])
+        self.assertEqual(decode_ranked_cursor(next_cursor), (9.5, 3))
+
+    def test_paginate_ranked_posts_offset_applies_after_order_by_on_real_query(self):
+        rows = [Mock(id=7, engagement_score=9.5)]
+
+        with patch.object(Query, "all", autospec=True, return_value=rows) as mock_all:
+            posts, next_cursor = paginate_ranked_posts(Query(Post), limit=2, offset=10)
+
+        sql = str(mock_all.call_args.args[0].statement.compile(dialect=postgresql.dialect()))
+        self.assertEqual(posts, rows)
+        self.assertIsNone(next_cursor)
+        self.assertIn("ORDER BY posts.engagement_score DESC, posts.id DESC", sql)
+        self.assertIn("OFFSET", sql)
+
+    def test_parse_post_ids_keeps_order_and_drops_duplicates(self):
+        self.assertEqual(parse_post_ids("8, 4,8,15,"), [8, 4, 15])
+
+    def test_parse_post_ids_rejects_bad_input(self):
+        for ids in ("", "1,x", ",".join(str(i) for i in range(POST_BATCH_MAX_SIZE + 1))):
+            with self.assertRaises(HTTPException) as context:
+                parse_post_ids(ids)
+            self.assertEqual(context.exception.status_code, 400)
+
+    def test_get_posts_by_ids_preserves_order_and_reports_missing(self):
+        rows = [Mock(id=4), Mock(id=15)]  # Database order differs from the request
+        self.mock_db.query.return_value.filter.return_value.all.return_value = rows
+
+        posts, missing = get_posts_by_ids([15, 8, 4], self.mock_db)
+
+        self.assertEqual([post.id for post in posts], [15, 4])
+        self.assertEqual(missing, [8])
+        self.mock_db.query.assert_called_once()
+
+    def test_iter_posts_ndjson_streams_one_line_per_row_and_closes_session(self):
+        rows = [Mock(_mapping={"id": i, "created_at": datetime(2025, 1, i)}) for i in (1, 2)]
+        stream_db = Mock()
+        stream_db.query.return_value.filter.return_value.order_by.return_value.execution_options.return_value = iter(rows)
+
+        with patch('services.PostHandler.SessionLocal', return_value=stream_db):
+            lines = list(iter_posts_ndjson(batch_size=50))
+
+        self.assertEqual([json.loads(line)["id"] for line in lines], [1, 2])
+        self.assertTrue(all(line.endswith("\n") for line in lines))
+        stream_db.query.return_value.filter.return_value.order_by.return_value.execution_options.assert_called_once_with(
+            stream_results=True, yield_per=50
+        )
+        stream_db.close.assert_called_once()
+
     # def test_get_post_by_id_not_found(self):
     #     self.mock_db.query().filter().first = Mock(return_value=None)
         
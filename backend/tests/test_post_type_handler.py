@@ -5,7 +5,9 @@ from services.PostTypeHandler import (
     _get_media_post_data,
     _get_document_post_data,
     _get_event_post_data,
-    get_post_additional_data
+    get_post_additional_data,
+    get_posts_additional_data,
+    get_loaded_post_additional_data
 )
 
 class TestPostTypeHandler(TestCase):
@@ -91,4 +93,33 @@ class TestPostTypeHandler(TestCase):
         
         result = get_post_additional_data(self.mock_post, self.mock_db)
         
-        self.assertEqual(result, {})
\ No newline at end of file
+        self.assertEqual(result, {})
+
+    def test_get_posts_additional_data_bulk(self):
+        media_post = Mock(id=1, post_type="media")
+        document_post = Mock(id=2, post_type="document")
+        text_post = Mock(id=3, post_type="text")
+        mock_media = Mock(post_id=1, media_url="http://example.com/image.jpg")
+        mock_document = Mock(post_id=2, document_url="http://example.com/doc.pdf")
+        self.mock_db.query.return_value.filter.return_value.order_by.return_value.all.side_effect = [
+            [mock_media],
+            [mock_document],
+        ]
+
+        result = get_posts_additional_data([media_post, document_post, text_post], self.mock_db)
+
+        self.assertEqual(result[1]["media_url"], "http://example.com/image.jpg")
+        self.assertEqual(result[2]["document_url"], "http://example.com/doc.pdf")
+        self.assertNotIn(3, result)
+        self.assertEqual(self.mock_db.query.call_count, 2)
+
+    def test_get_loaded_post_additional_data_uses_loaded_attachments(self):
+        media_post = Mock(post_type="media", media=[
+            Mock(id=2, media_url="http://example.com/second.jpg", variants=None),
+            Mock(id=1, media_url="http://example.com/first.jpg", variants=None),
+        ])
+        event_post = Mock(post_type="event", event=None)
+
+        self.assertEqual(get_loaded_post_additional_data(media_post)["media_url"], "http://example.com/first.jpg")
+        self.assertEqual(get_loaded_post_additional_data(event_post), {})
+        self.assertEqual(get_loaded_post_additional_data(Mock(post_type="text")), {})
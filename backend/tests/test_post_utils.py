@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import Mock, AsyncMock, patch
+from unittest.mock import Mock, MagicMock, AsyncMock, patch
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, UploadFile
 import sys
@@ -13,6 +13,7 @@ from models.hashtag import Hashtag
 from utils.post_utils import (
     validate_post_ownership,
     prepare_post_response,
+    prepare_posts_response,
     handle_media_upload,
     create_base_post
 )
@@ -68,13 +69,14 @@ def test_validate_post_ownership_not_found(mock_db):
     assert exc_info.value.status_code == 404
     assert "Post not found or not authorized" in str(exc_info.value.detail)
 
-@patch('utils.post_utils.get_user_like_status')
-@patch('utils.post_utils.get_post_additional_data')
-def test_prepare_post_response(mock_additional_data, mock_like_status, mock_db, mock_post, mock_user):
+@patch('utils.post_utils.get_liked_post_ids')
+@patch('utils.post_utils.get_posts_additional_data')
+def test_prepare_post_response(mock_additional_data, mock_liked_ids, mock_db, mock_post, mock_user):
     # Setup
-    mock_like_status.return_value = True
-    mock_additional_data.return_value = {"additional": "data"}
-    mock_db.query.return_value.filter.return_value.count.return_value = 3
+    mock_liked_ids.return_value = {mock_post.id}
+    mock_post.comment_count = 3
+    mock_additional_data.return_value = {mock_post.id: {"additional": "data"}}
+    mock_db.query.return_value.filter.return_value.all.return_value = [mock_post.user]
 
     # Execute
     result = prepare_post_response(mock_post, mock_user, mock_db)
@@ -90,6 +92,34 @@ def test_prepare_post_response(mock_additional_data, mock_like_status, mock_db,
     assert result["comment_count"] == 3
     assert result["additional"] == "data"
 
+def _make_page(size):
+    post_types = ["text", "media", "document", "event"]
+    posts = []
+    for i in range(size):
+        post = Mock(spec=Post)
+        post.id = i + 1
+        post.user_id = (i % 3) + 1
+        post.post_type = post_types[i % len(post_types)]
+        post.like_count = 0
+        post.comment_count = 0
+        posts.append(post)
+    return posts
+
+def test_prepare_posts_response_query_count_is_constant(mock_user):
+    query_counts = []
+    for page_size in (4, 40, 400):
+        db = MagicMock(spec=Session)
+        responses = prepare_posts_response(_make_page(page_size), mock_user, db)
+        assert len(responses) == page_size
+        query_counts.append(db.query.call_count)
+
+    # likes-by-me, authors and one query per attachment type; comment counts come from the row
+    assert query_counts == [5, 5, 5]
+
+def test_prepare_posts_response_empty_page(mock_db, mock_user):
+    assert prepare_posts_response([], mock_user, mock_db) == []
+    mock_db.query.assert_not_called()
+
 @pytest.mark.asyncio
 @patch('utils.post_utils.upload_to_cloudinary')
 async def test_handle_media_upload(mock_upload):
@@ -134,46 +164,41 @@ def test_create_base_post_without_hashtags(mock_extract_hashtags, mock_post_clas
         post_type="text"
     )
     mock_db.add.assert_called_once_with(mock_post)
-    mock_db.commit.assert_called_once()
-    mock_db.refresh.assert_called_once_with(mock_post)
+    mock_db.flush.assert_called_once()
+    mock_db.commit.assert_not_called()  # The route's unit of work commits
 
+@patch('utils.post_utils.attach_hashtags')
+@patch('utils.post_utils.university_matcher')
 @patch('utils.post_utils.Post')
 @patch('utils.post_utils.extract_hashtags')
-def test_create_base_post_with_hashtags(mock_extract_hashtags, mock_post_class, mock_db):
+def test_create_base_post_with_hashtags(mock_extract_hashtags, mock_post_class, mock_matcher, mock_attach, mock_db):
     # Setup
-    mock_extract_hashtags.return_value = ["TestUniversity"]
-    
-    # Mock universities query
-    mock_universities = [("TestUniversity",)]
-    mock_db.query.return_value.all.return_value = mock_universities
-    
-    # Mock existing hashtag
-    existing_hashtag = Mock(spec=Hashtag)
-    existing_hashtag.name = "testuniversity"
-    existing_hashtag.usage_count = 1
-    mock_db.query.return_value.filter_by.return_value.first.return_value = existing_hashtag
+    mock_extract_hashtags.return_value = ["TestUniversity", "random"]
+    mock_matcher.match.return_value = ["testuniversity"]
 
     # Mock post
     mock_post = Mock()
-    mock_post.content = "Post with #TestUniversity hashtag"
-    mock_post.hashtags = []
+    mock_post.id = 42
+    mock_post.content = "Post with #TestUniversity #random hashtags"
     mock_post_class.return_value = mock_post
     
     # Execute
     result = create_base_post(
         mock_db,
         user_id=1,
-        content="Post with #TestUniversity hashtag",
+        content="Post with #TestUniversity #random hashtags",
         post_type="text"
     )
 
     # Assert
     mock_post_class.assert_called_once_with(
         user_id=1,
-        content="Post with #TestUniversity hashtag",
+        content="Post with #TestUniversity #random hashtags",
         post_type="text"
     )
-    assert existing_hashtag in mock_post.hashtags
+    mock_matcher.match.assert_called_once_with(mock_db, ["TestUniversity", "random"])
+    mock_db.flush.assert_called_once()
+    mock_attach.assert_called_once_with(mock_db, 42, ["testuniversity"])
+    mock_db.query.assert_not_called()  # No per-post university or per-tag hashtag lookups
     mock_db.add.assert_called_with(mock_post)
-    mock_db.commit.assert_called_once()
-    mock_db.refresh.assert_called_once_with(mock_post)
\ No newline at end of file
+    mock_db.commit.assert_not_called()
\ No newline at end of file
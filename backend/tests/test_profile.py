@@ -3,7 +3,7 @@ from pathlib import Path
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 import os
 import shutil
 import io
@@ -227,7 +227,9 @@ def test_upload_profile_picture_success(override_dependencies, mock_upload_dir,
     mock_cloudinary_result = {
         "secure_url": "https://res.cloudinary.com/test/image/upload/test.jpg"
     }
-    with patch("routes.profile.upload_to_cloudinary", return_value=mock_cloudinary_result):
+    with patch("routes.profile.upload_to_cloudinary_deduplicated", new_callable=AsyncMock, return_value=mock_cloudinary_result), \
+         patch("routes.profile.create_image_variants", new_callable=AsyncMock, return_value={"thumb": "https://cdn/thumb.webp"}), \
+         patch("routes.profile.release_stored_files", return_value=[]):
         # Make the request
         response = client.post(
             "/profile/upload_picture",
@@ -247,6 +249,24 @@ def test_upload_profile_picture_success(override_dependencies, mock_upload_dir,
     mock_session.commit.assert_called()
     mock_session.refresh.assert_called_with(test_user)
 
+# Test upload_profile_picture endpoint - the replaced picture's stored files are released
+def test_upload_profile_picture_releases_previous_picture(override_dependencies, test_image):
+    mock_session = override_dependencies
+    user = User(id=1, profile_picture="https://cdn/old.jpg", profile_picture_variants={"thumb": "https://cdn/old_thumb.webp"})
+    mock_session.query.return_value.filter.return_value.first.return_value = user
+    released = [{"destination": "cloudinary", "remote_id": "old", "resource_type": "image"}]
+
+    with patch("routes.profile.upload_to_cloudinary_deduplicated", new_callable=AsyncMock, return_value={"secure_url": "https://cdn/new.jpg"}), \
+         patch("routes.profile.create_image_variants", new_callable=AsyncMock, return_value={"thumb": "https://cdn/new_thumb.webp"}), \
+         patch("routes.profile.release_stored_files", return_value=released) as mock_release, \
+         patch("routes.profile.purge_stored_files", new_callable=AsyncMock) as mock_purge:
+        response = client.post("/profile/upload_picture", files={"file": ("test_image.jpg", test_image, "image/jpeg")})
+
+    assert response.status_code == 200
+    mock_release.assert_called_once_with(mock_session, ["https://cdn/old.jpg", "https://cdn/old_thumb.webp"])
+    mock_purge.assert_awaited_once_with(released)
+    assert user.profile_picture == "https://cdn/new.jpg"
+
 # Test upload_profile_picture endpoint - user not found
 def test_upload_profile_picture_user_not_found(override_dependencies, test_image):
     mock_session = override_dependencies
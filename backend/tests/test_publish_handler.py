@@ -0,0 +1,221 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import HTTPException
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from models.post import Post, PostStatusEnum
+from models.publish_job import PublishJob
+from models.user import User
+import services.PublishHandler as publish_handler
+from services.PublishHandler import _attempt, process_publish_job, reclaim_unfinished_publishes, reset_failed_publish, PUBLISH_MAX_ATTEMPTS
+
+
+def make_db(job, post, author=None):
+    db = MagicMock()
+    rows = {PublishJob: job, Post: post, User: author or MagicMock(spec=User)}
+    db.get.side_effect = lambda model, _id, **kwargs: rows[model]
+    db.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = job
+    return db
+
+
+def make_job(**overrides):
+    fields = dict(id=1, post_id=10, kind="media", spool_path="uploads/spool/a.jpg", file_ext="jpg", status="pending", attempts=0, last_error=None,
+                  updated_at=datetime.utcnow())
+    fields.update(overrides)
+    job = MagicMock(spec=PublishJob)
+    for name, value in fields.items():
+        setattr(job, name, value)
+    return job
+
+
+def make_post():
+    post = MagicMock(spec=Post)
+    post.id = 10
+    post.user_id = 5
+    post.status = PostStatusEnum.PROCESSING
+    return post
+
+
+@pytest.fixture
+def side_effects():
+    with patch.object(publish_handler, "send_post_notifications") as notify, \
+         patch.object(publish_handler, "fan_out_post") as fan_out, \
+         patch.object(publish_handler, "trim_timelines") as trim, \
+         patch.object(publish_handler, "invalidate_feed_cache") as invalidate_feed, \
+         patch.object(publish_handler, "home_feed_readers", side_effect=lambda db, author, recipients: recipients), \
+         patch.object(publish_handler, "invalidate_post_cache") as invalidate_post, \
+         patch.object(publish_handler, "remove_old_file_if_exists") as remove_file:
+        yield {"notify": notify, "fan_out": fan_out, "trim": trim, "invalidate_feed": invalidate_feed,
+               "invalidate_post": invalidate_post, "remove_file": remove_file}
+
+
+@pytest.mark.asyncio
+async def test_successful_attempt_publishes_and_notifies(side_effects):
+    job, post = make_job(), make_post()
+    db = make_db(job, post)
+
+    with patch.object(publish_handler, "_upload", AsyncMock(return_value=("https://cdn/a.jpg", {"feed": "https://cdn/a_feed.webp"}))), \
+         patch.object(publish_handler, "PostMedia") as post_media:
+        delay = await _attempt(db, job.id)
+
+    assert delay is None
+    assert job.status == "done" and job.attempts == 1
+    assert post.status == PostStatusEnum.PUBLISHED
+    post_media.assert_called_once_with(post_id=10, media_url="https://cdn/a.jpg", media_type="jpg", variants={"feed": "https://cdn/a_feed.webp"})
+    db.add.assert_called_once_with(post_media.return_value)
+    side_effects["remove_file"].assert_called_once_with(job.spool_path)
+    side_effects["notify"].assert_called_once()
+    side_effects["fan_out"].assert_called_once()
+    side_effects["trim"].assert_called_once_with(side_effects["fan_out"].return_value)
+    assert side_effects["invalidate_feed"].call_args[0][1] == side_effects["fan_out"].return_value
+    side_effects["invalidate_post"].assert_called_once_with(10)
+
+
+@pytest.mark.asyncio
+async def test_attempt_for_post_deleted_during_upload_gives_the_upload_back(side_effects):
+    job, post = make_job(), make_post()
+    db = make_db(job, post)
+    db.get.side_effect = lambda model, _id, **kwargs: None if kwargs.get("with_for_update") else {PublishJob: job, Post: post}[model]
+
+    with patch.object(publish_handler, "_upload", AsyncMock(return_value=("https://cdn/a.jpg", {"feed": "https://cdn/a_feed.webp"}))), \
+         patch.object(publish_handler, "release_stored_files", return_value=[{"remote_id": "a"}]) as release, \
+         patch.object(publish_handler, "purge_stored_files", AsyncMock()) as purge, \
+         patch.object(publish_handler, "PostMedia") as post_media:
+        delay = await _attempt(db, job.id)
+
+    assert delay is None
+    release.assert_called_once_with(db, ["https://cdn/a.jpg", "https://cdn/a_feed.webp"])
+    purge.assert_awaited_once_with([{"remote_id": "a"}])
+    side_effects["remove_file"].assert_called_once_with("uploads/spool/a.jpg")
+    post_media.assert_not_called()
+    side_effects["notify"].assert_not_called()
+    side_effects["fan_out"].assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_failed_attempt_backs_off_exponentially(side_effects):
+    job, post = make_job(attempts=2), make_post()
+    db = make_db(job, post)
+
+    with patch.object(publish_handler, "_upload", AsyncMock(side_effect=HTTPException(status_code=504, detail="Upload to cloudinary timed out"))):
+        delay = await _attempt(db, job.id)
+
+    assert delay == publish_handler.PUBLISH_RETRY_BASE_SECONDS * 4
+    assert job.status == "pending" and job.attempts == 3
+    assert job.last_error == "Upload to cloudinary timed out"
+    assert post.status == PostStatusEnum.PROCESSING
+    side_effects["notify"].assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_failed_attempt_rolls_back_before_recording_the_error(side_effects):
+    job, post = make_job(attempts=1), make_post()
+    db = make_db(job, post)
+    calls = []
+    db.rollback.side_effect = lambda: calls.append("rollback")
+    db.commit.side_effect = lambda: calls.append(("commit", job.status, job.last_error))
+
+    with patch.object(publish_handler, "_upload", AsyncMock(side_effect=RuntimeError("variant failed"))):
+        await _attempt(db, job.id)
+
+    # Claim committed, then the upload's partial writes dropped, then the failure recorded
+    assert calls == [("commit", "running", None), "rollback", ("commit", "pending", "variant failed")]
+
+
+@pytest.mark.asyncio
+async def test_last_attempt_marks_post_failed_and_keeps_spool(side_effects):
+    job, post = make_job(attempts=PUBLISH_MAX_ATTEMPTS - 1), make_post()
+    db = make_db(job, post)
+
+    with patch.object(publish_handler, "_upload", AsyncMock(side_effect=RuntimeError("boom"))):
+        delay = await _attempt(db, job.id)
+
+    assert delay is None
+    assert job.status == "failed" and job.last_error == "boom"
+    assert post.status == PostStatusEnum.FAILED
+    side_effects["remove_file"].assert_not_called()  # Kept for a manual retry
+    side_effects["notify"].assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_attempt_skips_finished_job(side_effects):
+    job = make_job(status="done")
+    db = make_db(job, make_post())
+    upload = AsyncMock()
+
+    with patch.object(publish_handler, "_upload", upload):
+        assert await _attempt(db, job.id) is None
+
+    upload.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_attempt_skips_job_claimed_by_another_worker(side_effects):
+    db = make_db(make_job(status="running"), make_post())
+    upload = AsyncMock()
+
+    with patch.object(publish_handler, "_upload", upload):
+        assert await _attempt(db, 1) is None
+
+    upload.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_process_publish_job_retries_until_success():
+    delays = iter([0.5, None])
+    attempt = AsyncMock(side_effect=lambda db, job_id: next(delays))
+
+    with patch.object(publish_handler, "_attempt", attempt), \
+         patch.object(publish_handler, "SessionLocal") as session_local, \
+         patch.object(publish_handler.asyncio, "sleep", AsyncMock()) as sleep:
+        await process_publish_job(1)
+
+    assert attempt.await_count == 2
+    sleep.assert_awaited_once_with(0.5)
+    assert session_local.return_value.close.call_count == 2
+
+
+def test_reset_failed_publish_requeues_job():
+    db = MagicMock()
+    job = make_job(status="failed", attempts=PUBLISH_MAX_ATTEMPTS)
+    db.query.return_value.join.return_value.filter.return_value.first.return_value = job
+
+    assert reset_failed_publish(db, 10, 5) is job
+    assert job.status == "pending" and job.attempts == 0
+    db.query.return_value.filter.return_value.update.assert_called_once()
+    db.commit.assert_called_once()
+
+
+@pytest.mark.parametrize("status", ["pending", "running"])
+def test_reset_failed_publish_requeues_stalled_job(status):
+    db = MagicMock()
+    stalled_at = datetime.utcnow() - timedelta(seconds=publish_handler.PUBLISH_STALE_SECONDS + 60)
+    job = make_job(status=status, attempts=1, updated_at=stalled_at)
+    db.query.return_value.join.return_value.filter.return_value.first.return_value = job
+
+    assert reset_failed_publish(db, 10, 5) is job
+    assert job.status == "pending" and job.attempts == 0
+
+
+def test_reclaim_unfinished_publishes_requeues_pending_and_stalled_jobs():
+    db = MagicMock()
+    jobs = [make_job(id=1, status="pending"), make_job(id=2, status="running")]
+    db.query.return_value.filter.return_value.all.return_value = jobs
+
+    assert reclaim_unfinished_publishes(db) == [1, 2]
+    assert [job.status for job in jobs] == ["pending", "pending"]
+    db.commit.assert_called_once()
+
+
+@pytest.mark.parametrize("job, status_code", [(None, 404), (make_job(status="running"), 409)])
+def test_reset_failed_publish_rejects(job, status_code):
+    db = MagicMock()
+    db.query.return_value.join.return_value.filter.return_value.first.return_value = job
+
+    with pytest.raises(HTTPException) as exc:
+        reset_failed_publish(db, 10, 5)
+
+    assert exc.value.status_code == status_code
@@ -0,0 +1,39 @@
+import math
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import services.RankingHandler as ranking
+from services.RankingHandler import adjust_post_counters, initial_engagement_score
+
+
+def test_newer_post_needs_double_engagement_per_half_life():
+    created_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    older = initial_engagement_score(created_at)
+    newer = initial_engagement_score(created_at + timedelta(hours=ranking.RANKING_HALF_LIFE_HOURS))
+
+    # log2(1 + 1) of engagement is exactly one half-life of recency
+    assert math.isclose(newer - older, math.log2(2))
+
+
+def test_naive_timestamps_are_treated_as_utc():
+    aware = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+    assert initial_engagement_score(aware.replace(tzinfo=None)) == initial_engagement_score(aware)
+
+
+def test_adjust_post_counters_updates_counter_and_score_in_one_statement():
+    db = MagicMock(spec=Session)
+
+    adjust_post_counters(db, 5, like_count=1)
+
+    db.execute.assert_called_once()
+    statement = db.execute.call_args.args[0]
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "like_count=greatest(posts.like_count +" in sql
+    assert "comment_count=" not in sql
+    assert "engagement_score=" in sql
+    db.commit.assert_not_called()
@@ -0,0 +1,187 @@
+import io
+import os
+import httpx
+import pytest
+from unittest.mock import MagicMock, patch
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.testclient import TestClient
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.upload_limit import UploadSizeLimitMiddleware, FORM_OVERHEAD_BYTES
+from utils.storage import LocalStorage, iter_chunks
+import utils.supabase as supabase_utils
+from utils.supabase import SupabaseStorage, upload_file_to_supabase
+
+
+class RecordingStream(io.BytesIO):
+    """BytesIO that remembers the largest single read."""
+
+    largest_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.largest_read = max(self.largest_read, len(data))
+        return data
+
+
+def test_iter_chunks_stops_with_413_past_the_limit():
+    chunks = iter_chunks(io.BytesIO(b"x" * 10), chunk_size=4, max_bytes=6)
+
+    assert next(chunks) == b"xxxx"
+    with pytest.raises(HTTPException) as exc:
+        next(chunks)
+    assert exc.value.status_code == 413
+
+
+def test_local_storage_writes_in_chunks(tmp_path):
+    storage = LocalStorage(str(tmp_path), "/files/", chunk_size=1024)
+    stream = RecordingStream(os.urandom(10_000))
+
+    url = storage.upload_stream("docs/a.pdf", stream, "application/pdf")
+
+    assert url == "/files/docs/a.pdf"
+    assert (tmp_path / "docs" / "a.pdf").read_bytes() == stream.getvalue()
+    assert stream.largest_read == 1024
+
+
+def test_local_storage_leaves_nothing_behind_when_too_large(tmp_path):
+    storage = LocalStorage(str(tmp_path), "/files", chunk_size=1024, max_bytes=2048)
+
+    with pytest.raises(HTTPException) as exc:
+        storage.upload_stream("docs/big.pdf", io.BytesIO(b"x" * 4096), "application/pdf")
+
+    assert exc.value.status_code == 413
+    assert list((tmp_path / "docs").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_upload_file_to_supabase_streams_through_configured_storage(tmp_path):
+    storage = LocalStorage(str(tmp_path), "/files", chunk_size=512)
+    upload = UploadFile(file=RecordingStream(b"%PDF" + b"0" * 5000), filename="paper.pdf")
+
+    with patch.object(supabase_utils, "get_storage", return_value=storage):
+        url = await upload_file_to_supabase(upload, "1_abc.pdf", section="research_papers")
+
+    assert url == "/files/research_papers/1_abc.pdf"
+    assert upload.file.largest_read == 512
+    assert upload.file.tell() == 0  # Rewound for reuse
+
+
+class FakeTusServer:
+    """Just enough of the TUS protocol to exercise SupabaseStorage; drops the first attempt at `fail_at_offset`."""
+
+    def __init__(self, fail_at_offset=None):
+        self.data = bytearray()
+        self.fail_at_offset = fail_at_offset
+        self.created_with = None
+        self.patch_sizes = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            self.created_with = request.headers
+            return httpx.Response(201, headers={"location": "/storage/v1/upload/resumable/abc"})
+        if request.method == "HEAD":
+            return httpx.Response(200, headers={"upload-offset": str(len(self.data))})
+        offset = int(request.headers["upload-offset"])
+        if offset == self.fail_at_offset:
+            self.fail_at_offset = None
+            self.data.extend(request.content[:100])  # Server kept part of the chunk before the connection dropped
+            return httpx.Response(500)
+        assert offset == len(self.data)
+        self.patch_sizes.append(len(request.content))
+        self.data.extend(request.content)
+        return httpx.Response(204, headers={"upload-offset": str(len(self.data))})
+
+
+def make_supabase_storage(server):
+    client = MagicMock()
+    client.storage.from_.return_value.get_public_url.return_value = "https://cdn/object"
+    storage = SupabaseStorage(client, "https://example.supabase.co", "key", "bucket")
+    transport = httpx.MockTransport(server)
+    real_client = httpx.Client
+    http_client = lambda **kwargs: real_client(transport=transport, **kwargs)
+    return storage, client, patch.object(supabase_utils.httpx, "Client", http_client)
+
+
+def test_supabase_storage_sends_large_files_in_resumable_chunks():
+    server = FakeTusServer(fail_at_offset=SupabaseStorage.CHUNK_BYTES)
+    storage, client, fake_http = make_supabase_storage(server)
+    payload = os.urandom(SupabaseStorage.CHUNK_BYTES * 2 + 1234)
+
+    with fake_http:
+        url = storage.upload_stream("docs/big.pdf", io.BytesIO(payload), "application/pdf")
+
+    assert url == "https://cdn/object"
+    assert bytes(server.data) == payload
+    assert server.created_with["upload-length"] == str(len(payload))
+    assert max(server.patch_sizes) == SupabaseStorage.CHUNK_BYTES
+    client.storage.from_.return_value.upload.assert_not_called()
+
+
+def test_supabase_storage_uses_single_request_for_small_files():
+    storage, client, fake_http = make_supabase_storage(FakeTusServer())
+
+    with fake_http:
+        storage.upload_stream("docs/small.pdf", io.BytesIO(b"small"), "application/pdf")
+
+    path, body = client.storage.from_.return_value.upload.call_args[0][:2]
+    assert (path, body) == ("docs/small.pdf", b"small")
+
+
+def test_supabase_storage_refuses_oversized_files_before_sending():
+    server = FakeTusServer()
+    client = MagicMock()
+    storage = SupabaseStorage(client, "https://example.supabase.co", "key", "bucket", max_bytes=10)
+
+    with pytest.raises(HTTPException) as exc:
+        storage.upload_stream("docs/big.pdf", io.BytesIO(b"x" * 11), "application/pdf")
+
+    assert exc.value.status_code == 413
+    assert server.created_with is None
+    client.storage.from_.return_value.upload.assert_not_called()
+
+
+@pytest.fixture
+def limited_client():
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=1024)
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    return TestClient(app)
+
+
+def test_upload_limit_allows_small_files(limited_client):
+    response = limited_client.post("/upload", files={"file": ("a.txt", b"x" * 100)})
+
+    assert response.status_code == 200
+    assert response.json() == {"size": 100}
+
+
+def test_upload_limit_rejects_by_content_length(limited_client):
+    response = limited_client.post("/upload", files={"file": ("a.txt", b"x" * (1024 + FORM_OVERHEAD_BYTES + 1))})
+
+    assert response.status_code == 413
+
+
+def test_upload_limit_rejects_chunked_bodies_while_streaming(limited_client):
+    boundary = "limit"
+    head = f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="a.txt"\r\n\r\n'.encode()
+
+    def body():
+        yield head
+        for _ in range(64):
+            yield b"x" * 65536  # 4 MiB in total, more than the limit plus overhead
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = limited_client.post(
+        "/upload",
+        content=body(),
+        headers={"content-type": f"multipart/form-data; boundary={boundary}"}
+    )
+
+    assert response.status_code == 413
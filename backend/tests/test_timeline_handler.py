@@ -0,0 +1,203 @@
+import pytest
+import uuid
+from unittest.mock import MagicMock, Mock, patch
+from datetime import datetime
+from sqlalchemy.orm import Session
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import services.TimelineHandler as timeline_handler
+from services.TimelineHandler import InMemoryTimelineStore, SqlTimelineStore, fan_out_post, home_feed_readers, read_home_timeline, trim_timelines, backfill_home_timeline
+from database.session import Base, SessionLocal, engine
+# Every mapped model must be imported before the first query so relationships resolve
+from models import chat, collaboration_request, connection, hashtag, notifications, post, publish_job, research_collaboration, research_paper, stored_file, timeline, university, user  # noqa: F401
+from models.connection import Connection, ConnectionStatus
+from models.post import Post
+from models.timeline import TimelineEntry
+from models.user import User
+from core.connection_crud import accept_request
+from services.PostHandler import decode_post_cursor
+
+
+def make_post(post_id, user_id=1, day=1):
+    post = Mock()
+    post.id = post_id
+    post.user_id = user_id
+    post.created_at = datetime(2025, 1, day)
+    return post
+
+
+@pytest.fixture
+def store(monkeypatch):
+    memory_store = InMemoryTimelineStore()
+    monkeypatch.setattr(timeline_handler, "timeline_store", memory_store)
+    monkeypatch.setattr(timeline_handler, "TIMELINE_HYBRID_MODE", False)
+    return memory_store
+
+
+@pytest.fixture
+def mock_db():
+    return MagicMock(spec=Session)
+
+
+def test_fan_out_post_writes_author_and_connections(store, mock_db, monkeypatch):
+    monkeypatch.setattr(timeline_handler, "get_connections", Mock(return_value=[
+        {"user_id": 1, "friend_id": 2},
+        {"user_id": 1, "friend_id": 3},
+    ]))
+    author = Mock(id=1, connection_count=2)
+
+    recipients = fan_out_post(mock_db, author, make_post(10))
+
+    assert recipients == [1, 2, 3]
+    assert store.page(mock_db, 2, 10) == [(datetime(2025, 1, 1), 10)]
+    mock_db.commit.assert_not_called()  # Committed with the post by the caller
+
+
+def test_fan_out_post_skips_connections_of_celebrity_in_hybrid_mode(store, mock_db, monkeypatch):
+    monkeypatch.setattr(timeline_handler, "TIMELINE_HYBRID_MODE", True)
+    monkeypatch.setattr(timeline_handler, "CELEBRITY_CONNECTION_THRESHOLD", 2)
+    get_connections = Mock(return_value=[
+        {"user_id": 1, "friend_id": 2},
+        {"user_id": 3, "friend_id": 1},
+    ])
+    monkeypatch.setattr(timeline_handler, "get_connections", get_connections)
+
+    # Same stored count the read side uses to merge the author's posts back in
+    recipients = fan_out_post(mock_db, Mock(id=1, connection_count=2), make_post(10))
+
+    assert recipients == [1]
+    assert store.page(mock_db, 2, 10) == []
+    get_connections.assert_not_called()
+
+
+def test_home_feed_readers_are_the_fan_out_recipients(mock_db, monkeypatch):
+    get_connections = Mock()
+    monkeypatch.setattr(timeline_handler, "get_connections", get_connections)
+
+    assert home_feed_readers(mock_db, Mock(id=1, connection_count=2), [1, 2, 3]) == [1, 2, 3]
+    get_connections.assert_not_called()
+
+
+def test_home_feed_readers_include_every_connection_of_a_celebrity(mock_db, monkeypatch):
+    monkeypatch.setattr(timeline_handler, "TIMELINE_HYBRID_MODE", True)
+    monkeypatch.setattr(timeline_handler, "CELEBRITY_CONNECTION_THRESHOLD", 2)
+    monkeypatch.setattr(timeline_handler, "get_connections", Mock(return_value=[
+        {"user_id": 1, "friend_id": 2},
+        {"user_id": 3, "friend_id": 1},
+    ]))
+
+    # Fan-out only wrote the author's own timeline; readers merge the posts in at read time
+    assert home_feed_readers(mock_db, Mock(id=1, connection_count=2), [1]) == [1, 2, 3]
+
+
+def test_in_memory_store_caps_entries_per_user(store, mock_db, monkeypatch):
+    monkeypatch.setattr(timeline_handler, "TIMELINE_MAX_ENTRIES", 2)
+
+    for day in (1, 2, 3):
+        store.push(mock_db, [5], make_post(day, day=day))
+
+    assert [post_id for _, post_id in store.page(mock_db, 5, 10)] == [3, 2]
+
+
+def test_read_home_timeline_pages_with_cursor(store, mock_db):
+    posts = {day: make_post(day, day=day) for day in (1, 2, 3)}
+    for post in posts.values():
+        store.push(mock_db, [7], post)
+    mock_db.query.return_value.filter.return_value.all.side_effect = lambda: list(posts.values())
+
+    first_page, next_cursor = read_home_timeline(mock_db, 7, limit=2)
+    second_page, last_cursor = read_home_timeline(mock_db, 7, limit=2, cursor=next_cursor)
+
+    assert [post.id for post in first_page] == [3, 2]
+    assert decode_post_cursor(next_cursor) == (datetime(2025, 1, 2), 2)
+    assert [post.id for post in second_page] == [1]
+    assert last_cursor is None
+
+
+def test_read_home_timeline_skips_unpublished_entries_and_keeps_pages_full(store, mock_db):
+    posts = {day: make_post(day, day=day) for day in (1, 2, 3, 4)}
+    for post in posts.values():
+        store.push(mock_db, [7], post)
+    # Posts 3 and 4 are still processing, so the visible-post query leaves them out
+    mock_db.query.return_value.filter.return_value.all.side_effect = lambda: [posts[1], posts[2]]
+
+    page, next_cursor = read_home_timeline(mock_db, 7, limit=2)
+
+    assert [post.id for post in page] == [2, 1]
+    assert next_cursor is None
+    assert mock_db.query.return_value.filter.call_count == 2  # Scanned past the hidden entries once
+
+
+def test_read_home_timeline_merges_celebrity_posts(store, mock_db, monkeypatch):
+    monkeypatch.setattr(timeline_handler, "TIMELINE_HYBRID_MODE", True)
+    monkeypatch.setattr(timeline_handler, "_celebrity_connection_ids", Mock(return_value=[9]))
+    monkeypatch.setattr(timeline_handler, "_celebrity_keys", Mock(return_value=[(datetime(2025, 1, 2), 20)]))
+    own_post = make_post(10, day=1)
+    celebrity_post = make_post(20, user_id=9, day=2)
+    store.push(mock_db, [7], own_post)
+    mock_db.query.return_value.filter.return_value.all.return_value = [own_post, celebrity_post]
+
+    posts, next_cursor = read_home_timeline(mock_db, 7, limit=10)
+
+    assert [post.id for post in posts] == [20, 10]
+    assert next_cursor is None
+
+
+def test_trim_timelines_works_in_batches_with_its_own_session(monkeypatch):
+    store = Mock()
+    session = Mock()
+    monkeypatch.setattr(timeline_handler, "timeline_store", store)
+    monkeypatch.setattr(timeline_handler, "TIMELINE_TRIM_BATCH_SIZE", 2)
+
+    with patch("services.TimelineHandler.SessionLocal", return_value=session):
+        trim_timelines([1, 2, 3])
+
+    assert [c.args[1] for c in store.trim.call_args_list] == [[1, 2], [3]]
+    assert session.commit.call_count == 2
+    session.close.assert_called_once()
+
+
+@pytest.mark.skipif(engine.dialect.name != "postgresql", reason="Needs the PostgreSQL test database")
+def test_backfill_and_celebrity_lookup_use_stored_connection_counts(monkeypatch):
+    monkeypatch.setattr(timeline_handler, "timeline_store", SqlTimelineStore())
+    monkeypatch.setattr(timeline_handler, "TIMELINE_HYBRID_MODE", True)
+    monkeypatch.setattr(timeline_handler, "CELEBRITY_CONNECTION_THRESHOLD", 2)
+    monkeypatch.setattr(timeline_handler, "TIMELINE_MAX_ENTRIES", 2)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    tag = uuid.uuid4().hex[:8]
+    reader, friend, celebrity, fan = users = [
+        User(username=f"timeline_{tag}_{i}", email=f"timeline_{tag}_{i}@example.invalid", hashed_password="-") for i in range(4)
+    ]
+    db.add_all(users)
+    db.flush()
+    try:
+        for a, b in ((reader, friend), (reader, celebrity), (fan, celebrity)):
+            request = Connection(user_id=a.id, friend_id=b.id, status=ConnectionStatus.PENDING)
+            db.add(request)
+            db.flush()
+            accept_request(db, request.id)
+        db.refresh(celebrity)
+        assert celebrity.connection_count == 2
+        for author, day in ((reader, 1), (friend, 2), (friend, 3), (celebrity, 4)):
+            db.add(Post(user_id=author.id, content="old", post_type="text", created_at=datetime(2025, 1, day)))
+        db.commit()
+
+        assert timeline_handler._celebrity_connection_ids(db, reader.id) == [celebrity.id]
+
+        backfill_home_timeline(db, reader.id)
+        db.commit()
+
+        # The newest two fanned-out posts; the celebrity's is merged at read time instead
+        keys = timeline_handler.timeline_store.page(db, reader.id, 10)
+        assert [created_at.day for created_at, _ in keys] == [3, 2]
+    finally:
+        db.rollback()
+        db.query(TimelineEntry).filter(TimelineEntry.user_id.in_([u.id for u in users])).delete(synchronize_session=False)
+        db.query(Post).filter(Post.user_id.in_([u.id for u in users])).delete(synchronize_session=False)
+        db.query(Connection).filter(Connection.user_id.in_([u.id for u in users])).delete(synchronize_session=False)
+        db.query(User).filter(User.id.in_([u.id for u in users])).delete(synchronize_session=False)
+        db.commit()
+        db.close()
@@ -0,0 +1,30 @@
+import pytest
+from unittest.mock import MagicMock
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from database.session import unit_of_work
+
+
+def test_commits_once_when_the_block_succeeds():
+    db = MagicMock()
+
+    with unit_of_work(db):
+        db.add("post")
+        db.add("attachment")
+
+    db.commit.assert_called_once()
+    db.rollback.assert_not_called()
+
+
+def test_rolls_back_everything_when_a_step_fails():
+    db = MagicMock()
+
+    with pytest.raises(RuntimeError):
+        with unit_of_work(db):
+            db.add("post")
+            raise RuntimeError("upload failed")
+
+    db.rollback.assert_called_once()
+    db.commit.assert_not_called()
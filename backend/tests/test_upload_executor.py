@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+import pytest
+from fastapi import HTTPException
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.upload_executor import UploadExecutor
+
+
+@pytest.mark.asyncio
+async def test_run_executes_off_the_event_loop_thread():
+    executor = UploadExecutor({"cloudinary": 2}, timeout=5)
+
+    thread_name = await executor.run("cloudinary", lambda: threading.current_thread().name)
+
+    assert thread_name.startswith("upload-cloudinary")
+
+
+@pytest.mark.asyncio
+async def test_destination_concurrency_is_bounded():
+    executor = UploadExecutor({"supabase": 2}, timeout=5)
+    in_flight, peak, lock = 0, 0, threading.Lock()
+
+    def upload():
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+
+    await asyncio.gather(*(executor.run("supabase", upload) for _ in range(6)))
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_event_loop_keeps_running_during_upload():
+    executor = UploadExecutor({"cloudinary": 1}, timeout=5)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticking = asyncio.create_task(ticker())
+    await executor.run("cloudinary", time.sleep, 0.2)
+    ticking.cancel()
+
+    assert ticks >= 10
+
+
+@pytest.mark.asyncio
+async def test_timeout_raises_504():
+    executor = UploadExecutor({"cloudinary": 1}, timeout=0.05)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await executor.run("cloudinary", time.sleep, 0.3)
+
+    assert exc_info.value.status_code == 504
+
+
+@pytest.mark.asyncio
+async def test_unknown_destination_is_rejected():
+    executor = UploadExecutor({"cloudinary": 1}, timeout=1)
+
+    with pytest.raises(ValueError):
+        await executor.run("s3", lambda: None)
@@ -108,4 +108,15 @@ class TestWebSocketService(IsolatedAsyncioTestCase):
         mock_prepare_event.assert_called_once_with(mock_message)
         
         # Verify broadcast
-        mock_broadcast.assert_called_once_with([self.user_id, 2], mock_event)
\ No newline at end of file
+        mock_broadcast.assert_called_once_with([self.user_id, 2], mock_event)
+    @patch('services.websocket_service.create_message')
+    @patch('services.websocket_service.broadcast_message')
+    async def test_handle_chat_message_refuses_inappropriate_content(self, mock_broadcast, mock_create_message):
+        clients[self.user_id] = self.mock_websocket
+        message_data = {"receiver_id": "2", "content": "what the h3ll", "message_type": "text"}
+
+        await handle_chat_message(Mock(), self.user_id, message_data)
+
+        mock_create_message.assert_not_called()
+        mock_broadcast.assert_not_called()
+        self.assertEqual(self.mock_websocket.send_json.call_args.args[0]["type"], "error")
@@ -30,3 +30,10 @@ def upload_to_cloudinary(file, folder_name):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+
+def delete_from_cloudinary(public_id, resource_type="image"):
+    try:
+        cloudinary.uploader.destroy(public_id, resource_type=resource_type)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
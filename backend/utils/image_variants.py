@@ -0,0 +1,18 @@
+from typing import Any, List, Optional
+
+
+def variant_url(url: Optional[str], variants: Any, size: str) -> Optional[str]:
+    """URL of the `size` ("thumb", "feed", "full") variant, or the original when there is none (videos, GIFs, older uploads)."""
+    if isinstance(variants, dict) and variants.get(size):
+        return variants[size]
+    return url
+
+
+def variant_urls(variants: Any) -> List[str]:
+    """Every stored variant URL, for releasing them together with the original."""
+    return list(variants.values()) if isinstance(variants, dict) else []
+
+
+def avatar_url(user: Any, size: str = "thumb") -> Optional[str]:
+    """A user's profile picture at `size`; avatars in lists default to the thumbnail."""
+    return variant_url(user.profile_picture, getattr(user, "profile_picture_variants", None), size)
@@ -1,14 +1,19 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, UploadFile
 from models.user import User
-from models.post import Post, PostMedia, PostDocument, Event, Comment
+from models.post import Post, PostMedia, PostDocument, Event, Comment, PostStatusEnum
 from utils.cloudinary import upload_to_cloudinary
-from services.PostHandler import get_user_like_status
-from services.PostTypeHandler import get_post_additional_data
+from core.upload_executor import run_upload
+from utils.image_variants import avatar_url
+from services.PostHandler import get_liked_post_ids
+from services.RankingHandler import initial_engagement_score
+from services.LikeCounterBuffer import pending_like_delta
+from services.PostTypeHandler import get_posts_additional_data, get_loaded_post_additional_data
 from services.PostHandler import extract_hashtags
-from models.university import University
-from models.hashtag import Hashtag
+from services.HashtagHandler import university_matcher, attach_hashtags
+from services.DedupHandler import upload_to_cloudinary_deduplicated
+from AI.moderation import ensure_appropriate
 
 def validate_post_ownership(post_id: int, user_id: int, db: Session) -> Post:
     """Validate post ownership and return the post if valid."""
@@ -17,38 +22,92 @@ def validate_post_ownership(post_id: int, user_id: int, db: Session) -> Post:
         raise HTTPException(status_code=404, detail="Post not found or not authorized")
     return post
 
-def prepare_post_response(post: Post, current_user: User, db: Session) -> Dict[str, Any]:
-    """Prepare standardized post response with user and interaction data."""
-    user_liked = get_user_like_status(post.id, current_user.id, db)
-    comment_count = db.query(Comment).filter(Comment.post_id == post.id).count()
-    
-    response = {
-        "id": post.id,
-        "user_id": post.user_id,  # Changed from post.user.id to post.user_id
-        "post_type": post.post_type,
-        "content": post.content,
-        "created_at": post.created_at,
-        "user": {
-            "id": post.user.id,
-            "username": post.user.username,
-            "profile_picture": post.user.profile_picture,
-            "university_name": post.user.university_name
+def get_authors_by_id(user_ids: List[int], db: Session) -> Dict[int, User]:
+    """Load the authors of a page of posts in one query."""
+    if not user_ids:
+        return {}
+    return {user.id: user for user in db.query(User).filter(User.id.in_(user_ids)).all()}
+
+def _serialize_author(author: User) -> Dict[str, Any]:
+    return {
+        "id": author.id,
+        "username": author.username,
+        "profile_picture": avatar_url(author),
+        "university_name": author.university_name
+    }
+
+def build_post_payloads(posts: List[Post], db: Session) -> Dict[int, Dict[str, Any]]:
+    """
+    The viewer-independent part of each post's response, keyed by post id:
+    `post` holds the common fields (author card, counters) and `type_data`
+    the media / document / event block. One query for authors plus one per
+    attachment type, whatever the number of posts.
+    """
+    if not posts:
+        return {}
+
+    authors = get_authors_by_id(list({post.user_id for post in posts}), db)
+    additional_data = get_posts_additional_data(posts, db)
+
+    return {
+        post.id: _post_payload(post, authors.get(post.user_id) or post.user, additional_data.get(post.id, {}))
+        for post in posts
+    }
+
+def build_loaded_post_payload(post: Post) -> Dict[str, Any]:
+    """`build_post_payloads` for one post whose author and attachments were loaded with it; no queries."""
+    return _post_payload(post, post.user, get_loaded_post_additional_data(post))
+
+def _post_payload(post: Post, author: User, type_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "post": {
+            "id": post.id,
+            "user_id": post.user_id,
+            "post_type": post.post_type,
+            "content": post.content,
+            "created_at": post.created_at,
+            "user": _serialize_author(author),
+            "total_likes": post.like_count,
+            "comment_count": post.comment_count or 0
         },
-        "total_likes": post.like_count,
-        "user_liked": user_liked,
-        "comment_count": comment_count
+        "type_data": type_data
     }
-    
-    # Add type-specific data
-    response.update(get_post_additional_data(post, db))
-    return response
+
+def render_post_payload(payload: Dict[str, Any], user_liked: bool) -> Dict[str, Any]:
+    """Overlay the viewer-specific bit, and likes not yet flushed, on a payload from `build_post_payloads`."""
+    post = payload["post"]
+    pending = pending_like_delta(post["id"])
+    if pending:
+        post = {**post, "total_likes": max((post["total_likes"] or 0) + pending, 0)}
+    return {**post, "user_liked": user_liked, **payload["type_data"]}
+
+def prepare_posts_response(posts: List[Post], current_user: User, db: Session) -> List[Dict[str, Any]]:
+    """
+    Hydrate a page of posts with a fixed number of set-based queries:
+    likes-by-viewer, authors and one query per attachment type.
+    """
+    if not posts:
+        return []
+
+    liked_post_ids = get_liked_post_ids([post.id for post in posts], current_user.id, db)
+    payloads = build_post_payloads(posts, db)
+    return [render_post_payload(payloads[post.id], post.id in liked_post_ids) for post in posts]
+
+def prepare_post_response(post: Post, current_user: User, db: Session) -> Dict[str, Any]:
+    """Prepare standardized post response with user and interaction data."""
+    return prepare_posts_response([post], current_user, db)[0]
 
 async def handle_media_upload(
     media_file: UploadFile,
-    folder_name: str
+    folder_name: str,
+    db: Optional[Session] = None
 ) -> Dict[str, str]:
-    """Handle media file upload to cloudinary and return upload details."""
-    upload_result = upload_to_cloudinary(
+    """Handle media file upload to cloudinary and return upload details. With `db`, identical content is uploaded once."""
+    if db is not None:
+        return await upload_to_cloudinary_deduplicated(db, media_file.file, folder_name)
+    upload_result = await run_upload(
+        "cloudinary",
+        upload_to_cloudinary,
         media_file.file,
         folder_name=folder_name
     )
@@ -61,29 +120,21 @@ def create_base_post(
     db: Session,
     user_id: int,
     content: Optional[str],
-    post_type: str
+    post_type: str,
+    status: PostStatusEnum = PostStatusEnum.PUBLISHED
 ) -> Post:
-    """Create a base post entry with common fields."""
+    """Create a base post entry with common fields. Flushed for its id; the caller commits."""
+    ensure_appropriate(content, "post")
     post = Post(
         user_id=user_id,
         content=content,
         post_type=post_type
     )
-    hashtags = extract_hashtags(post.content)
-    universities = db.query(University.name).all()
-    university_names = {name.lower() for (name,) in universities}
-
-    for tag in hashtags:
-        if tag.lower() in university_names:
-            existing_hashtag = db.query(Hashtag).filter_by(name=tag.lower()).first()
-            if existing_hashtag:
-                existing_hashtag.usage_count += 1
-            else:
-                existing_hashtag = Hashtag(name=tag.lower(), usage_count=1)
-                db.add(existing_hashtag)
-
-            post.hashtags.append(existing_hashtag)
+    post.engagement_score = initial_engagement_score()
+    post.status = status
+    # Only hashtags naming a university are kept
+    hashtags = university_matcher.match(db, extract_hashtags(content) if content else [])
     db.add(post)
-    db.commit()
-    db.refresh(post)
+    db.flush()  # Attachments and hashtag links need post.id
+    attach_hashtags(db, post.id, hashtags)
     return post
\ No newline at end of file
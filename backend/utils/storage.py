@@ -0,0 +1,119 @@
+import os
+from typing import BinaryIO, Iterator, Optional
+from fastapi import HTTPException
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase")  # "local" keeps files on disk, for development and tests
+LOCAL_STORAGE_DIR = os.getenv("LOCAL_STORAGE_DIR", "uploads/storage")
+LOCAL_STORAGE_URL = os.getenv("LOCAL_STORAGE_URL", "/uploads/storage")
+# Largest file accepted by any upload; requests announcing more are refused before their body is read
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+if STORAGE_BACKEND == "local":
+    os.makedirs(LOCAL_STORAGE_DIR, exist_ok=True)
+
+CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "doc": "application/msword",
+    "pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "txt": "text/plain",
+    "jpg": "image/jpg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp"
+}
+
+
+def content_type_for(filename: str) -> str:
+    return CONTENT_TYPES.get(filename.split(".")[-1].lower(), "application/octet-stream")
+
+
+def stream_size(stream: BinaryIO) -> int:
+    """Size of a seekable stream, found by seeking rather than reading. Leaves it rewound."""
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+    return size
+
+
+def check_upload_size(size: int, max_bytes: int = UPLOAD_MAX_BYTES) -> None:
+    if size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit")
+
+
+def iter_chunks(stream: BinaryIO, chunk_size: int, max_bytes: int = UPLOAD_MAX_BYTES) -> Iterator[bytes]:
+    """Read `stream` in chunks of at most `chunk_size`, failing with 413 once more than `max_bytes` have been read."""
+    total = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        total += len(chunk)
+        check_upload_size(total, max_bytes)
+        yield chunk
+
+
+class ObjectStorage:
+    """
+    Destination for uploaded files. Implementations read the stream in fixed-size
+    chunks, so an upload holds one chunk in memory whatever the file size.
+    """
+
+    def upload_stream(self, path: str, stream: BinaryIO, content_type: str) -> str:
+        """Store `stream` under `path` and return its public URL. Blocking; run it on the upload executor."""
+        raise NotImplementedError
+
+    def delete(self, path: str) -> None:
+        """Remove the object stored under `path`, if any."""
+        raise NotImplementedError
+
+
+class LocalStorage(ObjectStorage):
+    """Writes files below a local directory. Stand-in for object storage in development and tests."""
+
+    def __init__(self, root: str, base_url: str, chunk_size: int = UPLOAD_CHUNK_BYTES, max_bytes: int = UPLOAD_MAX_BYTES):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+
+    def upload_stream(self, path: str, stream: BinaryIO, content_type: str) -> str:
+        target = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        partial = f"{target}.part"
+        try:
+            with open(partial, "wb") as out:
+                for chunk in iter_chunks(stream, self.chunk_size, self.max_bytes):
+                    out.write(chunk)
+            os.replace(partial, target)  # Readers never see a half-written file
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        return f"{self.base_url}/{path}"
+
+    def delete(self, path: str) -> None:
+        target = os.path.join(self.root, path)
+        if os.path.exists(target):
+            os.remove(target)
+
+
+_storage: Optional[ObjectStorage] = None
+
+
+def get_storage() -> ObjectStorage:
+    """The configured storage backend (STORAGE_BACKEND), created on first use."""
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND == "local":
+            _storage = LocalStorage(LOCAL_STORAGE_DIR, LOCAL_STORAGE_URL)
+        else:
+            from utils.supabase import SupabaseStorage, supabase, supabase_url, supabase_key, BUCKET_NAME
+            _storage = SupabaseStorage(supabase, supabase_url, supabase_key, BUCKET_NAME)
+    return _storage
@@ -1,8 +1,13 @@
 from supabase import create_client
-from io import BytesIO
 from fastapi import HTTPException
+import base64
 import os
+from typing import BinaryIO
+from urllib.parse import urljoin
+import httpx
 from dotenv import load_dotenv
+from core.upload_executor import run_upload, UPLOAD_TIMEOUT_SECONDS
+from utils.storage import ObjectStorage, UPLOAD_MAX_BYTES, check_upload_size, content_type_for, get_storage, stream_size
 load_dotenv()
 
 supabase_url = os.getenv("SUPABASE_URL")
@@ -21,53 +26,96 @@ SECTION_FOLDER_MAP = {
 
 BUCKET_NAME = "noobsquad"  # your supabase bucket name
 
+class SupabaseStorage(ObjectStorage):
+    """
+    Supabase Storage. Files larger than one chunk go through the resumable (TUS)
+    endpoint in fixed 6 MiB chunks, the size Supabase requires; an interrupted
+    chunk is resumed from the offset the server reports.
+    """
+
+    CHUNK_BYTES = 6 * 1024 * 1024
+
+    def __init__(self, client, url: str, key: str, bucket: str, max_bytes: int = UPLOAD_MAX_BYTES, max_retries: int = 3):
+        self.client = client
+        self.resumable_url = f"{url.rstrip('/')}/storage/v1/upload/resumable"
+        self.headers = {"authorization": f"Bearer {key}", "apikey": key, "tus-resumable": "1.0.0"}
+        self.bucket = bucket
+        self.max_bytes = max_bytes
+        self.max_retries = max_retries
+
+    def upload_stream(self, path: str, stream: BinaryIO, content_type: str) -> str:
+        size = stream_size(stream)
+        check_upload_size(size, self.max_bytes)  # Refuse before sending anything
+        if size <= self.CHUNK_BYTES:
+            self.client.storage.from_(self.bucket).upload(
+                path,
+                stream.read(),
+                file_options={"content-type": content_type, "cache-control": "3600"}
+            )
+        else:
+            self._upload_resumable(path, stream, size, content_type)
+        return self.client.storage.from_(self.bucket).get_public_url(path)
+
+    def delete(self, path: str) -> None:
+        self.client.storage.from_(self.bucket).remove([path])
+
+    def _upload_resumable(self, path: str, stream: BinaryIO, size: int, content_type: str) -> None:
+        metadata = {"bucketName": self.bucket, "objectName": path, "contentType": content_type, "cacheControl": "3600"}
+        with httpx.Client(timeout=UPLOAD_TIMEOUT_SECONDS) as http:
+            created = http.post(self.resumable_url, headers={
+                **self.headers,
+                "upload-length": str(size),
+                "upload-metadata": ",".join(f"{k} {base64.b64encode(v.encode()).decode()}" for k, v in metadata.items()),
+            })
+            created.raise_for_status()
+            location = urljoin(self.resumable_url, created.headers["location"])
+
+            offset, retries = 0, 0
+            while offset < size:
+                stream.seek(offset)
+                chunk = stream.read(self.CHUNK_BYTES)
+                try:
+                    sent = http.patch(location, content=chunk, headers={
+                        **self.headers,
+                        "upload-offset": str(offset),
+                        "content-type": "application/offset+octet-stream",
+                    })
+                    sent.raise_for_status()
+                    offset = int(sent.headers["upload-offset"])
+                except httpx.HTTPError:
+                    retries += 1
+                    if retries > self.max_retries:
+                        raise
+                    # Ask the server how much it kept and carry on from there
+                    head = http.head(location, headers=self.headers)
+                    head.raise_for_status()
+                    offset = int(head.headers["upload-offset"])
+
+def storage_path(section: str, filename: str) -> str:
+    return f"{SECTION_FOLDER_MAP[section]}{filename}"
+
 # Upload Function
 async def upload_file_to_supabase(file_obj, filename: str, section: str):
     try:
         if section not in SECTION_FOLDER_MAP:
             raise HTTPException(status_code=400, detail="Invalid document section.")
 
-        folder = SECTION_FOLDER_MAP[section]
-        destination_path = f"{folder}{filename}"
-
-        file_content = await file_obj.read()
-
-        # Auto-detect MIME type based on extension
-        ext = filename.split(".")[-1].lower()
-        ext_to_content_type = {
-            "pdf": "application/pdf",
-            "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            "doc": "application/msword",
-            "pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
-            "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            "txt": "text/plain",
-            "jpg": "image/jpg",
-            "jpeg": "image/jpeg",
-            "png": "image/png",
-            "gif": "image/gif",
-            "webp": "image/webp"
-        }
-        content_type = ext_to_content_type.get(ext, "application/octet-stream")
-
-        # Upload the file with file options instead of headers
-        upload_response = supabase.storage.from_(BUCKET_NAME).upload(
-            destination_path,
-            file_content,
-            file_options={
-                "contentType": content_type,
-                "cacheControl": "max-age=3600"
-            }
-        )
-
-        # Get the public URL
-        file_url = supabase.storage.from_(BUCKET_NAME).get_public_url(destination_path)
+        destination_path = storage_path(section, filename)
+
+        # Stream from the spooled file behind an UploadFile (or a plain binary file) instead of reading it whole
+        stream = getattr(file_obj, "file", file_obj)
+        content_type = content_type_for(filename)
+
+        # The storage clients are synchronous, so the upload runs on the upload executor
+        file_url = await run_upload("supabase", get_storage().upload_stream, destination_path, stream, content_type)
         
         # Reset file pointer for potential reuse
-        if hasattr(file_obj, "seek"):
-            file_obj.seek(0)
+        stream.seek(0)
             
         return file_url
 
+    except HTTPException:
+        raise  # Already carries the right status (invalid section, too large, upload timeout)
     except Exception as e:
         print(f"Error uploading file to Supabase: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to upload file to Supabase: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to upload file to Supabase: {str(e)}")
@@ -40,6 +40,7 @@ const Post =  React.forwardRef(({ post, onUpdate, onDelete, id }, ref) => {
   const [liked, setLiked] = useState(post?.user_liked);
   const [likes, setLikes] = useState(post?.total_likes);
   const [comments, setComments] = useState([]);
+  const [commentsCursor, setCommentsCursor] = useState(null); // next_cursor of the last page of root comments
   const [shareLink, setShareLink] = useState("");
   const [commentText, setCommentText] = useState(""); // Comment input text state
   const [replyText, setReplyText] = useState(""); // Reply input text state
@@ -109,17 +110,38 @@ const Post =  React.forwardRef(({ post, onUpdate, onDelete, id }, ref) => {
   
   
 
-  const fetchComments = async () => {
-    setLoadingComments(true);
+  // Without a cursor, (re)load the first page; with one, append the next page
+  const fetchComments = async (cursor = null) => {
+    if (!cursor) setLoadingComments(true);
     try {
-      const response = await api.get(`/interactions/${post.id}/comments`);
-      setComments(response.data.comments);
+      const response = await api.get(`/interactions/${post.id}/comments`, { params: cursor ? { cursor } : {} });
+      const page = response.data.comments;
+      setComments((prevComments) => (cursor ? [...prevComments, ...page] : page));
+      setCommentsCursor(response.data.next_cursor);
     } catch (error) {
       console.error("Error fetching comments:", error);
     }
     setLoadingComments(false);
   };
 
+  // Each root comes with its first replies; the rest of the thread is paged in on demand
+  const fetchMoreReplies = async (comment) => {
+    try {
+      const response = await api.get(`/interactions/comments/${comment.id}/replies`, {
+        params: { cursor: comment.replies_next_cursor },
+      });
+      setComments((prevComments) =>
+        prevComments.map((c) =>
+          c.id === comment.id
+            ? { ...c, replies: [...c.replies, ...response.data.replies], replies_next_cursor: response.data.next_cursor }
+            : c
+        )
+      );
+    } catch (error) {
+      console.error("Error fetching replies:", error);
+    }
+  };
+
 
 
   const handleEdit = async () => {
@@ -539,6 +561,12 @@ return (
               </div>
             )}
 
+            {comment.replies_next_cursor && (
+              <button onClick={() => fetchMoreReplies(comment)} className="ml-8 text-blue-500 text-sm block">
+                View {comment.reply_count - comment.replies.length} more replies
+              </button>
+            )}
+
             <button onClick={() => setReplyingTo(comment.id)} className="text-blue-500 text-sm">
               Reply
             </button>
@@ -564,6 +592,11 @@ return (
           </div>
         ))
       )}
+      {!loadingComments && commentsCursor && (
+        <button onClick={() => fetchComments(commentsCursor)} className="ml-4 text-blue-500 text-sm">
+          Load more comments
+        </button>
+      )}
     </div>
 
 